@@ -0,0 +1,120 @@
+# =====================  ALLOCATION RUN (HEADLESS)  =====================
+#   config → prices → rolling backtest → results dict • opt-in plots
+# =======================================================================
+#   Importable API behind asset-allocation-optimizer.py: nothing here
+#   touches matplotlib unless plot_allocation() is called, so it can be
+#   scheduled or run many times in one process (see batch-runner/).
+# =======================================================================
+
+from pathlib import Path
+
+import pandas as pd
+
+from allocator import rolling_backtest, performance_stats
+from market_data import yf_close          # cached yfinance closes, see market-data-store/
+from research_common.plotting import pyplot
+
+# ---------------------------- CONFIG -----------------------------------
+CONFIG = dict(
+    tickers   = ["SPY","TLT","GLD","EEM","QQQ"],
+    start     = "2015-01-01",
+    rf_annual = 0.015,
+    λ_risk    = 5,              # risk-aversion (↑ = more conservative)
+    λ_turn    = .01,            # turnover penalty weight
+    max_w     = 0.30,
+    esg_floor = 0.65,
+    esg       = {"SPY":0.70,"TLT":0.85,"GLD":0.75,"EEM":0.45,"QQQ":0.60},
+    lookback  = 252,            # 1-year window
+    step      = 21,             # monthly rebalance
+)
+
+
+def get_prices(tickers, start="2015-01-01"):
+    return yf_close(tickers, start)
+
+
+def run_allocation(prices=None, **overrides):
+    """
+    Runs the rolling ESG/turnover-constrained allocation backtest.
+
+    prices    : optional price DataFrame (default: cached closes of config tickers)
+    overrides : CONFIG keys, plus any extra rolling_backtest options
+                (estimator, risk_model, n_factors, problem, ...)
+
+    Returns dict with config, weights, pnl, timings, turnover (L1 per rebalance)
+    and stats (ann_ret, ann_vol, sharpe, turnover, turnover_cum).
+    """
+    cfg = {**CONFIG, **overrides}
+    if prices is None:
+        prices = get_prices(cfg["tickers"], cfg["start"])
+    rets = prices[cfg["tickers"]].pct_change().dropna()
+
+    extra = {k: v for k, v in cfg.items() if k not in CONFIG}
+    res = rolling_backtest(rets, pd.Series(cfg["esg"]),
+                           λ_risk=cfg["λ_risk"], λ_turn=cfg["λ_turn"], max_w=cfg["max_w"],
+                           esg_floor=cfg["esg_floor"], rf_daily=cfg["rf_annual"]/252,
+                           lookback=cfg["lookback"], step=cfg["step"], **extra)
+    return {
+        "config":   cfg,
+        "weights":  res["weights"],
+        "pnl":      res["pnl"],
+        "timings":  res["timings"],
+        "turnover": res["weights"].diff().abs().sum(axis=1),
+        "stats":    performance_stats(res),
+    }
+
+
+def summary(res):
+    """Console summary lines of a run_allocation result."""
+    s, t = res["stats"], res["timings"]
+    return [
+        f"Annualised Return : {s['ann_ret']:.2%}",
+        f"Annualised Vol    : {s['ann_vol']:.2%}",
+        f"Sharpe Ratio      : {s['sharpe']:.2f}",
+        f"Rebalances        : {len(t)}  (first compile {t['compile_s'].iloc[0]*1e3:.1f} ms)",
+        f"Per rebalance     : compile {t['compile_s'].iloc[1:].mean()*1e3:.2f} ms"
+        f" | solve {t['solve_s'].mean()*1e3:.2f} ms",
+    ]
+
+
+# ---------------------------- PLOTS ------------------------------------
+def plot_allocation(res, out_dir=None, show=False):
+    """
+    Cumulative return / rolling weights and turnover charts.
+
+    out_dir : save the two PNGs there
+    show    : open interactive windows instead of the non-interactive Agg backend
+
+    Returns the list of saved file paths.
+    """
+    plt = pyplot(show)
+    plt.style.use("seaborn-v0_8-whitegrid")
+
+    w_df, cum_val = res["weights"], (1 + res["pnl"]).cumprod()
+    weight_changes = res["turnover"]
+    turnover_cum   = weight_changes.cumsum()
+
+    fig, ax = plt.subplots(2,1,figsize=(11,8),gridspec_kw={'height_ratios':[2,1]})
+    cum_val.plot(ax=ax[0], lw=2, color="navy")
+    ax[0].set_title("Cumulative Return – Optimised Portfolio"); ax[0].set_ylabel("Growth of $1")
+
+    w_df.plot(kind="area", stacked=True, ax=ax[1], linewidth=0)
+    ax[1].set_title("Rolling Portfolio Weights"); ax[1].set_ylabel("Weight")
+    ax[1].legend(loc="upper left", ncol=5, fontsize=8, frameon=False)
+    fig.tight_layout()
+
+    fig2, ax2 = plt.subplots(1, 2, figsize=(12,3))
+    weight_changes.plot(ax=ax2[0], title="Turnover per Rebalance", lw=1.5)
+    turnover_cum.plot(ax=ax2[1], title="Cumulative Turnover", lw=1.5, color="darkred")
+    for a in ax2: a.set_ylabel("Weight Change"); a.grid(True)
+    fig2.tight_layout()
+
+    saved = []
+    if out_dir is not None:
+        out = Path(out_dir); out.mkdir(parents=True, exist_ok=True)
+        for f, name in [(fig, "optimized_portfolio_return.png"), (fig2, "turnover.png")]:
+            f.savefig(out/name, dpi=150); saved.append(out/name)
+    if show:
+        plt.show()
+    plt.close(fig); plt.close(fig2)
+    return saved
@@ -0,0 +1,209 @@
+# =====================  ALLOCATOR ENGINE  ==============================
+#   compiled-once CVXPY problem • warm-started rolling rebalance loop
+# =======================================================================
+#   Importable counterpart of asset-allocation-optimizer.py: the QP is
+#   canonicalised once and every rebalance only updates cp.Parameters.
+# =======================================================================
+
+import time
+import numpy as np, pandas as pd, cvxpy as cp
+from moments import make_estimator, estimate, pca_factor_model, fundamental_factor_model
+
+SOLVER      = cp.OSQP       # QP solver with warm-start support
+SOLVER_OPTS = dict(eps_abs=1e-9, eps_rel=1e-9, max_iter=200_000, polish=True)
+
+
+def cov_factor(cov):
+    """Returns F with Fᵀ F = Σ (Cholesky, or clipped eigen-factor if Σ is singular)."""
+    try:
+        return np.linalg.cholesky(cov).T
+    except np.linalg.LinAlgError:
+        vals, vecs = np.linalg.eigh(cov)
+        return np.sqrt(np.clip(vals, 0, None))[:, None] * vecs.T
+
+
+class AllocationProblem:
+    """
+    max  wᵀ(μ − r_f) − λ_risk·wᵀΣw − λ_turn·‖w − w_prev‖₁
+    s.t. Σw = 1, 0 ≤ w ≤ max_w, esgᵀw ≥ esg_floor, ‖w‖₁ ≤ 1.05
+
+    Compiled once. μ, the Σ factor, w_prev, ESG scores and all hyper-parameters are
+    cp.Parameters (λ_risk is folded into the factor as √λ_risk·F to stay DPP), so each
+    rebalance just sets values and warm-starts from the previous solution.
+
+    With `n_factors` the risk term uses a factor model Σ = BFBᵀ + D in low-rank form,
+    wᵀΣw = ‖L y‖² + ‖√D ∘ w‖² with exposures y = Bᵀw (Lᵀ L = F), so the QP grows with
+    n·k instead of n² and large universes stay tractable.
+    """
+
+    def __init__(self, n, n_factors=None, solver=SOLVER, solver_opts=None):
+        self.n, self.n_factors = n, n_factors
+        self.w      = cp.Variable(n)
+        self.turn   = cp.Variable(n, nonneg=True)       # |w − w_prev|
+        self.mu     = cp.Parameter(n)                   # excess expected return
+        self.w_prev = cp.Parameter(n)
+        self.esg    = cp.Parameter(n)
+        self.λ_turn = cp.Parameter(nonneg=True)
+        self.max_w  = cp.Parameter(nonneg=True)
+        self.esg_floor = cp.Parameter()
+
+        w = self.w
+        if n_factors is None:
+            self.risk_f = cp.Parameter((n, n))                  # √λ_risk · F,  Fᵀ F = Σ
+            risk, risk_cons = cp.sum_squares(self.risk_f @ w), []
+        else:
+            k = n_factors
+            self.y      = cp.Variable(k)                        # factor exposures Bᵀw
+            self.Bt     = cp.Parameter((k, n))
+            self.risk_f = cp.Parameter((k, k))                  # √λ_risk · L,  Lᵀ L = F
+            self.sqrt_d = cp.Parameter(n, nonneg=True)          # √(λ_risk · D)
+            risk = cp.sum_squares(self.risk_f @ self.y) + cp.sum_squares(cp.multiply(self.sqrt_d, w))
+            risk_cons = [self.y == self.Bt @ w]
+
+        obj = cp.Maximize(
+                w @ self.mu
+                - risk
+                - self.λ_turn * cp.sum(self.turn)
+              )
+        cons = [
+            cp.sum(w) == 1,
+            w >= 0,
+            w <= self.max_w,
+            self.esg @ w >= self.esg_floor,
+            cp.norm(w, 1) <= 1.05,
+            self.turn >= w - self.w_prev,
+            self.turn >= self.w_prev - w,
+        ] + risk_cons
+        self.problem = cp.Problem(obj, cons)
+        self.solver = solver
+        self.solver_opts = SOLVER_OPTS if solver_opts is None else solver_opts
+        self.n_solves = 0
+
+    def solve(self, mu_excess, risk, w_prev, esg, λ_risk, λ_turn, max_w, esg_floor):
+        """
+        Updates the parameters and re-solves. `risk` is an n×n factor F with Fᵀ F = Σ
+        (full mode) or a moments.FactorRisk (factor mode).
+
+        Returns (w_opt, stats) where stats holds compile_s (canonicalisation / parameter
+        mapping), solve_s (time inside the solver) and the solver status. If the solver does
+        not reach an optimal status the previous weights are kept.
+        """
+        self.mu.value     = mu_excess
+        if self.n_factors is None:
+            self.risk_f.value = np.sqrt(λ_risk) * risk
+        else:
+            self.Bt.value     = risk.B.T
+            self.risk_f.value = np.sqrt(λ_risk) * cov_factor(risk.F)
+            self.sqrt_d.value = np.sqrt(λ_risk * risk.d)
+        self.w_prev.value = w_prev
+        self.esg.value    = esg
+        self.λ_turn.value = λ_turn
+        self.max_w.value  = max_w
+        self.esg_floor.value = esg_floor
+
+        t0 = time.perf_counter()
+        self.problem.solve(solver=self.solver, warm_start=True, **self.solver_opts)
+        total = time.perf_counter() - t0
+        solve_s = self.problem.solver_stats.solve_time or 0.0
+        self.n_solves += 1
+
+        status = self.problem.status
+        w_opt = self.w.value if status in (cp.OPTIMAL, cp.OPTIMAL_INACCURATE) else np.asarray(w_prev)
+        return w_opt, {"compile_s": max(total - solve_s, 0.0), "solve_s": solve_s, "status": status}
+
+
+def rolling_backtest(rets, esg, λ_risk=5, λ_turn=.01, max_w=0.30, esg_floor=0.65,
+                     rf_daily=0.015/252, lookback=252, step=21, problem=None,
+                     estimator="sample", halflife=None,
+                     risk_model="full", n_factors=5, factor_rets=None):
+    """
+    Rolling mean–variance backtest (rebalance every `step` days on a `lookback` window).
+
+    rets : DataFrame of daily asset returns
+    esg  : Series of ESG scores indexed like rets.columns
+    problem : optional AllocationProblem to reuse (e.g. across parameter sweeps)
+    estimator : 'sample' (rolling window), 'ledoit_wolf' (shrunk rolling window) or
+                'ewma' (half-life `halflife` days, default lookback/4) – all updated
+                incrementally one day at a time, see moments.py
+    risk_model : 'full' (dense Σ), 'pca' (top `n_factors` statistical factors) or
+                 'fundamental' (loadings on `factor_rets`, a DataFrame of factor returns
+                 aligned with rets) – factor modes solve the low-rank QP
+
+    Returns dict with
+      weights  – DataFrame of weights per rebalance date
+      pnl      – Series of out-of-sample daily portfolio returns
+      timings  – DataFrame of compile_s / solve_s / status per rebalance
+    """
+    tickers = list(rets.columns)
+    n       = len(tickers)
+    R       = rets.to_numpy()
+    esg_v   = esg.reindex(tickers).to_numpy(dtype=float)
+    if risk_model == "fundamental":
+        if factor_rets is None:
+            raise ValueError("risk_model='fundamental' needs factor_rets")
+        F_rets    = factor_rets.reindex(rets.index).to_numpy()
+        n_factors = F_rets.shape[1]
+        R_joint   = np.hstack([R, F_rets])              # moments of [assets, factors]
+    elif risk_model in ("full", "pca"):
+        if risk_model == "pca" and not 1 <= n_factors <= n:
+            raise ValueError(f"risk_model='pca' needs 1 <= n_factors <= {n} assets, got {n_factors}")
+        R_joint   = R
+    else:
+        raise ValueError(f"Unknown risk model: {risk_model}")
+    k_model = None if risk_model == "full" else n_factors
+    if problem is not None and (problem.n, problem.n_factors) != (n, k_model):
+        raise ValueError(f"problem was compiled for n={problem.n}, n_factors={problem.n_factors}; "
+                         f"risk_model={risk_model!r} needs n={n}, n_factors={k_model}")
+    prob    = problem if problem is not None else AllocationProblem(n, n_factors=k_model)
+
+    reb_pos = np.arange(lookback, len(rets), step)
+    w_prev  = np.repeat(1/n, n)
+    w_hist, port_ret, timings = [], [], []
+
+    engine = make_estimator(estimator, R_joint.shape[1], lookback, halflife)
+    fed    = 0 if estimator == "ewma" else max(reb_pos[0] - lookback + 1, 0) if len(reb_pos) else 0
+
+    for i, p in enumerate(reb_pos):
+        for t in range(fed, p + 1):                 # O(n²) per new day
+            engine.update(R_joint[t])
+        fed = p + 1
+        mu, cov = estimate(engine, estimator)       # expected return vector, Σ
+
+        if risk_model == "full":
+            risk = cov_factor(cov)
+        elif risk_model == "pca":
+            risk = pca_factor_model(cov, n_factors)
+        else:
+            risk = fundamental_factor_model(cov, n)
+
+        w_opt, stats = prob.solve(mu[:n] - rf_daily, risk, w_prev, esg_v,
+                                  λ_risk, λ_turn, max_w, esg_floor)
+        d = rets.index[p]
+        w_hist.append(pd.Series(w_opt, index=tickers, name=d))
+        timings.append(pd.Series(stats, name=d))
+
+        # out-of-sample segment
+        nxt = reb_pos[i+1] if i < len(reb_pos)-1 else len(rets) - 1
+        port_ret.append(pd.Series(R[p+1:nxt+1] @ w_opt, index=rets.index[p+1:nxt+1]))
+        w_prev = w_opt.copy()
+
+    return {
+        "weights": pd.concat(w_hist, axis=1).T,
+        "pnl":     pd.concat(port_ret).sort_index(),
+        "timings": pd.DataFrame(timings),
+    }
+
+
+def performance_stats(res, periods=252):
+    """Annualised return / vol / Sharpe and turnover of a rolling_backtest result."""
+    pnl, w_df = res["pnl"], res["weights"]
+    ann_ret = pnl.mean() * periods
+    ann_vol = pnl.std() * np.sqrt(periods)
+    turn    = w_df.diff().abs().sum(axis=1)     # L1 weight change per rebalance
+    return {
+        "ann_ret":       ann_ret,
+        "ann_vol":       ann_vol,
+        "sharpe":        ann_ret / ann_vol if ann_vol > 0 else np.nan,
+        "turnover":      turn.mean(),
+        "turnover_cum":  turn.sum(),
+    }
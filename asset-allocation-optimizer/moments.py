@@ -0,0 +1,194 @@
+# =====================  ROLLING MOMENT ENGINE  =========================
+#   incremental mean / Σ • EWMA • Ledoit-Wolf shrinkage • factor Σ
+# =======================================================================
+#   Every update is O(n²) (one outer product in, one out) and mean/Σ can
+#   be read at any step in O(n²), instead of re-slicing the window and
+#   recomputing window.mean()/window.cov() in O(lookback·n²).
+# =======================================================================
+
+from collections import namedtuple
+
+import numpy as np
+from scipy.linalg import eigh
+
+
+class RollingMoments:
+    """
+    Fixed-length rolling window of return vectors with add/remove updates.
+
+    Maintains Σx, Σxxᵀ plus the scalar/vector accumulators Ledoit-Wolf needs
+    (Σ‖x‖², Σ‖x‖⁴, Σ‖x‖²x). Sums are rebuilt from the ring buffer every
+    `refresh_every` updates to keep floating-point drift bounded.
+    """
+
+    def __init__(self, n, window, refresh_every=None):
+        self.n, self.window = n, window
+        self.refresh_every = refresh_every or 4 * window
+        self.buf   = np.zeros((window, n))
+        self.count = 0                  # rows currently in the window
+        self.head  = 0                  # next slot to overwrite
+        self.n_upd = 0
+        self._reset_sums()
+
+    def _reset_sums(self):
+        n = self.n
+        self.s1  = np.zeros(n)          # Σ x
+        self.s2  = np.zeros((n, n))     # Σ x xᵀ
+        self.q   = np.zeros(n)          # Σ ‖x‖² x
+        self.a4  = 0.0                  # Σ ‖x‖⁴
+
+    def _add(self, x, sign):
+        nx2 = x @ x
+        self.s1 += sign * x
+        self.s2 += sign * np.outer(x, x)
+        self.q  += sign * nx2 * x
+        self.a4 += sign * nx2 * nx2
+
+    def _refresh(self):
+        rows = self.rows()
+        nx2  = np.einsum("ij,ij->i", rows, rows)
+        self.s1 = rows.sum(axis=0)
+        self.s2 = rows.T @ rows
+        self.q  = nx2 @ rows
+        self.a4 = float(nx2 @ nx2)
+
+    @property
+    def ready(self):
+        return self.count == self.window
+
+    def rows(self):
+        """Window contents in chronological order."""
+        if self.count < self.window:
+            return self.buf[:self.count]
+        return np.roll(self.buf, -self.head, axis=0)
+
+    def update(self, x):
+        """Adds one return vector, dropping the oldest once the window is full."""
+        x = np.asarray(x, dtype=float)
+        if self.count == self.window:
+            self._add(self.buf[self.head], -1.0)
+        else:
+            self.count += 1
+        self.buf[self.head] = x
+        self._add(x, 1.0)
+        self.head = (self.head + 1) % self.window
+
+        self.n_upd += 1
+        if self.n_upd % self.refresh_every == 0:
+            self._refresh()
+
+    def mean(self):
+        return self.s1 / self.count
+
+    def cov(self, ddof=1):
+        T, m = self.count, self.mean()
+        return (self.s2 - T * np.outer(m, m)) / (T - ddof)
+
+    def ledoit_wolf(self):
+        """
+        Ledoit-Wolf (2004) shrinkage of the (biased) sample Σ towards μ·I, computed from
+        the running accumulators — same result as sklearn.covariance.ledoit_wolf on the window.
+
+        Returns (shrunk Σ, shrinkage intensity).
+        """
+        T, n, m = self.count, self.n, self.mean()
+        emp = self.s2 / T - np.outer(m, m)              # biased sample Σ
+        tr  = np.trace(emp)
+        mu  = tr / n
+
+        # Σ_t ‖x_t − m‖⁴ expanded in raw accumulators
+        a_sum = np.trace(self.s2)                       # Σ ‖x‖²
+        b_sum = m @ self.s1                             # Σ m·x
+        c     = m @ m
+        beta_ = (self.a4 - 4 * m @ self.q + 4 * m @ self.s2 @ m
+                 + 2 * c * a_sum - 4 * c * b_sum + T * c * c)
+
+        delta_ = np.sum(emp ** 2)
+        beta   = (beta_ / T - delta_) / (n * T)
+        delta  = (delta_ - 2 * mu * tr + n * mu ** 2) / n
+        beta   = min(beta, delta)
+        shrink = 0.0 if beta == 0 else beta / delta
+
+        out = (1 - shrink) * emp
+        out.flat[::n + 1] += shrink * mu
+        return out, shrink
+
+
+class EWMAMoments:
+    """
+    Exponentially weighted mean / Σ with decay λ (or a half-life in observations).
+
+    Equivalent to pandas ewm(alpha=1−λ, adjust=True) mean and bias=True covariance.
+    """
+
+    def __init__(self, n, halflife=None, decay=None):
+        if decay is None:
+            if halflife is None:
+                raise ValueError("EWMAMoments needs a halflife or a decay")
+            decay = 0.5 ** (1 / halflife)
+        self.n, self.decay = n, decay
+        self.w  = 0.0                   # Σ λᵏ
+        self.s1 = np.zeros(n)           # Σ λᵏ x
+        self.s2 = np.zeros((n, n))      # Σ λᵏ x xᵀ
+        self.count = 0
+
+    def update(self, x):
+        x = np.asarray(x, dtype=float)
+        λ = self.decay
+        self.w  = λ * self.w + 1.0
+        self.s1 = λ * self.s1 + x
+        self.s2 *= λ
+        self.s2 += np.outer(x, x)
+        self.count += 1
+
+    def mean(self):
+        return self.s1 / self.w
+
+    def cov(self):
+        m = self.mean()
+        return self.s2 / self.w - np.outer(m, m)
+
+
+def make_estimator(kind, n, lookback, halflife=None):
+    """Factory for rolling_backtest: 'sample', 'ledoit_wolf' or 'ewma'."""
+    if kind in ("sample", "ledoit_wolf"):
+        return RollingMoments(n, lookback)
+    if kind == "ewma":
+        return EWMAMoments(n, halflife=halflife or lookback / 4)
+    raise ValueError(f"Unknown moment estimator: {kind}")
+
+
+def estimate(engine, kind):
+    """Returns (μ, Σ) from an engine according to the estimator kind."""
+    if kind == "ledoit_wolf":
+        return engine.mean(), engine.ledoit_wolf()[0]
+    return engine.mean(), engine.cov()
+
+
+# ---------------------------- FACTOR MODELS ----------------------------
+#   Σ = B F Bᵀ + D  (B: n×k loadings, F: k×k factor Σ, D: diagonal specific var)
+
+FactorRisk = namedtuple("FactorRisk", "B F d")
+
+D_FLOOR = 1e-10     # keep specific variances strictly positive
+
+
+def pca_factor_model(cov, k):
+    """Statistical factor model: top-k eigenpairs of Σ as factors, residual diagonal as D."""
+    n = cov.shape[0]
+    vals, vecs = eigh(cov, subset_by_index=[n - k, n - 1])
+    vals = np.clip(vals, 0, None)
+    d = np.diag(cov) - np.einsum("ij,j,ij->i", vecs, vals, vecs)
+    return FactorRisk(vecs, np.diag(vals), np.clip(d, D_FLOOR, None))
+
+
+def fundamental_factor_model(joint_cov, n):
+    """
+    Fundamental / macro factor model from the joint Σ of [asset returns, factor returns]
+    (assets first): B = Σ_af Σ_ff⁻¹, F = Σ_ff, D = diag(Σ_aa − B Σ_ff Bᵀ).
+    """
+    S_af = joint_cov[:n, n:]
+    S_ff = joint_cov[n:, n:]
+    B = np.linalg.solve(S_ff, S_af.T).T
+    d = np.diag(joint_cov)[:n] - np.einsum("ij,ij->i", B @ S_ff, B)
+    return FactorRisk(B, S_ff, np.clip(d, D_FLOOR, None))
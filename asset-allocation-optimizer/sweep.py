@@ -0,0 +1,102 @@
+# =====================  PARALLEL PARAMETER SWEEP  ======================
+#   λ_risk × λ_turn × max_w × ESG-floor grid • process pool • frontier
+# =======================================================================
+#   Returns are placed in shared memory once; every worker attaches to
+#   them zero-copy and keeps its own compiled AllocationProblem, which it
+#   reuses for all of its grid points (the hyper-parameters are
+#   cp.Parameters, so nothing is recompiled between configurations).
+# =======================================================================
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np, pandas as pd
+
+from allocator import AllocationProblem, rolling_backtest, performance_stats
+
+GRID_KEYS = ("λ_risk", "λ_turn", "max_w", "esg_floor")
+
+_worker = {}        # per-process state: shared returns, ESG, compiled problems
+
+
+def _model_factors(fixed):
+    """n_factors the compiled problem needs for the fixed rolling_backtest options."""
+    risk_model = fixed.get("risk_model", "full")
+    if risk_model == "full":
+        return None
+    if risk_model == "fundamental":
+        return fixed["factor_rets"].shape[1]
+    return fixed.get("n_factors", 5)
+
+
+def _init_worker(shm_name, shape, dtype, index, columns, esg, fixed):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    R   = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _worker.update(
+        shm=shm,                                            # keep the mapping alive
+        rets=pd.DataFrame(R, index=index, columns=columns, copy=False),
+        esg=esg, fixed=fixed,
+        problem=AllocationProblem(shape[1], n_factors=_model_factors(fixed)),
+    )
+
+
+def _run_one(config):
+    res = rolling_backtest(_worker["rets"], _worker["esg"], problem=_worker["problem"],
+                           **_worker["fixed"], **config)
+    return {**config, **performance_stats(res)}
+
+
+def param_grid(**axes):
+    """Cartesian product of the given axes, e.g. param_grid(λ_risk=[1, 5], max_w=[.2, .3])."""
+    unknown = set(axes) - set(GRID_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    keys = list(axes)
+    return [dict(zip(keys, vals)) for vals in itertools.product(*(axes[k] for k in keys))]
+
+
+def run_sweep(rets, esg, grid, processes=None, **backtest_kwargs):
+    """
+    Runs the full rolling backtest for every configuration in `grid` across a process pool.
+
+    rets, esg : as for rolling_backtest
+    grid      : list of dicts with any of λ_risk, λ_turn, max_w, esg_floor (see param_grid)
+    processes : pool size (default: os.cpu_count())
+    backtest_kwargs : fixed rolling_backtest options (lookback, step, estimator, risk_model, ...)
+
+    Returns a DataFrame with one row per configuration: the grid values plus
+    ann_ret, ann_vol, sharpe, turnover (mean per rebalance) and turnover_cum.
+    """
+    R   = np.ascontiguousarray(rets.to_numpy(dtype=float))
+    shm = shared_memory.SharedMemory(create=True, size=R.nbytes)
+    try:
+        np.ndarray(R.shape, dtype=R.dtype, buffer=shm.buf)[:] = R
+        init_args = (shm.name, R.shape, R.dtype, rets.index, rets.columns, esg, backtest_kwargs)
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=init_args) as pool:
+            rows = list(pool.map(_run_one, grid))
+    finally:
+        shm.close()
+        shm.unlink()
+    return pd.DataFrame(rows)
+
+
+def efficient_frontier(results, along="λ_risk"):
+    """
+    Frontier curves from a sweep: for each combination of the other grid parameters,
+    the (ann_vol, ann_ret) points ordered along `along`, with a flag marking the
+    non-dominated (Pareto-efficient) points across the whole sweep.
+
+    Returns a DataFrame indexed by the other grid parameters.
+    """
+    others = [k for k in GRID_KEYS if k in results.columns and k != along]
+    out = results.sort_values(others + [along]).copy()
+
+    # efficient = no other point with higher-or-equal return at lower-or-equal vol
+    by_vol = out.sort_values(["ann_vol", "ann_ret"], ascending=[True, False])
+    best   = by_vol["ann_ret"].cummax().shift(fill_value=-np.inf)
+    out["efficient"] = (by_vol["ann_ret"] > best).reindex(out.index)
+
+    cols = [along, "ann_vol", "ann_ret", "sharpe", "turnover", "efficient"]
+    return out.set_index(others)[cols] if others else out[cols]
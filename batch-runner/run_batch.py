@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Headless batch runner for the research projects
+-------------------------------------------------
+Runs many configurations of the allocation, macro-hedge, swap and yield-curve
+pipelines in one warm interpreter: modules are imported once, market data comes
+from the shared store (memoised in-process after the first job), and matplotlib
+is only imported – with the non-interactive Agg backend – when plots are requested.
+
+    python run_batch.py jobs.example.json --out batch_out [--plot] [--offline]
+
+Jobs file: JSON list of {"name": ..., "task": ..., "params": {...}} where task is
+one of TASKS and params are keyword arguments of the task's run function.
+Every job's results dict is pickled to <out>/<name>.pkl and the scalar stats of
+all jobs are collected in <out>/summary.csv.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import pickle
+import sys
+import time
+import traceback
+from pathlib import Path
+
+os.environ.setdefault("MPLBACKEND", "Agg")     # never open a GUI, even if a task plots
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# task → (project folder, module, run function, plot function, plot-target keyword)
+TASKS = {
+    "allocation":  ("asset-allocation-optimizer", "allocation",  "run_allocation", "plot_allocation",  "out_dir"),
+    "macro_hedge": ("dynamic-macro-hedge",        "macro_hedge", "run_hedge",      "plot_hedge",       "fig_dir"),
+    "swap":        ("interest-rate-swap-pricer",  "swap_pricer", "run_swap",       "plot_pv_vs_shift", "fname"),
+    "yield_curve": ("yield-curve-model",          "yield_curve", "run_curve",      "plot_results",     "out_dir"),
+}
+
+
+def load_task(task):
+    """(run, plot, plot keyword) of a task, importing its module on first use."""
+    folder, module, run_fn, plot_fn, plot_kw = TASKS[task]
+    path = str(ROOT / folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    mod = importlib.import_module(module)
+    return getattr(mod, run_fn), getattr(mod, plot_fn), plot_kw
+
+
+def scalar_stats(res):
+    """Flat dict of the scalar results of a job (its `stats` dict plus top-level scalars)."""
+    out = {k: v for k, v in res.items() if isinstance(v, (int, float))}
+    out.update({k: v for k, v in res.get("stats", {}).items() if isinstance(v, (int, float))})
+    out.update({k: v for k, v in res.get("params", {}).items() if isinstance(v, (int, float))})
+    return out
+
+
+def run_jobs(jobs, out_dir=None, plot=False):
+    """
+    Runs jobs sequentially in this process.
+
+    jobs    : list of {"name", "task", "params"} dicts
+    out_dir : if given, pickles each result and writes summary.csv there
+    plot    : also save each job's charts under <out_dir>/<name>/
+
+    Returns (results dict name → results, summary DataFrame).
+    """
+    import pandas as pd
+
+    out = Path(out_dir) if out_dir is not None else None
+    if out is not None:
+        out.mkdir(parents=True, exist_ok=True)
+
+    results, rows = {}, []
+    for job in jobs:
+        name, task, params = job["name"], job["task"], job.get("params", {})
+        row = {"name": name, "task": task}
+        t0 = time.perf_counter()
+        try:
+            run, plot_fn, plot_kw = load_task(task)
+            res = run(**params)
+            results[name] = res
+            row.update(scalar_stats(res))
+            if out is not None:
+                with open(out / f"{name}.pkl", "wb") as f:
+                    pickle.dump(res, f)
+                if plot:
+                    target = out / name
+                    target.mkdir(exist_ok=True)
+                    if plot_kw == "fname":
+                        target = target / "plot.png"
+                    plot_fn(res, **{plot_kw: str(target)})
+            row["status"] = "ok"
+        except Exception as exc:
+            row["status"] = f"error: {exc}"
+            traceback.print_exc()
+        row["seconds"] = time.perf_counter() - t0
+        rows.append(row)
+        print(f"[{row['status']:>5.5}] {name:<24} {task:<12} {row['seconds']:7.2f}s")
+
+    summary = pd.DataFrame(rows).set_index("name")
+    if out is not None:
+        summary.to_csv(out / "summary.csv")
+    return results, summary
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("jobs", help="JSON jobs file")
+    ap.add_argument("--out", default="batch_out", help="output directory")
+    ap.add_argument("--plot", action="store_true", help="save charts (Agg backend)")
+    ap.add_argument("--offline", action="store_true", help="serve market data from the local store only")
+    args = ap.parse_args(argv)
+
+    if args.offline:
+        os.environ["MARKET_DATA_OFFLINE"] = "1"
+    with open(args.jobs) as f:
+        jobs = json.load(f)
+    _, summary = run_jobs(jobs, args.out, args.plot)
+    print(summary.to_string())
+
+
+if __name__ == "__main__":
+    main()
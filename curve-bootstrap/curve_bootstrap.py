@@ -0,0 +1,62 @@
+"""
+Curve Bootstrapper – shared by the swap pricer and the yield-curve model
+------------------------------------------------------------------------
+Bootstraps discount factors from a whole (dates × tenors) panel of par yields
+at once: the recursion runs over the 11 tenors, every step vectorised across
+all dates.
+
+    disc = bootstrap_panel(par, convention="treasury")   # DataFrame dates × tenors
+    zc   = zero_rates(disc)
+
+Conventions (ACT/365, semi-annual coupons):
+    tenors with T ≤ bill_max are bills:   DF = 1 / (1 + y·T)
+    longer tenors pay c = y / 2 on the preceding knots:
+                                          DF_i = (1 − c·Σ_{j<i} DF_j) / (1 + c)
+"""
+
+import numpy as np, pandas as pd
+
+TENORS_YRS = np.array([1/12, 3/12, 6/12, 1, 2, 3, 5, 7, 10, 20, 30])
+
+CONVENTIONS = {
+    "swap":     {"bill_max": 0.5, "freq": 2},    # interest-rate-swap-pricer: 1M–6M are bills
+    "treasury": {"bill_max": 1.0, "freq": 2},    # yield-curve-model: 1M–1Y are bills
+}
+
+
+def bootstrap_panel(par, tenors=TENORS_YRS, convention="swap"):
+    """
+    Discount factors for every row of `par`.
+
+    par        : par yields in decimal; DataFrame (dates × tenors), Series (one curve)
+                 or array (..., n_tenors)
+    convention : key of CONVENTIONS or a dict with bill_max, freq
+
+    Returns DFs with the same shape / labels as `par` (NaN yields give NaN DFs).
+    """
+    conv = CONVENTIONS[convention] if isinstance(convention, str) else convention
+    T = np.asarray(tenors, dtype=float)
+    y = np.asarray(par, dtype=float)
+    if y.shape[-1] != len(T):
+        raise ValueError(f"Expected {len(T)} tenors, got {y.shape[-1]}")
+
+    bill = T <= conv["bill_max"]
+    c    = np.where(bill, 0.0, y / conv["freq"])
+    disc = np.empty_like(y)
+    disc[..., bill] = 1 / (1 + y[..., bill] * T[bill])
+    cum = np.zeros(y.shape[:-1])                     # Σ DF of the preceding knots
+    for i in range(len(T)):
+        if not bill[i]:
+            disc[..., i] = (1 - c[..., i] * cum) / (1 + c[..., i])
+        cum = cum + disc[..., i]
+
+    if isinstance(par, pd.DataFrame):
+        return pd.DataFrame(disc, index=par.index, columns=par.columns)
+    if isinstance(par, pd.Series):
+        return pd.Series(disc, index=par.index, name="DF")
+    return disc
+
+
+def zero_rates(disc, tenors=TENORS_YRS):
+    """Annually compounded zero rates DF^(−1/T) − 1 (same shape / labels as `disc`)."""
+    return disc ** (-1 / np.asarray(tenors, dtype=float)) - 1
@@ -16,18 +16,31 @@
 // 3,0.038,0.04,0.24,0.5
 // -------------------------------------------------
 // Build:
-//    g++ -std=c++17 derivative_pricer.cpp -o pricer
+//    g++ -std=c++17 -O2 -pthread derivative_pricer.cpp -o pricer
 // Run:
-//    ./pricer market_data.csv
+//    ./pricer market_data.csv                      # CSV to stdout
+//    ./pricer big.csv -o prices.csv --threads 8    # optional flags
+//
+// The caplet block is streamed in chunks (--chunk-mb, default 4): each chunk is
+// parsed, priced and formatted on its own thread and written out in file order.
+// Rows/second go to stderr.
 // ---------------------------------------------------------------------------
 
 #include <iostream>
 #include <fstream>
 #include <sstream>
 #include <vector>
+#include <deque>
+#include <future>
+#include <thread>
+#include <chrono>
+#include <charconv>
 #include <cmath>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <cstdint>
 #include <algorithm>
-#include <iomanip>
 #include <stdexcept>
 
 // ---------------- std‑normal PDF & CDF ------------------------------------
@@ -37,70 +50,200 @@ inline double n_pdf(double x){ return INV_SQRT2PI*std::exp(-0.5*x*x);}
 inline double n_cdf(double x){ return 0.5*std::erfc(-x/SQRT_2);}
 
 // ---------------- Basic structs -------------------------------------------
-struct DiscCurve{ std::vector<double> t, df; double operator()(double T) const;};
+// log‑DFs and per‑segment slopes are precomputed: a lookup is one exp
+struct DiscCurve{
+    std::vector<double> t, log_df, slope;
+    void add(double m,double z){ t.push_back(m); log_df.push_back(-z*m); }
+    void finish();
+    double operator()(double T) const;
+};
 struct Caplet   { double T,F,K,sigma,tau; };
+struct CapletRisk{ double price,delta,vega; };
 
+void DiscCurve::finish(){
+    slope.resize(t.size());
+    for(size_t i=0;i+1<t.size();++i) slope[i]=(log_df[i+1]-log_df[i])/(t[i+1]-t[i]);
+}
 double DiscCurve::operator()(double T) const{
-    if(T<=t.front()) return df.front();
-    if(T>=t.back())  return df.back();
+    if(T<=t.front()) return std::exp(log_df.front());
+    if(T>=t.back())  return std::exp(log_df.back());
     size_t i = std::upper_bound(t.begin(),t.end(),T)-t.begin()-1;
-    double w = (T-t[i])/(t[i+1]-t[i]);
-    return std::exp(std::log(df[i])+w*(std::log(df[i+1])-std::log(df[i])));
+    return std::exp(log_df[i]+(T-t[i])*slope[i]);
 }
 
-// ---------------- File loader ---------------------------------------------
-void load_market_file(const std::string& file, DiscCurve& curve, std::vector<Caplet>& caps){
+// ---------------- Curve loader --------------------------------------------
+// Reads the curve section; returns the byte offset where the caplet rows start.
+std::streamoff load_curve(const std::string& file, DiscCurve& curve){
     std::ifstream fin(file);
     if(!fin) throw std::runtime_error("Cannot open file: "+file);
-    std::string line; bool reading_curve=true;
+    std::string line;
+    std::streamoff caplets=-1;
     while(std::getline(fin,line)){
         if(line.empty()) continue;                      // skip blanks
         if(line[0]=='#') continue;                      // skip comments
-        // detect second header → switch to caplets
-        if(line.rfind("T",0)==0){ reading_curve=false; continue; }
+        // detect second header → caplets follow
+        if(line.rfind("T",0)==0){ caplets=fin.tellg(); break; }
         std::replace(line.begin(),line.end(),',',' ');
         std::istringstream ss(line);
-        if(reading_curve){
-            double m,z; ss>>m>>z;
-            if(ss){ curve.t.push_back(m); curve.df.push_back(std::exp(-z*m)); }
-        }else{
-            Caplet c; ss>>c.T>>c.F>>c.K>>c.sigma>>c.tau;
-            if(ss) caps.push_back(c);
-        }
+        double m,z; ss>>m>>z;
+        if(ss) curve.add(m,z);
     }
     if(curve.t.size()<2) throw std::runtime_error("Curve section missing or too short");
-    if(caps.empty())      throw std::runtime_error("Caplet section missing");
+    if(caplets<0)         throw std::runtime_error("Caplet section missing");
+    curve.finish();
+    return caplets;
+}
+
+// ---------------- Fast row parsing ----------------------------------------
+inline bool is_sep(char c){ return c==','||c==' '||c=='\t'||c=='\r'; }
+
+// One decimal field [p, e). Clinger's fast path (≤19 digits, exact when the
+// mantissa < 2^53 and |exponent| ≤ 22); anything else goes through strtod.
+bool parse_double(const char* p,const char* e,double& out){
+    static const double POW10[]={1e0,1e1,1e2,1e3,1e4,1e5,1e6,1e7,1e8,1e9,1e10,1e11,
+                                 1e12,1e13,1e14,1e15,1e16,1e17,1e18,1e19,1e20,1e21,1e22};
+    const char* s=p; bool neg=false;
+    if(s<e&&(*s=='-'||*s=='+')) neg=*s++=='-';
+    uint64_t mant=0; int digits=0, exp10=0; bool any=false, cut=false;
+    for(;s<e&&unsigned(*s-'0')<10;++s,any=true){
+        if(digits<19){ mant=mant*10+unsigned(*s-'0'); if(mant) ++digits; } else{ ++exp10; cut|=*s!='0'; }
+    }
+    if(s<e&&*s=='.'){
+        for(++s;s<e&&unsigned(*s-'0')<10;++s,any=true)
+            if(digits<19){ mant=mant*10+unsigned(*s-'0'); if(mant) ++digits; --exp10; } else cut|=*s!='0';
+    }
+    if(any&&s<e&&(*s=='e'||*s=='E')){
+        const char* q=s+1; bool eneg=false; int x=0;
+        if(q<e&&(*q=='-'||*q=='+')) eneg=*q++=='-';
+        if(q<e&&unsigned(*q-'0')<10){
+            for(;q<e&&unsigned(*q-'0')<10;++q) if(x<100000) x=x*10+(*q-'0');
+            exp10+=eneg?-x:x; s=q;
+        }
+    }
+    if(any&&!cut&&s==e&&mant<(uint64_t(1)<<53)&&exp10>=-22&&exp10<=22){
+        double v=double(mant);
+        v=exp10<0?v/POW10[-exp10]:v*POW10[exp10];
+        out=neg?-v:v; return true;
+    }
+    char buf[128]; size_t n=size_t(e-p);                // rare: long mantissas, nan, inf…
+    if(n==0||n>=sizeof buf) return false;
+    std::memcpy(buf,p,n); buf[n]='\0';
+    char* end; out=std::strtod(buf,&end);
+    return end==buf+n;
+}
+
+// Five fields separated by commas / blanks; anything after them is ignored.
+bool parse_caplet(const char* p,const char* e,Caplet& c){
+    double* f[]={&c.T,&c.F,&c.K,&c.sigma,&c.tau};
+    for(double* v:f){
+        while(p<e&&is_sep(*p)) ++p;
+        const char* q=p; while(q<e&&!is_sep(*q)) ++q;
+        if(q==p||!parse_double(p,q,*v)) return false;
+        p=q;
+    }
+    return true;
 }
 
 // ---------------- Black caplet pricer -------------------------------------
-double price_caplet(const DiscCurve& curve,const Caplet& c){
-    double sd=c.sigma*std::sqrt(c.T);
+// price, delta and vega in one pass (shared sd, d1 and discounting)
+CapletRisk price_caplet(const DiscCurve& curve,const Caplet& c){
+    double sqrtT=std::sqrt(c.T);
+    double sd=c.sigma*sqrtT;
     double d1=(std::log(c.F/c.K)+0.5*sd*sd)/sd;
     double d2=d1-sd;
-    double df=curve(c.T);
-    return df*c.tau*(c.F*n_cdf(d1)-c.K*n_cdf(d2));
+    double a=curve(c.T)*c.tau;
+    double nd1=n_cdf(d1);
+    return {a*(c.F*nd1-c.K*n_cdf(d2)), a*nd1, a*c.F*sqrtT*n_pdf(d1)};
 }
-void greeks(const DiscCurve& curve,const Caplet& c,double& delta,double& vega){
-    double sd=c.sigma*std::sqrt(c.T);
-    double d1=(std::log(c.F/c.K)+0.5*sd*sd)/sd;
-    double df=curve(c.T);
-    delta=df*c.tau*n_cdf(d1);
-    vega =df*c.tau*c.F*std::sqrt(c.T)*n_pdf(d1);
+
+// ---------------- Chunk worker --------------------------------------------
+struct Block{ std::string csv; size_t rows=0; };
+
+inline void put_fixed(std::string& out,double v,char sep){
+    char buf[400];                                      // fixed notation of any double fits
+    auto r=std::to_chars(buf,buf+sizeof buf,v,std::chars_format::fixed,6);
+    out.append(buf,r.ptr); out.push_back(sep);
+}
+
+// Prices every caplet line of [p, e) (whole lines only) into a CSV block.
+Block price_block(const DiscCurve& curve,const char* p,const char* e){
+    Block b; b.csv.reserve(size_t(e-p)*3);
+    while(p<e){
+        const char* nl=static_cast<const char*>(std::memchr(p,'\n',size_t(e-p)));
+        const char* le=nl?nl:e;
+        Caplet c;
+        // blanks, comments and repeated headers are skipped, as in the curve section
+        if(le>p&&*p!='#'&&*p!='T'&&*p!='\r'&&parse_caplet(p,le,c)){
+            CapletRisk r=price_caplet(curve,c);
+            put_fixed(b.csv,c.T,','); put_fixed(b.csv,c.F,','); put_fixed(b.csv,c.K,',');
+            put_fixed(b.csv,c.sigma,','); put_fixed(b.csv,c.tau,',');
+            put_fixed(b.csv,r.price,','); put_fixed(b.csv,r.delta,','); put_fixed(b.csv,r.vega,'\n');
+            ++b.rows;
+        }
+        p=le+1;
+    }
+    return b;
 }
 
 // ---------------- Main -----------------------------------------------------
 int main(int argc,char**argv){
-    if(argc!=2){ std::cerr<<"Usage: ./pricer market_data.csv\n"; return 1; }
+    std::string in, out;
+    unsigned threads=std::max(1u,std::thread::hardware_concurrency());
+    size_t chunk=size_t(4)<<20;
+    for(int i=1;i<argc;++i){
+        std::string a=argv[i];
+        if(a=="-o"&&i+1<argc)               out=argv[++i];
+        else if(a=="--threads"&&i+1<argc)   threads=unsigned(std::max(1,std::atoi(argv[++i])));
+        else if(a=="--chunk-mb"&&i+1<argc)  chunk=size_t(std::max(1,std::atoi(argv[++i])))<<20;
+        else if(in.empty()&&a[0]!='-')      in=a;
+        else{ in.clear(); break; }
+    }
+    if(in.empty()){ std::cerr<<"Usage: ./pricer market_data.csv [-o out.csv] [--threads N] [--chunk-mb M]\n"; return 1; }
     try{
-        DiscCurve curve; std::vector<Caplet> caps;
-        load_market_file(argv[1], curve, caps);
-        std::cout<<"T,F,K,sigma,tau,Price,Delta,Vega\n";
-        std::cout<<std::fixed<<std::setprecision(6);
-        for(const auto& c:caps){
-            double delta,vega; double px=price_caplet(curve,c); greeks(curve,c,delta,vega);
-            std::cout<<c.T<<","<<c.F<<","<<c.K<<","<<c.sigma<<","<<c.tau
-                     <<","<<px<<","<<delta<<","<<vega<<"\n";
+        auto t0=std::chrono::steady_clock::now();
+        DiscCurve curve;
+        std::streamoff start=load_curve(in, curve);
+
+        std::FILE* fin=std::fopen(in.c_str(),"rb");
+        if(!fin||std::fseek(fin,long(start),SEEK_SET)!=0) throw std::runtime_error("Cannot open file: "+in);
+        std::FILE* fout=out.empty()?stdout:std::fopen(out.c_str(),"wb");
+        if(!fout) throw std::runtime_error("Cannot open output: "+out);
+
+        // at most `threads` chunks in flight; blocks are written in file order
+        std::deque<std::future<Block>> inflight;
+        size_t rows=0, bytes=0; bool header=false;
+        auto flush_one=[&]{
+            Block b=inflight.front().get(); inflight.pop_front();
+            if(b.rows&&!header){ std::fputs("T,F,K,sigma,tau,Price,Delta,Vega\n",fout); header=true; }
+            std::fwrite(b.csv.data(),1,b.csv.size(),fout);
+            rows+=b.rows;
+        };
+        std::string carry;
+        for(bool eof=false;!eof;){
+            std::string buf=std::move(carry);
+            size_t have=buf.size();
+            buf.resize(have+chunk);
+            size_t n=std::fread(&buf[have],1,chunk,fin);
+            buf.resize(have+n); bytes+=n;
+            eof=n<chunk;
+            size_t cut=eof?buf.size():buf.rfind('\n');
+            if(cut==std::string::npos){ carry=std::move(buf); continue; }   // line longer than a chunk
+            if(!eof) ++cut;
+            carry.assign(buf,cut,std::string::npos); buf.resize(cut);
+            if(buf.empty()) continue;
+            if(inflight.size()>=threads) flush_one();
+            inflight.push_back(std::async(std::launch::async,[&curve,b=std::move(buf)]{
+                return price_block(curve,b.data(),b.data()+b.size());
+            }));
         }
+        while(!inflight.empty()) flush_one();
+        std::fclose(fin);
+        if(fout!=stdout) std::fclose(fout); else std::fflush(stdout);
+        if(rows==0) throw std::runtime_error("Caplet section missing");
+
+        double secs=std::chrono::duration<double>(std::chrono::steady_clock::now()-t0).count();
+        std::fprintf(stderr,"Priced %zu caplets in %.3f s: %.0f rows/s, %.1f MB/s (%u threads)\n",
+                     rows,secs,rows/secs,bytes/secs/1e6,threads);
     }
     catch(const std::exception& e){ std::cerr<<"Error: "<<e.what()<<"\n"; return 1; }
     return 0;
@@ -0,0 +1,267 @@
+"""
+Incremental daily update of the dynamic macro hedge
+-------------------------------------------------
+HedgeState holds everything the full pipeline needs from history:
+
+    • 252-day CPI_YoY / FED_4D windows for the shock standardisation
+    • 63-day regression window: XᵀX / Xᵀy of PORT ~ 1 + CPI_SHOCK + FED_SHOCK,
+      running cov / var sums for PORT vs T10Y and DXY, min / max deques of the shocks
+    • 63-day vol windows of PORT and the raw hedged return (overlay scale)
+    • yesterday's hedge ratios and overlay scale inputs
+
+so a new day (returns + latest CPI_YoY / FED_4D prints) costs O(1) instead of
+re-running load → add_shocks → rolling_hedge → apply_hedge over the full history.
+Replaying a history through update() reproduces run_hedge() row by row, for the
+default T10Y / DXY hedge and fixed portfolio weights.
+
+    state, hist = HedgeState.from_history(merged, weights)   # merged = load_merged(...)[0]
+    state.save("hedge_state.pkl")
+    ...
+    state = HedgeState.load("hedge_state.pkl")
+    row   = state.update(date, {"SPY": .., "QQQ": .., "EEM": .., "GLD": .., "T10Y": .., "DXY": ..,
+                                "CPI_YoY": .., "FED_4D": ..})
+    state.next_ratios()                                 # HR_T10 / HR_DXY to hold tomorrow
+"""
+
+import pickle
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from macro_hedge import CONFIG, TICKERS_PORT
+from rolling_ols import RCOND
+
+REFRESH_EVERY = 1000        # rebuild running sums from the buffers to bound float drift
+
+
+class RollingStat:
+    """
+    Fixed-window mean / sample std with add/remove updates, following pandas'
+    rolling(window).mean()/.std() rules: NaN until `window` non-NaN values, and an
+    exact mean / zero std once the last `window` values are identical (np.float64,
+    so dividing by a zero std gives inf / NaN rather than ZeroDivisionError).
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.buf = deque()
+        self._reset()
+
+    def _reset(self):
+        vals = [v for v in self.buf if not np.isnan(v)]
+        self.shift = vals[0] if vals else 0.0          # shifted sums: less cancellation
+        self.n  = len(vals)
+        self.s1 = sum(v - self.shift for v in vals)
+        self.s2 = sum((v - self.shift) ** 2 for v in vals)
+        self.run, self.prev = 0, np.nan
+        for v in vals:
+            self.run = self.run + 1 if v == self.prev else 1
+            self.prev = v
+        self.n_upd = 0
+
+    def push(self, x):
+        self.buf.append(x)
+        if not np.isnan(x):
+            if self.n == 0:
+                self.shift, self.s1, self.s2 = x, 0.0, 0.0
+            d = x - self.shift
+            self.n += 1; self.s1 += d; self.s2 += d * d
+            self.run = self.run + 1 if x == self.prev else 1
+            self.prev = x
+        if len(self.buf) > self.window:
+            old = self.buf.popleft()
+            if not np.isnan(old):
+                d = old - self.shift
+                self.n -= 1; self.s1 -= d; self.s2 -= d * d
+        self.n_upd += 1
+        if self.n_upd >= REFRESH_EVERY:
+            self._reset()
+
+    def mean(self):
+        if self.n < self.window:
+            return np.float64(np.nan)
+        if self.run >= self.n:
+            return np.float64(self.prev)
+        return np.float64(self.shift + self.s1 / self.n)
+
+    def std(self):
+        if self.n < self.window:
+            return np.float64(np.nan)
+        if self.run >= self.n:
+            return np.float64(0.0)
+        return np.float64(np.sqrt(max((self.s2 - self.s1 * self.s1 / self.n) / (self.n - 1), 0.0)))
+
+
+class MonotonicWindow:
+    """Rolling min / max over the last `window` positions, O(1) amortised per update."""
+
+    def __init__(self, window):
+        self.window = window
+        self.lo, self.hi = deque(), deque()         # (position, value)
+
+    def push(self, pos, x):
+        while self.lo and self.lo[-1][1] >= x: self.lo.pop()
+        while self.hi and self.hi[-1][1] <= x: self.hi.pop()
+        self.lo.append((pos, x)); self.hi.append((pos, x))
+
+    def expire(self, first_pos):
+        while self.lo and self.lo[0][0] < first_pos: self.lo.popleft()
+        while self.hi and self.hi[0][0] < first_pos: self.hi.popleft()
+
+    def is_nonzero_const(self):
+        return bool(self.lo) and self.lo[0][1] == self.hi[0][1] != 0
+
+
+class HedgeState:
+    """Persisted state of the dynamic macro hedge (default T10Y / DXY univariate hedge)."""
+
+    def __init__(self, weights=None, WIN=CONFIG["WIN"], MIN_OBS=CONFIG["MIN_OBS"],
+                 TARGET_FRAC=CONFIG["TARGET_FRAC"], VOL_LOOKBACK=CONFIG["VOL_LOOKBACK"], SHOCK_WIN=252):
+        self.weights = None if weights is None else {k: float(v) for k, v in dict(weights).items()}
+        self.WIN, self.MIN_OBS = WIN, MIN_OBS
+        self.TARGET_FRAC, self.VOL_LOOKBACK = TARGET_FRAC, VOL_LOOKBACK
+
+        # shock standardisation (all merged rows)
+        self.cpi = RollingStat(SHOCK_WIN)
+        self.fed = RollingStat(SHOCK_WIN)
+
+        # regression / hedge window (rows that survive the shock dropna)
+        self.rows = deque()                 # (PORT, T10Y, DXY, CPI_SHOCK, FED_SHOCK)
+        self.pos  = 0                       # index of the next hedge row
+        self.XtX  = np.zeros((3, 3))
+        self.Xty  = np.zeros(3)
+        self.n_ok = 0
+        self.cov_sums = np.zeros((2, 5))    # per hedge: Σx Σy Σxx Σyy Σxy (x = PORT)
+        self.shock_mm = [MonotonicWindow(WIN), MonotonicWindow(WIN)]
+        self.n_upd = 0
+
+        # overlay
+        self.port_vol = RollingStat(VOL_LOOKBACK)
+        self.hedg_vol = RollingStat(VOL_LOOKBACK)
+        self.prev_hr  = (np.nan, np.nan)
+        self.prev_sig = (np.nan, np.nan)    # yesterday's (orig σ, hedged σ)
+        self.last_date = None
+
+    # ---------------- regression window -----------------------
+    @staticmethod
+    def _clean(r):
+        return np.isfinite(r[0]) and np.isfinite(r[3]) and np.isfinite(r[4])
+
+    def _add(self, r, sign):
+        port, t10, dxy, cpi, fed = r
+        for j, h in enumerate((t10, dxy)):
+            self.cov_sums[j] += sign * np.array([port, h, port*port, h*h, port*h])
+        if self._clean(r):
+            x = np.array([1.0, cpi, fed])
+            self.XtX += sign * np.outer(x, x)
+            self.Xty += sign * port * x
+            self.n_ok += int(sign)
+
+    def _refresh(self):
+        self.XtX[:] = 0; self.Xty[:] = 0; self.n_ok = 0; self.cov_sums[:] = 0
+        for r in self.rows:
+            self._add(r, 1.0)
+
+    def _push_row(self, r):
+        self.rows.append(r)
+        self._add(r, 1.0)
+        if self._clean(r):
+            for mm, v in zip(self.shock_mm, r[3:]):
+                mm.push(self.pos, v)
+        if len(self.rows) > self.WIN:
+            old = self.rows.popleft()
+            self._add(old, -1.0)
+            if not np.isfinite(old[:3]).all():
+                self._refresh()                     # NaN / inf never cancel out of the sums
+        self.pos += 1
+        for mm in self.shock_mm:
+            mm.expire(self.pos - self.WIN)
+        self.n_upd += 1
+        if self.n_upd % REFRESH_EVERY == 0:
+            self._refresh()
+
+    def next_ratios(self):
+        """BETA_CPI, BETA_FED, HR_T10, HR_DXY (+ correlations) from the last WIN rows."""
+        nan = dict(BETA_CPI=np.nan, BETA_FED=np.nan, HR_T10=np.nan, HR_DXY=np.nan,
+                   CORR_T10=np.nan, CORR_DXY=np.nan)
+        if len(self.rows) < self.WIN:
+            return nan
+        out = dict(nan)
+        if self.n_ok >= max(self.MIN_OBS, 1):
+            XtX, Xty = self.XtX.copy(), self.Xty.copy()
+            if any(mm.is_nonzero_const() for mm in self.shock_mm):   # add_constant skips the intercept
+                XtX[0, :] = XtX[:, 0] = 0.0
+                Xty[0] = 0.0
+            b = np.linalg.pinv(XtX, rcond=RCOND) @ Xty
+            out["BETA_CPI"], out["BETA_FED"] = b[1], b[2]
+
+        n = self.WIN
+        for j, (hr, corr) in enumerate((("HR_T10", "CORR_T10"), ("HR_DXY", "CORR_DXY"))):
+            sx, sy, sxx, syy, sxy = self.cov_sums[j]
+            cov, vx, vy = (sxy - sx*sy/n) / (n-1), (sxx - sx*sx/n) / (n-1), (syy - sy*sy/n) / (n-1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[corr] = cov / np.sqrt(vx * vy)
+                out[hr] = cov / vy
+        if out["CORR_T10"] > 0:
+            out["HR_T10"] = -out["HR_T10"]          # short bonds when corr positive
+        return out
+
+    # ---------------- daily update ----------------------------
+    def update(self, date, row):
+        """
+        Ingests one merged day: PORT (or the portfolio tickers, weighted by `weights`),
+        T10Y, DXY, CPI_YoY, FED_4D.
+
+        Returns the day's record as in run_hedge()["df"] (shocks, betas, hedge ratios,
+        HEDGED_RET) or None while the shock windows are still warming up.
+        """
+        port = row["PORT"] if "PORT" in row else sum(self.weights[t] * row[t] for t in TICKERS_PORT)
+        self.cpi.push(row["CPI_YoY"])
+        self.fed.push(row["FED_4D"])
+        cpi_sd, fed_sd = self.cpi.std(), self.fed.std()
+        self.last_date = date
+        if np.isnan(cpi_sd) or np.isnan(fed_sd):
+            return None                             # warm-up or NaN print: dropped by add_shocks
+        # flat window: no move to standardise, shock 0 (as add_shocks)
+        cpi_shock = (row["CPI_YoY"] - self.cpi.mean()) / cpi_sd if cpi_sd > 0 else 0.0
+        fed_shock = row["FED_4D"] / fed_sd if fed_sd > 0 else 0.0
+
+        rec = dict(PORT=port, T10Y=row["T10Y"], DXY=row["DXY"],
+                   CPI_YoY=row["CPI_YoY"], FED_4D=row["FED_4D"],
+                   CPI_SHOCK=cpi_shock, FED_SHOCK=fed_shock)
+        rec.update(self.next_ratios())             # window ends yesterday
+
+        # hedged return with yesterday's ratios and yesterday's overlay scale
+        raw = port - self.prev_hr[0] * row["T10Y"] - self.prev_hr[1] * row["DXY"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scale = np.clip(self.TARGET_FRAC * self.prev_sig[0] / self.prev_sig[1], 0, 3)
+        rec["SCALE"] = scale
+        rec["HEDGED_RET"] = raw * scale
+
+        self.port_vol.push(port)
+        self.hedg_vol.push(raw)
+        self.prev_sig = (self.port_vol.std(), self.hedg_vol.std())
+        self.prev_hr = (rec["HR_T10"], rec["HR_DXY"])
+        self._push_row((port, row["T10Y"], row["DXY"], cpi_shock, fed_shock))
+        return rec
+
+    @classmethod
+    def from_history(cls, merged, weights=None, **cfg):
+        """Replays a load_merged() frame; returns (state, DataFrame of the daily records)."""
+        state = cls(weights, **cfg)
+        records = {}
+        for date, row in zip(merged.index, merged.to_dict("records")):
+            rec = state.update(date, row)
+            if rec is not None:
+                records[date] = rec
+        return state, pd.DataFrame.from_dict(records, orient="index")
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
@@ -0,0 +1,262 @@
+"""
+Dynamic Macro Hedge – importable pipeline
+-------------------------------------------------
+Callable version of dynamic-macro-hedge.py:
+
+    data = load_data()                  # prices + CPI / Fed-Funds shocks (cached store)
+    res  = run_hedge(data, WIN=126)     # results dict, no plotting
+    plot_hedge(res, "figures")          # opt-in, non-interactive backend
+
+Nothing here imports matplotlib until plot_hedge() is called.
+"""
+
+import datetime as dt
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from rolling_ols import rolling_ols, rolling_hedge_ratio
+from min_var_hedge import rolling_min_var_hedge
+from market_data import fred, yf_close   # local store: only missing dates are downloaded
+from research_common.plotting import pyplot
+
+
+# ------------- CONFIG --------------------------------------
+CONFIG = dict(
+    START       = "2015-01-01",
+    END         = None,                 # None → today
+    WIN         = 63,                   # rolling beta / hedge window
+    MIN_OBS     = 25,                   # min clean obs for the macro regression
+    TARGET_FRAC = 0.80,                 # run at 80 % of original σ  ➜ ≈20 % cut
+    VOL_LOOKBACK= 63,                   # 3-month rolling vol window
+    HEDGE_SET   = None,                 # e.g. ["T10Y", "DXY", "LQD"] → joint min-variance hedge
+    HEDGE_BOUNDS= None,                 # (lo, hi) or {instrument: (lo, hi)} for HEDGE_SET
+    GROSS_CAP   = None,                 # cap on Σ|hedge ratio| for HEDGE_SET
+)
+
+UNIVARIATE_RATIOS = {"T10Y": "HR_T10", "DXY": "HR_DXY"}
+
+TICKERS_PORT = ["SPY", "QQQ", "EEM", "GLD"]
+HEDGE_TICKERS = {
+    "ZN=F": "T10Y", "DX-Y.NYB": "DXY", "VIXY": "VIXY",
+    "LQD": "LQD", "HYG": "HYG", "USO": "USO", "GLD": "GLD",
+}
+FRED_MACRO = {"CPI": "CPIAUCSL", "FED": "FEDFUNDS"}
+
+
+# ------------- 1. DATA -------------------------------------
+def fetch_prices(tickers, start, end):
+    return yf_close(tickers, start, end)
+
+
+def inverse_vol_weights(ret_port, lookback=63):
+    """Risk-weighted (inverse volatility) portfolio weights from the last `lookback` days."""
+    vols = ret_port.rolling(lookback).std().iloc[-1]
+    inv_vol_weights = 1 / vols
+    return inv_vol_weights / inv_vol_weights.sum()
+
+
+def load_merged(START=CONFIG["START"], END=None, weights=None):
+    """
+    Portfolio / hedge returns joined with daily CPI_YoY & FED_4D (before standardising).
+
+    weights : portfolio weights by ticker (default: inverse-vol weights from the last
+              63 days of the sample, which move as the sample grows)
+
+    Returns (merged DataFrame, weights used).
+    """
+    END = END or dt.date.today().strftime("%Y-%m-%d")
+
+    # 1.1 Portfolio: SPY, QQQ, EEM, GLD
+    ret_port = (
+        fetch_prices(TICKERS_PORT, START, END)
+          .pct_change(fill_method=None)
+          .dropna()
+    )
+    if weights is None:
+        weights = inverse_vol_weights(ret_port)
+    portfolio_ret = (ret_port * weights).sum(axis=1).rename("PORT")
+
+    # 1.2 Hedge assets: 10-Y futures + DXY (+ extras)
+    hedge_ret = (
+        fetch_prices(list(HEDGE_TICKERS), START, END)
+          .pct_change(fill_method=None)
+          .dropna()
+          .rename(columns=HEDGE_TICKERS)
+    )
+
+    # 1.3 Macro: CPI level & Fed-Funds
+    macro = (
+        fred(list(FRED_MACRO.values()), START, END)
+          .rename(columns={code: name for name, code in FRED_MACRO.items()})
+          .ffill()
+    )
+    macro["CPI_YoY"] = macro["CPI"].pct_change(12) * 100
+    macro["FED_4D"]  = macro["FED"].diff(4).clip(-0.25, 0.25)   # ±25 bp cap
+    macro_daily = macro.asfreq("D").ffill()
+
+    # 2. MERGE
+    df = (
+        pd.concat([portfolio_ret, hedge_ret], axis=1)
+          .join(macro_daily[["CPI_YoY", "FED_4D"]], how="left")
+          .ffill()
+          .dropna()
+    )
+    return df, weights
+
+
+def _shock(num, x, win):
+    """num / rolling std of x; 0 where the window of x is flat (nothing moved, so no shock –
+    pandas leaves ~1e-9 of float noise there instead of a zero std), NaN during warm-up."""
+    r = x.rolling(win)
+    return (num / r.std()).mask(r.max() == r.min(), 0.0)
+
+
+def add_shocks(df, SHOCK_WIN=252):
+    """Standardised CPI / Fed shocks over a trailing SHOCK_WIN-day window (0 while the
+    window is flat); drops warm-up rows."""
+    df = df.copy()
+    cpi = df["CPI_YoY"]
+    df["CPI_SHOCK"] = _shock(cpi - cpi.rolling(SHOCK_WIN).mean(), cpi, SHOCK_WIN)
+    df["FED_SHOCK"] = _shock(df["FED_4D"], df["FED_4D"], SHOCK_WIN)
+    return df.dropna()
+
+
+def load_data(START=CONFIG["START"], END=None, weights=None):
+    """Portfolio / hedge returns joined with standardised CPI & Fed shocks."""
+    return add_shocks(load_merged(START, END, weights)[0])
+
+
+# ------------- 3. ROLLING BETAS & HEDGE WEIGHTS ------------
+def rolling_hedge(df, WIN=63, MIN_OBS=25):
+    """
+    Adds BETA_CPI, BETA_FED (OLS of PORT on the shocks), HR_T10, HR_DXY and the
+    CORR_T10 / CORR_DXY correlations for the window ending the day before each row.
+    All windows in one pass from cumulative cross-product sums (rolling_ols.py).
+    """
+    df = df.copy()
+    idx = df.index[WIN:]
+
+    # --- macro betas: windows with < MIN_OBS clean obs → NaN ------
+    params, _ = rolling_ols(df["PORT"], df[["CPI_SHOCK", "FED_SHOCK"]], WIN, MIN_OBS)
+    df.loc[idx, "BETA_CPI"] = params[:, 1]
+    df.loc[idx, "BETA_FED"] = params[:, 2]
+
+    # --- covariance hedge weights ---------------------------------
+    hr_t10, corr_t10 = rolling_hedge_ratio(df["PORT"], df["T10Y"], WIN,
+                                           flip_positive_corr=True)   # short bonds when corr positive
+    hr_dxy, corr_dxy = rolling_hedge_ratio(df["PORT"], df["DXY"], WIN)
+    df.loc[idx, "HR_T10"]   = hr_t10
+    df.loc[idx, "HR_DXY"]   = hr_dxy
+    df.loc[idx, "CORR_T10"] = corr_t10
+    df.loc[idx, "CORR_DXY"] = corr_dxy
+    return df
+
+
+def joint_hedge(df, instruments, WIN=63, bounds=None, gross=None):
+    """Adds HR_MV_<instrument> columns: rolling joint min-variance hedge (min_var_hedge.py)."""
+    df = df.copy()
+    hr = rolling_min_var_hedge(df, instruments, WIN, bounds, gross)
+    for name in instruments:
+        df.loc[hr.index, f"HR_MV_{name}"] = hr[name]
+    return df
+
+
+# ------------- 4. APPLY HEDGE & METRICS --------------------
+def apply_hedge(df, TARGET_FRAC=0.80, VOL_LOOKBACK=63, ratios=UNIVARIATE_RATIOS):
+    """
+    Hedged return (yesterday's hedge ratios) with the volatility-target overlay.
+    ratios : instrument column → hedge-ratio column
+    """
+    df = df.copy()
+    df["HEDGED_RET"] = df["PORT"]
+    for inst, hr in ratios.items():
+        df["HEDGED_RET"] -= df[hr].shift(1) * df[inst]
+    orig_sigma  = df["PORT"].rolling(VOL_LOOKBACK).std()
+    hedg_sigma  = df["HEDGED_RET"].rolling(VOL_LOOKBACK).std()
+
+    # scale factor so hedged σ → TARGET_FRAC × original σ
+    scale       = (TARGET_FRAC * orig_sigma / hedg_sigma).shift(1).clip(0, 3)
+    df["HEDGED_RET"] *= scale
+    return df
+
+
+def hedge_stats(df):
+    vol_plain  = df["PORT"].std()       * np.sqrt(252)
+    vol_hedged = df["HEDGED_RET"].std() * np.sqrt(252)
+    return {
+        "vol_plain":  vol_plain,
+        "vol_hedged": vol_hedged,
+        "reduction":  100 * (1 - vol_hedged / vol_plain),
+    }
+
+
+def run_hedge(data=None, **overrides):
+    """
+    Full pipeline: data → rolling betas / hedge ratios → vol-targeted hedged returns.
+
+    data      : optional output of load_data() (reuse it across configurations)
+    overrides : CONFIG keys (START, END, WIN, MIN_OBS, TARGET_FRAC, VOL_LOOKBACK,
+                HEDGE_SET, HEDGE_BOUNDS, GROSS_CAP)
+
+    Returns dict with config, df (all series) and stats (vol_plain, vol_hedged, reduction).
+    """
+    cfg = {**CONFIG, **overrides}
+    if data is None:
+        data = load_data(cfg["START"], cfg["END"])
+    df = rolling_hedge(data, cfg["WIN"], cfg["MIN_OBS"])
+    ratios = UNIVARIATE_RATIOS
+    if cfg["HEDGE_SET"]:
+        df = joint_hedge(df, cfg["HEDGE_SET"], cfg["WIN"], cfg["HEDGE_BOUNDS"], cfg["GROSS_CAP"])
+        ratios = {name: f"HR_MV_{name}" for name in cfg["HEDGE_SET"]}
+    df = apply_hedge(df, cfg["TARGET_FRAC"], cfg["VOL_LOOKBACK"], ratios)
+    return {"config": cfg, "df": df, "stats": hedge_stats(df)}
+
+
+def summary(res):
+    s = res["stats"]
+    return [
+        "-"*42,
+        "Dynamic Macro Hedge Results",
+        f"Annualised Vol (Original): {s['vol_plain']:6.2%}",
+        f"Annualised Vol (Hedged) : {s['vol_hedged']:6.2%}",
+        f"Volatility Reduction    : {s['reduction']:6.1f}%",
+        "-"*42,
+    ]
+
+
+# ------------- 5. PLOTS ------------------------------------
+def plot_hedge(res, fig_dir="figures", show=False):
+    """Saves the five charts to `fig_dir`; returns their paths."""
+    plt = pyplot(show)
+    plt.style.use("seaborn-v0_8-whitegrid")
+    fig_dir = Path(fig_dir)
+    fig_dir.mkdir(parents=True, exist_ok=True)
+    df = res["df"]
+
+    def drawdown(s): return s / s.cummax() - 1
+    cum = (1 + df[["PORT", "HEDGED_RET"]]).cumprod()
+    charts = [
+        ("cum_return.png", cum, "Cumulative Return: Portfolio vs Hedged", "Growth of $1"),
+        ("rolling_macro_betas.png", df[["BETA_CPI", "BETA_FED"]], "Rolling Macro Betas (CPI & Fed)", None),
+        ("hedge_weights.png", df[["HR_T10", "HR_DXY"]], "Rolling Hedge Weights", None),
+        ("realised_vol.png",
+         df[["PORT", "HEDGED_RET"]].rolling(63).std().mul(np.sqrt(252)).dropna(),
+         "Realised Volatility (63-day)", None),
+        ("drawdown.png",
+         pd.DataFrame({"PORT": drawdown(cum["PORT"]), "HEDGED": drawdown(cum["HEDGED_RET"])}),
+         "Drawdowns", None),
+    ]
+    saved = []
+    for name, data, title, ylabel in charts:
+        ax = data.plot(figsize=(10,4), title=title)
+        if ylabel:
+            ax.set_ylabel(ylabel)
+        ax.figure.tight_layout(); ax.figure.savefig(fig_dir/name, dpi=150)
+        saved.append(fig_dir/name)
+        if not show:
+            plt.close(ax.figure)
+    if show:
+        plt.show()
+    return saved
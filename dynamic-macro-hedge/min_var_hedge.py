@@ -0,0 +1,185 @@
+"""
+Multi-instrument minimum-variance hedge
+-------------------------------------------------
+For every rolling window, the hedge vector h over a set of instruments H that
+minimises Var(PORT − hᵀH):
+
+    min_h  hᵀ Σ_HH h − 2 hᵀ Σ_HP      s.t.  lo ≤ h ≤ hi,  Σ|h| ≤ gross   (optional)
+
+(positive h = short the instrument, as for HR_T10 / HR_DXY). All windows are solved
+together on stacked covariance matrices:
+- unconstrained: one batched pseudo-inverse solve, h = Σ_HH⁺ Σ_HP
+- bounds / gross cap: batched ADMM on (W, k) arrays, with one stacked (Σ + ρI)⁻¹;
+  windows still above the residual tolerance after max_iter are flagged (and warned about)
+
+The covariance stack of PORT and every instrument is built once, so any number of
+instrument subsets ("hedge candidates") only costs a k×k solve per window.
+"""
+
+import warnings
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from rolling_ols import rolling_cov_matrix
+
+INSTRUMENTS = ["T10Y", "DXY", "VIXY", "LQD", "HYG", "USO", "GLD"]
+
+ALPHA = 1.6         # ADMM over-relaxation
+
+CovStack = namedtuple("CovStack", "values columns")     # (W, 1+k, 1+k) stack, [port] + columns
+
+
+def _bounds(bounds, names):
+    """(lo, hi) arrays from None, one (lo, hi) pair, or a dict name → (lo, hi)."""
+    if bounds is None:
+        pairs = [(None, None)] * len(names)
+    elif isinstance(bounds, dict):
+        pairs = [bounds.get(n, (None, None)) for n in names]
+    else:
+        pairs = [bounds] * len(names)
+    lo = np.array([-np.inf if p[0] is None else p[0] for p in pairs], dtype=float)
+    hi = np.array([np.inf if p[1] is None else p[1] for p in pairs], dtype=float)
+    return lo, hi
+
+
+def project_box_l1(v, lo, hi, gross=None):
+    """
+    Euclidean projection of each row of v onto {lo ≤ x ≤ hi, Σ|x| ≤ gross}.
+
+    Requires lo ≤ 0 ≤ hi when a gross cap is given; the projection is then
+    clip(soft(v, θ), lo, hi) where θ ≥ 0 solves g(θ) = Σ min(max(|v| − θ, 0), cap) = gross.
+    g is piecewise linear, so θ is found exactly from its sorted breakpoints
+    (vectorised over rows).
+    """
+    x = np.clip(v, lo, hi)
+    if gross is None:
+        return x
+    over = np.abs(x).sum(axis=-1) > gross
+    if not over.any():
+        return x
+    vv  = v[over]
+    a   = np.abs(vv)
+    cap = np.broadcast_to(np.where(vv >= 0, hi, -lo), a.shape)
+    bp  = np.sort(np.concatenate([np.zeros((len(a), 1)), a, np.maximum(a - cap, 0.0)], axis=1), axis=1)
+    g   = np.minimum(np.maximum(a[:, None, :] - bp[:, :, None], 0.0), cap[:, None, :]).sum(axis=2)
+    j   = (g > gross).sum(axis=1)                    # g is non-increasing: first breakpoint ≤ gross
+    rows = np.arange(len(a))
+    θ1, θ2 = bp[rows, j - 1], bp[rows, j]
+    g1, g2 = g[rows, j - 1], g[rows, j]
+    θ = θ1 + (g1 - gross) * (θ2 - θ1) / np.where(g1 > g2, g1 - g2, 1.0)
+    x[over] = np.clip(np.sign(vv) * np.maximum(a - θ[:, None], 0.0), lo, hi)
+    return x
+
+
+def min_variance_hedge(cov_hh, cov_hp, bounds=None, gross=None, max_iter=2000, tol=1e-9, names=None,
+                       return_converged=False):
+    """
+    Batched minimum-variance hedge vectors.
+
+    cov_hh : (W, k, k) instrument covariance per window
+    cov_hp : (W, k) instrument / portfolio covariance per window
+    bounds : None, (lo, hi) for every instrument, or dict name → (lo, hi) (needs `names`)
+    gross  : optional cap on Σ|h|
+
+    Returns (W, k) hedge ratios (NaN rows where the window covariance is not finite), and with
+    `return_converged` also a (W,) bool mask that is False where the ADMM stopped at max_iter
+    with its primal / dual residual above tolerance (the last iterate is returned there).
+    A RuntimeWarning is issued whenever a window did not converge.
+    """
+    W, k = cov_hp.shape
+    names = names or list(range(k))
+    lo, hi = _bounds(bounds, names)
+    if gross is not None and ((lo > 0) | (hi < 0)).any():
+        raise ValueError("A gross-notional cap needs bounds containing 0")
+
+    good = np.isfinite(cov_hh).all(axis=(1, 2)) & np.isfinite(cov_hp).all(axis=1)
+    h = np.full((W, k), np.nan)
+    converged = np.ones(W, dtype=bool)
+    S, c = cov_hh[good], cov_hp[good]
+
+    x = np.einsum("wij,wj->wi", np.linalg.pinv(S), c)         # unconstrained optimum
+    constrained = gross is not None or np.isfinite(lo).any() or np.isfinite(hi).any()
+    if not constrained or len(S) == 0:
+        h[good] = x
+        return (h, converged) if return_converged else h
+
+    # over-relaxed ADMM: (S + ρI) x = c + ρ(z − u),  x̂ = αx + (1−α)z,  z = Π_C(x̂ + u),  u += x̂ − z
+    ρ   = np.trace(S, axis1=1, axis2=2) / k
+    ρ   = np.where(ρ > 0, ρ, 1.0)
+    inv = np.linalg.inv(S + ρ[:, None, None] * np.eye(k))
+    z   = project_box_l1(x, lo, hi, gross)
+    u   = np.zeros_like(z)
+    scale = np.maximum(np.abs(c).max(axis=1), 1e-300)
+    ok  = np.zeros(len(S), dtype=bool)
+    for _ in range(max_iter):
+        x = np.einsum("wij,wj->wi", inv, c + ρ[:, None] * (z - u))
+        x_hat = ALPHA * x + (1 - ALPHA) * z
+        z_prev = z
+        z = project_box_l1(x_hat + u, lo, hi, gross)
+        u += x_hat - z
+        r_pri  = np.abs(x - z).max(axis=1)
+        r_dual = ρ * np.abs(z - z_prev).max(axis=1)
+        ok = (r_pri <= tol * (1 + np.abs(z).max(axis=1))) & (r_dual <= tol * scale)
+        if ok.all():
+            break
+    h[good] = z
+    converged[good] = ok
+    if not ok.all():
+        warnings.warn(f"min-variance ADMM did not converge in {max_iter} iterations for "
+                      f"{(~ok).sum()} of {W} windows", RuntimeWarning, stacklevel=2)
+    return (h, converged) if return_converged else h
+
+
+def rolling_min_var_hedge(df, instruments, win=63, bounds=None, gross=None, port="PORT", cov=None,
+                          return_converged=False):
+    """
+    Rolling minimum-variance hedge of `port` with `instruments` (columns of df).
+
+    Window convention as rolling_hedge: ratios on row `end` use rows [end − win, end).
+    cov : optional CovStack from covariance_stack() covering (at least) these instruments
+
+    Returns DataFrame of hedge ratios (columns = instruments) indexed by df.index[win:], and with
+    `return_converged` also a bool Series on the same index (False: ADMM hit max_iter).
+    """
+    if cov is None:
+        cov = covariance_stack(df, instruments, win, port)
+    pos = [cov.columns.index(n) + 1 for n in instruments]
+    S = cov.values[:, pos][:, :, pos]
+    c = cov.values[:, pos, 0]
+    h, converged = min_variance_hedge(S, c, bounds, gross, names=list(instruments), return_converged=True)
+    hr = pd.DataFrame(h, index=df.index[win:], columns=list(instruments))
+    return (hr, pd.Series(converged, index=hr.index)) if return_converged else hr
+
+
+def covariance_stack(df, instruments=INSTRUMENTS, win=63, port="PORT"):
+    """Builds the (W, 1+k, 1+k) covariance stack of port and instruments once."""
+    cols = list(instruments)
+    return CovStack(rolling_cov_matrix(df[[port] + cols].to_numpy(), win), cols)
+
+
+def compare_hedges(df, candidates, win=63, bounds=None, gross=None, port="PORT"):
+    """
+    Evaluates several instrument subsets on one shared covariance stack.
+
+    candidates : dict name → list of instruments
+    Returns (ratios dict name → DataFrame, summary DataFrame with annualised vol of the
+    unhedged and hedged series, using the previous day's ratios, and the number of windows
+    whose ADMM did not converge).
+    """
+    universe = sorted({n for names in candidates.values() for n in names}, key=list(df.columns).index)
+    cov = covariance_stack(df, universe, win, port)
+    ratios, rows = {}, []
+    base_vol = df[port].iloc[win + 1:].std() * np.sqrt(252)
+    for name, names in candidates.items():
+        hr, converged = rolling_min_var_hedge(df, names, win, bounds, gross, port, cov, return_converged=True)
+        hedged = df[port] - (hr.shift(1) * df.loc[hr.index, names]).sum(axis=1, min_count=1)
+        ratios[name] = hr
+        vol = hedged.iloc[1:].std() * np.sqrt(252)
+        rows.append({"candidate": name, "instruments": ",".join(names),
+                     "vol_plain": base_vol, "vol_hedged": vol,
+                     "reduction": 100 * (1 - vol / base_vol),
+                     "gross_avg": hr.abs().sum(axis=1).mean(),
+                     "unconverged": int((~converged).sum())})
+    return ratios, pd.DataFrame(rows).set_index("candidate")
@@ -0,0 +1,115 @@
+"""
+Rolling regression engine
+-------------------------------------------------
+Trailing-window OLS, covariances and correlations for every window in one
+vectorised pass, from cumulative sums of the cross-products:
+
+    Σ_window (x xᵀ) = C[end] − C[end − win],   C = cumsum of x xᵀ
+
+Window convention (as in the original loop): the window for row `end` covers
+rows [end − win, end), i.e. it ends the day before, and results start at row
+`win`. Rows with NaN / ±inf in any regression variable are dropped from that
+window, exactly like `.replace([inf, -inf], nan).dropna()` per window.
+"""
+
+import numpy as np
+import pandas as pd
+
+RCOND = 1e-12       # rank cut-off on XᵀX (statsmodels' pinv cuts X at 1e-15)
+
+
+def trailing_sums(a, win):
+    """Σ a[end−win:end] for end = win … len(a)−1 (first axis), via one cumsum."""
+    cs = np.concatenate([np.zeros((1,) + a.shape[1:]), np.cumsum(a, axis=0)])
+    return cs[win:-1] - cs[:-win - 1]
+
+
+def rolling_ols(y, X, win, min_obs=0, add_const=True):
+    """
+    OLS of y on X (plus intercept) over every trailing window.
+
+    y : (T,) dependent variable; X : (T, k) regressors
+    min_obs : windows with fewer clean rows return NaN
+
+    Returns (params (T−win, k+1) with the intercept first if add_const, n_obs (T−win,)).
+    Matches statsmodels' OLS(y, add_constant(X)) window by window:
+    - add_constant skips the intercept when a regressor is a non-zero constant over
+      the window (that regressor then carries the level; intercept reported as 0)
+    - rank-deficient windows get pinv's minimum-norm solution
+    """
+    y = np.asarray(y, dtype=float)
+    X = np.asarray(X, dtype=float).reshape(len(y), -1)
+    ok = np.isfinite(y) & np.isfinite(X).all(axis=1)
+    if add_const:
+        X = np.column_stack([np.ones(len(y)), X])
+    y0 = np.where(ok, y, 0.0)
+    X0 = np.where(ok[:, None], X, 0.0)
+
+    XtX = trailing_sums(np.einsum("ti,tj->tij", X0, X0), win)
+    Xty = trailing_sums(X0 * y0[:, None], win)
+    n   = trailing_sums(ok.astype(float), win)
+
+    if add_const:
+        # non-zero constant regressor in the window (rolling min == max ≠ 0, O(n))
+        Xc  = pd.DataFrame(np.where(ok[:, None], X[:, 1:], np.nan))
+        lo  = Xc.rolling(win, min_periods=1).min().to_numpy()[win - 1:-1]
+        hi  = Xc.rolling(win, min_periods=1).max().to_numpy()[win - 1:-1]
+        skip = ((lo == hi) & (lo != 0)).any(axis=1)
+        XtX[skip, 0, :] = 0.0
+        XtX[skip, :, 0] = 0.0
+        Xty[skip, 0] = 0.0
+
+    params = np.einsum("wij,wj->wi", np.linalg.pinv(XtX, rcond=RCOND), Xty)
+    params[n < max(min_obs, 1)] = np.nan
+    return params, n
+
+
+def rolling_cov(x, y, win):
+    """
+    Trailing-window sample covariance, variances and correlation of two series
+    (ddof=1, like pandas .cov()/.var()/.corr()).
+
+    Returns dict with cov, var_x, var_y, corr (each (T−win,)).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # moments are shift-invariant: centring first keeps the cumulative sums well conditioned
+    x = x - np.nanmean(x)
+    y = y - np.nanmean(y)
+    S = trailing_sums(np.column_stack([x, y, x*x, y*y, x*y]), win)
+    sx, sy, sxx, syy, sxy = S.T
+    cov   = (sxy - sx*sy/win) / (win - 1)
+    var_x = (sxx - sx*sx/win) / (win - 1)
+    var_y = (syy - sy*sy/win) / (win - 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = cov / np.sqrt(var_x * var_y)
+    return {"cov": cov, "var_x": var_x, "var_y": var_y, "corr": corr}
+
+
+def rolling_hedge_ratio(port, hedge, win, flip_positive_corr=False):
+    """
+    cov(port, hedge) / var(hedge) per trailing window, optionally sign-flipped
+    (short the hedge) where the correlation is positive.
+
+    Returns (hedge ratio, corr).
+    """
+    m = rolling_cov(port, hedge, win)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        beta = m["cov"] / m["var_y"]
+    if flip_positive_corr:
+        beta = np.where(m["corr"] > 0, -beta, beta)
+    return beta, m["corr"]
+
+
+def rolling_cov_matrix(Z, win):
+    """
+    Stacked trailing-window covariance matrices of the columns of Z (ddof=1, complete rows).
+
+    Returns (T−win, m, m): one m×m matrix per window, from a single cumulative sum of
+    the outer products.
+    """
+    Z = np.asarray(Z, dtype=float)
+    Z = Z - np.nanmean(Z, axis=0)                 # shift-invariant; better conditioned sums
+    S1 = trailing_sums(Z, win)
+    S2 = trailing_sums(np.einsum("ti,tj->tij", Z, Z), win)
+    return (S2 - np.einsum("wi,wj->wij", S1, S1) / win) / (win - 1)
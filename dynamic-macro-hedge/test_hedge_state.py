@@ -0,0 +1,68 @@
+"""
+test_hedge_state.py
+
+Replaying a history through HedgeState must reproduce run_hedge() row by row, including
+stretches where a 252-day shock window is flat.
+
+    python -m pytest test_hedge_state.py
+"""
+
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hedge_state import HedgeState
+from macro_hedge import add_shocks, run_hedge
+
+CHECK_COLS = ["CPI_SHOCK", "FED_SHOCK", "BETA_CPI", "BETA_FED", "HR_T10", "HR_DXY", "HEDGED_RET"]
+FLAT_ROWS = slice(300, 700)                 # longer than the 252-day shock window
+
+CASES = {"random": None, "flat FED_4D = 0": {"FED_4D": 0.0},
+         "flat FED_4D = 0.25": {"FED_4D": 0.25}, "flat CPI_YoY": {"CPI_YoY": 2.5}}
+
+
+def synthetic_merged(T=1500, seed=0, flat=None):
+    """Synthetic load_merged() frame (PORT, T10Y, DXY, monthly CPI_YoY / FED_4D prints);
+    `flat` {column: value} is pinned on FLAT_ROWS."""
+    rng = np.random.default_rng(seed)
+    m = pd.DataFrame({"PORT": rng.normal(0, .01, T), "T10Y": rng.normal(0, .004, T),
+                      "DXY": rng.normal(0, .005, T)}, index=pd.bdate_range("2015-01-01", periods=T))
+    m["PORT"] -= 0.8 * m["T10Y"]
+    m["CPI_YoY"] = np.repeat(2 + np.cumsum(rng.normal(0, .2, T // 21 + 1)), 21)[:T]
+    m["FED_4D"] = np.repeat(np.clip(rng.normal(0, .1, T // 21 + 1), -.25, .25), 21)[:T]
+    for col, v in (flat or {}).items():
+        m.iloc[FLAT_ROWS, m.columns.get_loc(col)] = v
+    return m
+
+
+@pytest.mark.parametrize("flat", CASES.values(), ids=CASES.keys())
+def test_replay_matches_run_hedge(flat):
+    merged = synthetic_merged(flat=flat)
+    full = run_hedge(add_shocks(merged), HEDGE_SET=None)["df"]
+    _, rec = HedgeState.from_history(merged)
+
+    assert rec.index.equals(full.index)
+    for c in CHECK_COLS:
+        a, b = full[c].to_numpy(float), rec[c].to_numpy(float)
+        np.testing.assert_array_equal(np.isnan(a), np.isnan(b), err_msg=c)
+        ok = np.isfinite(a)
+        np.testing.assert_allclose(b[ok], a[ok], rtol=1e-8, atol=1e-9, err_msg=c)
+
+
+@pytest.mark.parametrize("col", ["FED_4D", "CPI_YoY"])
+def test_flat_window_keeps_rows_with_zero_shock(col):
+    merged = synthetic_merged(flat={col: 0.25})
+    shocks = add_shocks(merged)
+
+    assert len(shocks) == len(merged) - 251                 # only the warm-up is dropped
+    flat = merged.index[FLAT_ROWS][251:]                    # windows entirely inside the flat rows
+    shock = "FED_SHOCK" if col == "FED_4D" else "CPI_SHOCK"
+    assert (shocks.loc[flat, shock] == 0).all()
+
+
+def test_state_survives_pickle():
+    state, _ = HedgeState.from_history(synthetic_merged())
+    clone = pickle.loads(pickle.dumps(state))
+    assert clone.next_ratios() == state.next_ratios()
@@ -0,0 +1,53 @@
+"""
+test_min_var_hedge.py
+
+Batched ADMM of min_var_hedge.py: per-window convergence mask and the max_iter warning.
+
+    python -m pytest test_min_var_hedge.py
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from min_var_hedge import compare_hedges, min_variance_hedge
+
+
+def cov_stack(W=50, k=4, seed=0):
+    rng = np.random.default_rng(seed)
+    A = rng.normal(size=(W, 3 * k, k))
+    S = np.einsum("wti,wtj->wij", A, A) / (3 * k)
+    return S, rng.normal(size=(W, k))
+
+
+def test_converged_windows_are_flagged():
+    S, c = cov_stack()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        h, converged = min_variance_hedge(S, c, bounds=(-0.5, 0.5), gross=1.0, return_converged=True)
+    assert converged.all()
+    assert (np.abs(h) <= 0.5 + 1e-9).all() and (np.abs(h).sum(axis=1) <= 1.0 + 1e-9).all()
+
+
+def test_max_iter_warns_and_masks():
+    S, c = cov_stack()
+    with pytest.warns(RuntimeWarning, match="did not converge"):
+        h, converged = min_variance_hedge(S, c, bounds=(-0.5, 0.5), gross=1.0, max_iter=3, return_converged=True)
+    assert not converged.all()
+    assert np.isfinite(h).all()
+
+
+def test_unconstrained_and_nan_windows_count_as_converged():
+    S, c = cov_stack()
+    S[0, 0, 0] = np.nan
+    h, converged = min_variance_hedge(S, c, return_converged=True)
+    assert converged.all() and np.isnan(h[0]).all()
+
+
+def test_compare_hedges_reports_unconverged():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(rng.normal(0, .01, (300, 3)), columns=["PORT", "T10Y", "DXY"])
+    _, table = compare_hedges(df, {"both": ["T10Y", "DXY"]}, bounds=(-1, 1))
+    assert table.loc["both", "unconverged"] == 0
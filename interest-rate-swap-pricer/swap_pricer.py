@@ -7,12 +7,18 @@ Vanilla USD SOFR Swap Pricer
 • Prices a 5-year fixed-for-float swap
 • Reports PV, fair par rate, DV01
 • Plots PV vs. ±100 bp parallel curve shifts
+
+Importable: run_swap() returns a results dict without touching matplotlib;
+plot_pv_vs_shift() is opt-in and uses a non-interactive backend by default.
 """
 
 import os, datetime as dt
+from collections import OrderedDict
 import numpy as np, pandas as pd
-import matplotlib.pyplot as plt
-import pandas_datareader.data as web
+
+from market_data import fred            # cached FRED series, see market-data-store/
+from research_common.plotting import pyplot
+from curve_bootstrap import TENORS_YRS, bootstrap_panel
 
 # ──────────────────────────────────────────────────────────
 # 1) Yield-curve download & bootstrap
@@ -23,45 +29,110 @@ FRED_CODES = {
     "5Y": "DGS5",   "7Y": "DGS7",   "10Y": "DGS10",
     "20Y": "DGS20", "30Y": "DGS30",
 }
-TENORS_YRS = np.array([1/12, 3/12, 6/12, 1, 2, 3, 5, 7, 10, 20, 30])
 
 def download_par_yields():
     end   = dt.date.today()
     start = end - dt.timedelta(days=30)          # only need recent data
-    dfs   = [web.DataReader(code, "fred", start, end).rename(columns={code: t})
-             for t, code in FRED_CODES.items()]
-    return pd.concat(dfs, axis=1).ffill().iloc[-1] / 100  # % → decimal
+    par   = fred(list(FRED_CODES.values()), start, end)
+    par.columns = list(FRED_CODES)
+    return par.ffill().iloc[-1] / 100            # % → decimal
 
 def bootstrap_df(par):
-    """Bootstraps discount factors under ACT/365, semi-annual coupons."""
-    disc = np.empty_like(par)
-    for i, (T, y) in enumerate(zip(TENORS_YRS, par)):
-        c = 0 if T <= 0.5 else y / 2            # bills carry no coupon
-        if i == 0:
-            disc[i] = 1 / (1 + y * T)
-        else:
-            pv_cpn  = np.sum(disc[:i] * c)
-            disc[i] = (1 - pv_cpn) / (1 + c)
+    """Bootstraps discount factors under ACT/365, semi-annual coupons (bills up to 6M)."""
+    disc = bootstrap_panel(np.asarray(par, dtype=float), TENORS_YRS, convention="swap")
     return pd.Series(disc, index=TENORS_YRS, name="DF")
 
 # ──────────────────────────────────────────────────────────
 # 2) Forward curve helper
 # ──────────────────────────────────────────────────────────
+def _forwards(times, dfs, freq=2):
+    fwd = np.empty_like(dfs)
+    fwd[0]  = (1 / dfs[0] - 1) * freq                      # first point (bill): simple yield
+    fwd[1:] = (dfs[:-1] / dfs[1:] - 1) / np.diff(times)     # f(t-1)/f(t)
+    return fwd
+
 def forwards_from_df(df_series, freq=2):
     """Simple-discrete forwards implied from discount factors."""
-    times = df_series.index.to_numpy()
-    dfs   = df_series.to_numpy()
-    fwd   = np.empty_like(dfs)
-
-    # First point (bill) — treat as simple yield
-    fwd[0] = (1 / dfs[0] - 1) * freq
-
-    # Remaining: f(t-1)/f(t)
-    for i in range(1, len(dfs)):
-        dt    = times[i] - times[i-1]
-        fwd[i] = (dfs[i-1] / dfs[i] - 1) / dt
+    fwd = _forwards(df_series.index.to_numpy(dtype=float), df_series.to_numpy(dtype=float), freq)
     return pd.Series(fwd, index=df_series.index, name="FWD")
 
+class Curve:
+    """
+    Discount curve on fixed knots with everything pricing needs precomputed:
+
+    • log-DFs and DFs on the knots, implied forwards (as forwards_from_df)
+    • interpolation weights per payment schedule, cached and shared with every
+      bumped copy (same knots → same weights)
+    • DF / forward values per schedule, cached on the (immutable) curve
+
+    Lookups are linear in DF and forward, clamped at the ends — identical to
+    interpolate() on the equivalent Series.
+    """
+    CACHE_SIZE = 64
+
+    def __init__(self, times, dfs, fwd=None, freq=2, log_df=None, _weights=None):
+        self.times  = np.asarray(times, dtype=float)
+        self.dfs    = np.asarray(dfs, dtype=float)
+        self.log_df = np.log(self.dfs) if log_df is None else log_df
+        self.freq   = freq
+        self.fwds   = _forwards(self.times, self.dfs, freq) if fwd is None else np.asarray(fwd, dtype=float)
+        self._weights = OrderedDict() if _weights is None else _weights     # schedule → (lo, w)
+        self._values  = OrderedDict()                                       # schedule → (DF, FWD)
+
+    @classmethod
+    def from_series(cls, df_series, fwd_series=None, freq=2):
+        fwd = None if fwd_series is None else np.interp(df_series.index, fwd_series.index, fwd_series.values)
+        return cls(df_series.index.to_numpy(dtype=float), df_series.to_numpy(dtype=float), fwd, freq)
+
+    @staticmethod
+    def _put(cache, key, value):
+        cache[key] = value
+        if len(cache) > Curve.CACHE_SIZE:
+            cache.popitem(last=False)
+        return value
+
+    def interp_weights(self, times):
+        """(lo, w): value at `times` = (1 − w)·knot[lo] + w·knot[lo + 1], clamped at the ends."""
+        t = np.asarray(times, dtype=float)
+        key = (t.shape, t.tobytes())
+        if key in self._weights:
+            self._weights.move_to_end(key)
+            return self._weights[key]
+        tc = np.clip(t, self.times[0], self.times[-1])
+        lo = np.clip(np.searchsorted(self.times, tc, side="right") - 1, 0, len(self.times) - 2)
+        w  = (tc - self.times[lo]) / (self.times[lo + 1] - self.times[lo])
+        return self._put(self._weights, key, (lo, w))
+
+    def lookup(self, times):
+        """(DF, forward) at `times`."""
+        t = np.asarray(times, dtype=float)
+        key = (t.shape, t.tobytes())
+        if key in self._values:
+            self._values.move_to_end(key)
+            return self._values[key]
+        lo, w = self.interp_weights(t)
+        df  = self.dfs[lo]  + w * (self.dfs[lo + 1]  - self.dfs[lo])
+        fwd = self.fwds[lo] + w * (self.fwds[lo + 1] - self.fwds[lo])
+        return self._put(self._values, key, (df, fwd))
+
+    def df(self, times):
+        return self.lookup(times)[0]
+
+    def fwd(self, times):
+        return self.lookup(times)[1]
+
+    def bumped(self, shift):
+        """
+        Copy with log-DFs shifted by −shift·t (continuously-compounded shift; scalar
+        or one value per knot). Shares the knots and the schedule-weight cache.
+        """
+        log_df = self.log_df - np.asarray(shift, dtype=float) * self.times
+        return Curve(self.times, np.exp(log_df), None, self.freq, log_df, self._weights)
+
+    def to_series(self):
+        return (pd.Series(self.dfs, index=self.times, name="DF"),
+                pd.Series(self.fwds, index=self.times, name="FWD"))
+
 # ──────────────────────────────────────────────────────────
 # 3) Swap cash-flow schedule
 # ──────────────────────────────────────────────────────────
@@ -76,69 +147,93 @@ def generate_schedule(years, freq=2):
 def interpolate(series, times):
     return np.interp(times, series.index, series.values)
 
+def _lookup(df_series, fwd_series, times):
+    if isinstance(df_series, Curve):
+        return df_series.lookup(times)
+    return interpolate(df_series, times), interpolate(fwd_series, times)
+
 def price_swap(notional, fixed_rate, df_series, fwd_series, times, delta=0.5):
-    df   = interpolate(df_series, times)
-    fwd  = interpolate(fwd_series, times)
+    """df_series / fwd_series: Series on the tenor knots, or a Curve (fwd_series=None)."""
+    df, fwd = _lookup(df_series, fwd_series, times)
     pv_fxd = notional * fixed_rate * delta * np.sum(df)
     pv_flt = notional * delta * np.sum(df * fwd)
     return pv_flt - pv_fxd, pv_fxd, pv_flt
 
 def fair_rate(df_series, fwd_series, times, delta=0.5):
-    df  = interpolate(df_series, times)
-    fwd = interpolate(fwd_series, times)
+    df, fwd = _lookup(df_series, fwd_series, times)
     return np.sum(df * fwd) / np.sum(df)
 
 def dv01(notional, fixed_rate, df_series, times, bump=1e-4):
-    bumped_df  = df_series * np.exp(-bump * df_series.index)
-    fwd        = forwards_from_df(df_series)
-    fwd_bumped = forwards_from_df(bumped_df)
-
-    pv_base, *_ = price_swap(notional, fixed_rate, df_series, fwd, times)
-    pv_bump, *_ = price_swap(notional, fixed_rate, bumped_df, fwd_bumped, times)
+    curve = df_series if isinstance(df_series, Curve) else Curve.from_series(df_series)
+    pv_base, *_ = price_swap(notional, fixed_rate, curve, None, times)
+    pv_bump, *_ = price_swap(notional, fixed_rate, curve.bumped(bump), None, times)
     return (pv_bump - pv_base) / bump / notional
 
 # ──────────────────────────────────────────────────────────
-# 5) Main pipeline
+# 5) Pipeline
 # ──────────────────────────────────────────────────────────
-if __name__ == "__main__":
-    par   = download_par_yields()
+def run_swap(notional=100_000_000, maturity=5, fixed_rate=0.025, par=None,
+             shifts=np.linspace(-0.01, 0.01, 41)):
+    """
+    Bootstraps the curve and prices a fixed-for-float swap.
+
+    par    : optional par-yield Series (decimal) on TENORS_YRS; default latest FRED curve
+    shifts : parallel shifts (decimal) for the PV-vs-shift profile
+
+    Returns dict with par, disc, fwd, curve (Curve), pv, pv_fixed, pv_float, par_rate,
+    dv01, kr_dv01 (USD per bp on each tenor knot) and shift_pv (Series of PV in USD
+    indexed by shift in bp).
+    """
+    par   = download_par_yields() if par is None else par
     disc  = bootstrap_df(par)
-    fwd   = forwards_from_df(disc)
-
-    # --- Swap parameters ---
-    notional    = 100_000_000        # $100 mm
-    maturity    = 5                  # 5-year swap
-    fixed_rate  = 0.025              # 2.50% coupon
-    pay_times   = generate_schedule(maturity)   # 0.5, 1.0, …
-
-    # --- Price & analytics ---
-    pv, pv_fixed, pv_float = price_swap(notional, fixed_rate, disc, fwd, pay_times)
-    par_rate  = fair_rate(disc, fwd, pay_times)
-    dv01_val  = dv01(notional, fixed_rate, disc, pay_times)
-
-    print(f"\nSwap PV         : {pv/1e6: .2f} mm USD")
-    print(f"  > PV of fixed : {pv_fixed/1e6: .2f} mm")
-    print(f"  > PV of float : {pv_float/1e6: .2f} mm")
-    print(f"Fair par rate   : {par_rate*100:.3f}%")
-    print(f"DV01 (per $1)   : {dv01_val/1e4:.6f}")
-
-    # --- PV vs. parallel shift plot ---
-    shifts = np.linspace(-0.01, 0.01, 41)           # −100 → +100 bp
-    pvs = []
-    for s in shifts:
-        bumped_df  = disc * np.exp(-s * disc.index)
-        fwd_bumped = forwards_from_df(bumped_df)
-        pv_shift, *_ = price_swap(notional, fixed_rate, bumped_df, fwd_bumped, pay_times)
-        pvs.append(pv_shift / 1e6)
-
-    plt.figure()
-    plt.plot(shifts * 1e4, pvs)
+    curve = Curve.from_series(disc)
+    pay_times = generate_schedule(maturity)     # 0.5, 1.0, …
+
+    pv, pv_fixed, pv_float = price_swap(notional, fixed_rate, curve, None, pay_times)
+
+    # all shifts in one batched evaluation (local import: both modules import this one)
+    from swap_book import build_book
+    from scenarios import key_rate_dv01, parallel_shocks, scenario_pv
+    book = build_book(pd.DataFrame({"notional": [notional], "fixed_rate": [fixed_rate],
+                                    "maturity": [maturity]}))
+    pvs = scenario_pv(book, curve, parallel_shocks(shifts)).iloc[:, 0].to_numpy()
+
+    return {
+        "par": par, "disc": disc, "fwd": curve.to_series()[1], "curve": curve,
+        "pv": pv, "pv_fixed": pv_fixed, "pv_float": pv_float,
+        "par_rate": fair_rate(curve, None, pay_times),
+        "dv01": dv01(notional, fixed_rate, curve, pay_times),
+        "kr_dv01": key_rate_dv01(book, curve).iloc[0],
+        "shift_pv": pd.Series(pvs, index=np.asarray(shifts) * 1e4, name="PV"),
+    }
+
+def summary(res):
+    return [
+        f"\nSwap PV         : {res['pv']/1e6: .2f} mm USD",
+        f"  > PV of fixed : {res['pv_fixed']/1e6: .2f} mm",
+        f"  > PV of float : {res['pv_float']/1e6: .2f} mm",
+        f"Fair par rate   : {res['par_rate']*100:.3f}%",
+        f"DV01 (per $1)   : {res['dv01']/1e4:.6f}",
+    ]
+
+def plot_pv_vs_shift(res, fname="plots/pv_vs_shift.png", show=False):
+    plt = pyplot(show)
+    fig = plt.figure()
+    plt.plot(res["shift_pv"].index, res["shift_pv"].values / 1e6)
     plt.axhline(0, lw=0.8, ls="--", c="k")
     plt.xlabel("Parallel Shift (bp)")
     plt.ylabel("Swap PV (mm USD)")
     plt.title("Swap PV vs. Parallel Curve Shift")
     plt.grid(True)
-    os.makedirs("plots", exist_ok=True)
-    plt.savefig("plots/pv_vs_shift.png", dpi=300)
-    print(" PV-vs-shift plot saved to plots/pv_vs_shift.png")
+    os.makedirs(os.path.dirname(fname) or ".", exist_ok=True)
+    plt.savefig(fname, dpi=300)
+    if show:
+        plt.show()
+    plt.close(fig)
+    return fname
 
+if __name__ == "__main__":
+    res = run_swap()            # $100 mm, 5-year, 2.50% fixed
+    print("\n".join(summary(res)))
+    fname = plot_pv_vs_shift(res)
+    print(f" PV-vs-shift plot saved to {fname}")
@@ -0,0 +1,230 @@
+"""
+market_data.py
+
+Shared offline store for the daily market / macro series used by the research scripts
+(yfinance closes and FRED series).
+
+Layout:
+    <root>/<source>/<series>.parquet
+
+Each series is one Parquet file (date index, one `value` column). Its schema metadata records
+the date range already requested (`covered_start`, `covered_end`) and when the tail was last
+fetched (`fetched_at`). A request only downloads what the cache cannot answer:
+- head: dates before `covered_start`
+- tail: dates after `covered_end`, always
+- newest bars: from the last stored observation (re-fetched, so a partial bar or a revised print
+  is overwritten) to the requested end, at most once every `max_age`
+Every series is also memoised in-process, so repeated calls within one run never touch disk.
+
+With `offline=True` (or MARKET_DATA_OFFLINE=1) nothing is downloaded and the cached data is
+served as is; a failed download falls back to the cache with a warning.
+
+Note: yfinance closes are dividend/split adjusted, so a cached history can drift from a fresh
+download after a corporate action; pass `refresh=True` to rebuild a series from scratch.
+"""
+
+import os
+import time
+import warnings
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+STORE_ROOT = os.environ.get("MARKET_DATA_ROOT", str(Path(__file__).resolve().parent / "cache"))
+MAX_AGE = 12 * 3600         # seconds before the tail of a series is checked for new data
+
+_memo = {}                  # (root, source, series) -> (pd.Series, covered_start, fetched_at)
+
+
+def _offline_default():
+    return os.environ.get("MARKET_DATA_OFFLINE", "") not in ("", "0")
+
+
+# ---------------------------- FETCHERS ----------------------------------
+#   fetcher(symbols, start, end) -> DataFrame (date index, one column per symbol), end inclusive
+
+def _fetch_yahoo(symbols, start, end):
+    import yfinance as yf
+    data = yf.download(symbols, start=start, end=end + pd.Timedelta(days=1),
+                       auto_adjust=True, progress=False)
+    if data.empty:
+        return pd.DataFrame(columns=symbols)
+    px = data["Close"]
+    if isinstance(px, pd.Series):
+        px = px.to_frame(symbols[0])
+    return px
+
+
+def _fetch_fred(symbols, start, end):
+    import pandas_datareader.data as web
+    return web.DataReader(symbols, "fred", start, end)
+
+
+FETCHERS = {"yahoo": _fetch_yahoo, "fred": _fetch_fred}
+
+
+# ---------------------------- FILE I/O ----------------------------------
+
+def series_path(root, source, symbol):
+    """Parquet file holding one series (symbol is percent-encoded, e.g. 'ZN=F', 'DX-Y.NYB')."""
+    return Path(root) / source / (quote(symbol, safe="=.-_^") + ".parquet")
+
+
+def _read(root, source, symbol):
+    key = (str(root), source, symbol)
+    if key in _memo:
+        return _memo[key]
+    path = series_path(root, source, symbol)
+    if not path.exists():
+        return None
+    table = pq.read_table(path)
+    meta = table.schema.metadata or {}
+    s = table.to_pandas()["value"].rename(symbol)
+    covered_start = pd.Timestamp(meta[b"covered_start"].decode())
+    if b"covered_end" in meta:
+        covered_end = pd.Timestamp(meta[b"covered_end"].decode())
+    else:                               # files written before covered_end was recorded
+        covered_end = s.index[-1] if len(s) else covered_start
+    entry = (s, covered_start, covered_end, float(meta[b"fetched_at"]))
+    _memo[key] = entry
+    return entry
+
+
+def _write(root, source, symbol, s, covered_start, covered_end, fetched_at):
+    path = series_path(root, source, symbol)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(s.rename("value").rename_axis("date").to_frame())
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b"covered_start": str(covered_start.date()).encode(),
+        b"covered_end": str(covered_end.date()).encode(),
+        b"fetched_at": repr(fetched_at).encode(),
+    })
+    tmp = path.with_name(path.name + ".tmp")
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)               # readers never see a partial file
+    _memo[(str(root), source, symbol)] = (s, covered_start, covered_end, fetched_at)
+
+
+def _merge(old, new):
+    if old is None or old.empty:
+        return new.sort_index()
+    out = pd.concat([old, new])
+    return out[~out.index.duplicated(keep="last")].sort_index()
+
+
+# ---------------------------- PUBLIC API --------------------------------
+
+def missing_ranges(entry, start, end, now, max_age=MAX_AGE):
+    """
+    Date ranges (inclusive) of one series that must be downloaded to answer [start, end].
+
+    Parameters:
+    - entry: cached (series, covered_start, covered_end, fetched_at) or None
+    - start, end: requested range (Timestamps)
+    - now: current epoch seconds
+    - max_age: seconds after which the newest bars are re-checked
+    """
+    if entry is None:
+        return [(start, end)]
+    s, covered_start, covered_end, fetched_at = entry
+    ranges = []
+    if start < covered_start:
+        ranges.append((start, covered_start - pd.Timedelta(days=1)))
+    last_obs = s.index[-1] if len(s) else covered_start
+    stale = now - fetched_at > max_age
+    if end > covered_end or (stale and end >= last_obs):
+        # stale: from last_obs, so the newest bars are re-checked too (and no hole)
+        ranges.append((last_obs if stale else covered_end + pd.Timedelta(days=1), end))
+    return ranges
+
+
+def get_series(source, symbols, start, end=None, root=None, offline=None, max_age=MAX_AGE, refresh=False):
+    """
+    Daily series from the local store, downloading only what is missing.
+
+    Parameters:
+    - source: 'yahoo' (adjusted closes) or 'fred'
+    - symbols: list of tickers / FRED codes
+    - start, end: inclusive date range (end defaults to today)
+    - root: store directory (default STORE_ROOT / $MARKET_DATA_ROOT)
+    - offline: never download (default $MARKET_DATA_OFFLINE)
+    - max_age: seconds after which the newest bars of a cached series are re-checked
+    - refresh: discard the cached history of these symbols and download it again
+
+    Returns:
+    - DataFrame (DatetimeIndex, one column per symbol, NaN where a series has no print)
+    """
+    if source not in FETCHERS:
+        raise ValueError(f"Unknown market-data source: {source}")
+    symbols = [symbols] if isinstance(symbols, str) else list(symbols)
+    root = STORE_ROOT if root is None else root
+    offline = _offline_default() if offline is None else offline
+    start = pd.Timestamp(start).normalize()
+    end = pd.Timestamp.today().normalize() if end is None else pd.Timestamp(end).normalize()
+    now = time.time()
+
+    entries = {sym: (None if refresh else _read(root, source, sym)) for sym in symbols}
+
+    if not offline:
+        # batch symbols that need exactly the same date range into one download
+        todo = defaultdict(list)
+        for sym, entry in entries.items():
+            for rng in missing_ranges(entry, start, end, now, max_age):
+                todo[rng].append(sym)
+        for (lo, hi), syms in todo.items():
+            try:
+                got = FETCHERS[source](syms, lo, hi)
+            except Exception as exc:
+                if all(entries[s] is None for s in syms):
+                    raise
+                warnings.warn(f"{source} download failed ({exc}); serving cached {syms}")
+                continue
+            got.index = pd.DatetimeIndex(got.index).tz_localize(None).normalize()
+            for sym in syms:
+                new = got[sym].dropna().astype(float) if sym in got else None
+                old = entries[sym]
+                if new is None or new.empty:
+                    if old is not None and len(old[0]) and lo > old[0].index[-1]:
+                        # nothing printed yet after the last observation (weekend, holiday,
+                        # publication lag): covered for now, re-checked from last_obs after max_age
+                        entries[sym] = (old[0], old[1], max(hi, old[2]), now)
+                        continue
+                    # yfinance reports failures as empty frames: never record them as covered
+                    warnings.warn(f"{source} returned no data for {sym} in {lo.date()}..{hi.date()}")
+                    continue
+                if old is None:
+                    entries[sym] = (new.sort_index(), lo, hi, now)
+                    continue
+                tail = hi >= old[2]             # a head-only download leaves the tail's age alone
+                entries[sym] = (_merge(old[0], new), min(lo, old[1]), max(hi, old[2]),
+                                now if tail else old[3])
+        for sym, entry in entries.items():
+            if entry is not None and (refresh or entry is not _memo.get((str(root), source, sym))):
+                _write(root, source, sym, *entry)
+
+    missing = [sym for sym, entry in entries.items() if entry is None]
+    if missing:
+        raise KeyError(f"No {source} data available for {missing}")
+    frame = pd.concat({sym: entries[sym][0].loc[start:end] for sym in symbols}, axis=1)
+    frame.index.name = "Date"
+    return frame
+
+
+def yf_close(tickers, start, end=None, **kwargs):
+    """Adjusted daily closes (yfinance, auto_adjust=True); same options as get_series."""
+    return get_series("yahoo", tickers, start, end, **kwargs)
+
+
+def fred(codes, start, end=None, **kwargs):
+    """FRED series by code, columns named by code; same options as get_series."""
+    return get_series("fred", codes, start, end, **kwargs)
+
+
+def clear_memo():
+    """Drops the in-process memo (the on-disk store is untouched)."""
+    _memo.clear()
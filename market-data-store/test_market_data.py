@@ -0,0 +1,69 @@
+"""
+test_market_data.py
+
+Download planning of the store against a stub fetcher (no network).
+
+    python -m pytest test_market_data.py
+"""
+
+import pandas as pd
+import pytest
+
+import market_data as md
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Stub 'fred' source (business-day prints, value = day number); returns the call log."""
+    calls = []
+
+    def fetch(symbols, start, end):
+        calls.append((tuple(symbols), start, end))
+        idx = pd.bdate_range(start, end)
+        return pd.DataFrame({s: idx.dayofyear.to_numpy(dtype=float) for s in symbols}, index=idx)
+
+    monkeypatch.setitem(md.FETCHERS, "fred", fetch)
+    md.clear_memo()
+    yield tmp_path, calls
+    md.clear_memo()
+
+
+def test_longer_end_extends_the_tail(store):
+    root, calls = store
+    md.get_series("fred", ["X"], "2020-01-01", "2020-06-30", root=root)
+    df = md.get_series("fred", ["X"], "2020-01-01", "2024-01-01", root=root)
+
+    assert calls[1][1:] == (pd.Timestamp("2020-07-01"), pd.Timestamp("2024-01-01"))
+    assert df.index[-1] == pd.Timestamp("2024-01-01")
+    assert len(df) == len(pd.bdate_range("2020-01-01", "2024-01-01"))
+
+
+def test_covered_end_survives_a_restart(store):
+    root, calls = store
+    md.get_series("fred", ["X"], "2020-01-01", "2020-06-30", root=root)
+    md.clear_memo()
+    md.get_series("fred", ["X"], "2020-01-01", "2020-06-30", root=root)      # fresh, covered
+    df = md.get_series("fred", ["X"], "2020-01-01", "2020-12-31", root=root)
+
+    assert len(calls) == 2 and calls[1][1] == pd.Timestamp("2020-07-01")
+    assert df.index[-1] == pd.Timestamp("2020-12-31")
+
+
+def test_empty_tail_is_covered_until_max_age(store):
+    root, calls = store
+    md.get_series("fred", ["X"], "2020-01-01", "2020-01-03", root=root)       # Friday
+    md.get_series("fred", ["X"], "2020-01-01", "2020-01-05", root=root)       # weekend: no prints
+    md.get_series("fred", ["X"], "2020-01-01", "2020-01-05", root=root)
+    assert len(calls) == 2
+
+    md.get_series("fred", ["X"], "2020-01-01", "2020-01-05", root=root, max_age=-1)
+    assert calls[2][1] == pd.Timestamp("2020-01-03")                           # newest bars re-checked
+
+
+def test_head_is_fetched_before_covered_start(store):
+    root, calls = store
+    md.get_series("fred", ["X"], "2020-06-01", "2020-06-30", root=root)
+    df = md.get_series("fred", ["X"], "2020-01-01", "2020-06-30", root=root)
+
+    assert calls[1][1:] == (pd.Timestamp("2020-01-01"), pd.Timestamp("2020-05-31"))
+    assert df.index[0] == pd.Timestamp("2020-01-01")
@@ -0,0 +1 @@
+"""Helpers shared by the research projects (see research-common/README.md)."""
@@ -0,0 +1,24 @@
+"""
+research_common.plotting
+
+Lazy matplotlib import for the opt-in plot helpers of the research projects: importing this
+module does not load matplotlib, so the headless pipelines stay GUI-free.
+"""
+
+import os
+import sys
+
+
+def pyplot(show=False):
+    """
+    matplotlib.pyplot for a plot helper.
+
+    Headless calls (`show=False`) select the non-interactive Agg backend only while nothing else
+    has picked one: if pyplot is already loaded (e.g. a GUI session or notebook) or MPLBACKEND is
+    set, the active backend is left alone and the figures are just saved and closed.
+    """
+    import matplotlib
+    if not show and "matplotlib.pyplot" not in sys.modules and not os.environ.get("MPLBACKEND"):
+        matplotlib.use("Agg")               # headless: no GUI backend
+    import matplotlib.pyplot as plt
+    return plt
@@ -6,6 +6,8 @@ class Bond : public Instrument {
     int tenor_y_;
     int freq_;
     double face_{100.0};
+    std::vector<Cashflow> flows_;   // fixed at construction; npv() reuses it
+    std::vector<Cashflow> schedule() const;
 public:
     Bond(double coupon,int tenorYears,int frequency=2);
     double npv(const YieldCurve&) const override;
@@ -0,0 +1,35 @@
+#pragma once
+#include <cstddef>
+#include <cstdint>
+#include <memory>
+#include <span>
+#include <vector>
+namespace sre {
+class Instrument; class YieldCurve;
+// A portfolio's cash flows compiled against one curve's knots: contiguous SoA arrays
+// (amount, knot index) with instrument i owning rows [offset(i), offset(i+1)).
+// YieldCurve::discountFactor is a step lookup, so each flow resolves to exactly one knot
+// (weight 1) and a reprice is Σ amount·df[knot] over any flat array of knot DFs.
+class CashflowMatrix {
+    std::vector<std::size_t> offset_{0};
+    std::vector<std::uint32_t> knot_;
+    std::vector<double> amount_;
+    std::size_t knots_{0};
+public:
+    CashflowMatrix(const std::vector<std::shared_ptr<Instrument>>&,const YieldCurve&);
+    // From flat arrays: flow j pays amount[j] on day days[j]; instrument i owns flows
+    // [offset[i], offset[i+1]) (offset starts at 0 and ends at days.size()).
+    CashflowMatrix(const YieldCurve&,std::span<const int> days,std::span<const double> amount,
+                   std::span<const std::int64_t> offset);
+    std::size_t instruments() const { return offset_.size()-1; }
+    std::size_t flows() const { return amount_.size(); }
+    std::size_t knots() const { return knots_; }
+    std::size_t offset(std::size_t i) const { return offset_[i]; }
+    const std::uint32_t* knotIndex() const { return knot_.data(); }
+    const double* amount() const { return amount_.data(); }
+    // PV of instruments [i0, i1) on knot DFs `df` (knots() values, YieldCurve::knots() order)
+    double pv(const double* df,std::size_t i0,std::size_t i1) const;
+    double pv(const double* df) const { return pv(df,0,instruments()); }
+    void pvByInstrument(const double* df,double* out) const;   // out: instruments() values
+};
+}
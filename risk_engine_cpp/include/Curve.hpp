@@ -1,6 +1,8 @@
 #pragma once
 #include <map>
+#include <vector>
 #include <chrono>
+#include <cstddef>
 namespace sre {
 using Date = std::chrono::sys_days;
 class YieldCurve {
@@ -10,5 +12,10 @@ public:
     double discountFactor(int days) const;
     double zeroRate(int days) const;
     YieldCurve bumped(double shift_bp) const;
+    YieldCurve bumped(const std::vector<double>& knotShift_bp) const;   // one shift per knot
+    // Knots in day order; discountFactor(days) is the DF of knots()[knotIndex(days)].
+    std::vector<int> knots() const;
+    std::vector<double> knotDfs() const;
+    std::size_t knotIndex(int days) const;
 };
-}
\ No newline at end of file
+}
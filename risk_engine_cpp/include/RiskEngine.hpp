@@ -3,7 +3,7 @@
 #include <memory>
 #include "Scenario.hpp"
 namespace sre {
-class Instrument; class YieldCurve;
+class Instrument; class YieldCurve; class ThreadPool; class CashflowMatrix;
 struct ScenarioResult {
     std::string name; double pv_base; double pv_shocked;
     double dv01; double convexity;
@@ -11,8 +11,20 @@ struct ScenarioResult {
 class RiskEngine {
     const YieldCurve& baseCurve_;
     std::vector<std::shared_ptr<Instrument>> portfolio_;
+    std::shared_ptr<ThreadPool> pool_;
+    std::shared_ptr<const CashflowMatrix> flows_;   // compiled once against baseCurve_
 public:
-    RiskEngine(const YieldCurve&,std::vector<std::shared_ptr<Instrument>>);
+    // threads: worker count for runBatch (0 → hardware_concurrency, 1 → caller only)
+    RiskEngine(const YieldCurve&,std::vector<std::shared_ptr<Instrument>>,unsigned threads=0);
     ScenarioResult run(const Scenario&) const;
+    // Same results as run() per scenario. Base PV, DV01 and convexity are computed once;
+    // shocked PVs are priced off the compiled CashflowMatrix in scenario × instrument
+    // blocks on the thread pool.
+    std::vector<ScenarioResult> runBatch(const std::vector<Scenario>&) const;
+    // Portfolio PV under nS shocks: shift_bp is row-major nS × knots (bp per knot, as
+    // knotShifts), pv receives nS values. Buffers are read / written in place.
+    void priceShocks(const double* shift_bp,std::size_t nS,double* pv) const;
+    unsigned threads() const;
+    const CashflowMatrix& cashflowMatrix() const { return *flows_; }
 };
-}
\ No newline at end of file
+}
@@ -1,8 +1,18 @@
 #pragma once
+#include <map>
 #include <string>
+#include <vector>
 namespace sre {
+class YieldCurve;
+// Curve shock in bp per knot, applied as YieldCurve::bumped (DF·exp(−bp·1e-4)).
+// The three parts add up; a plain {"name", bp} is a parallel shift.
 struct Scenario {
     std::string name;
     double parallelShift_bp{0.0};
+    std::map<int,double> keyRate_bp{};   // knot (days) → shift; must be curve knots
+    double twist_bp{0.0};                // −twist at the first knot, +twist at the last
+    int twistPivot_days{365*5};          // linear in days either side, 0 at the pivot
 };
-}
\ No newline at end of file
+// Shift (bp) of every knot of `yc` under `s`, in YieldCurve::knots() order.
+std::vector<double> knotShifts(const Scenario& s,const YieldCurve& yc);
+}
@@ -0,0 +1,37 @@
+#pragma once
+#include <atomic>
+#include <condition_variable>
+#include <cstddef>
+#include <cstdint>
+#include <exception>
+#include <functional>
+#include <mutex>
+#include <thread>
+#include <vector>
+namespace sre {
+// Fixed set of worker threads running chunked parallel-for jobs.
+class ThreadPool {
+public:
+    using Range = std::function<void(std::size_t begin, std::size_t end)>;
+    explicit ThreadPool(unsigned threads = 0);   // 0 → hardware_concurrency
+    ~ThreadPool();
+    ThreadPool(const ThreadPool&) = delete;
+    ThreadPool& operator=(const ThreadPool&) = delete;
+    unsigned size() const { return unsigned(workers_.size()) + 1; }   // workers + caller
+    // Calls fn on consecutive chunks of [0, n) of at most `grain` items; blocks until all are
+    // done. The calling thread takes part; the first exception thrown by fn is rethrown.
+    void parallelFor(std::size_t n, std::size_t grain, const Range& fn);
+private:
+    void workerLoop();
+    void drain();
+    std::vector<std::thread> workers_;
+    std::mutex m_, run_m_;
+    std::condition_variable wake_, done_;
+    const Range* job_{nullptr};
+    std::size_t n_{0}, grain_{1}, busy_{0};
+    std::atomic<std::size_t> next_{0};
+    std::uint64_t generation_{0};
+    std::exception_ptr error_;
+    bool stop_{false};
+};
+}
@@ -0,0 +1,142 @@
+// pysre — Python bindings for the scenario risk engine.
+// Array arguments are read in place when they are C-contiguous with the native dtype
+// (int32 days, int64 offsets, float64 values); anything else is converted once on entry.
+// Valuation calls release the GIL.
+#include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+#include <pybind11/stl.h>
+#include <span>
+#include <stdexcept>
+#include "Bond.hpp"
+#include "CashflowMatrix.hpp"
+#include "Curve.hpp"
+#include "RiskEngine.hpp"
+namespace py=pybind11;
+using namespace sre;
+namespace {
+using dArray=py::array_t<double,py::array::c_style|py::array::forcecast>;
+using iArray=py::array_t<int,py::array::c_style|py::array::forcecast>;
+using oArray=py::array_t<std::int64_t,py::array::c_style|py::array::forcecast>;
+template<class T> std::span<const T> view(const py::array_t<T,py::array::c_style|py::array::forcecast>& a){
+    return {a.data(),std::size_t(a.size())};
+}
+template<class T> py::array_t<T> toArray(const std::vector<T>& v){ return py::array_t<T>(v.size(),v.data()); }
+void requireShape(const dArray& a,std::size_t cols,const char* what){
+    if(a.ndim()<1||a.ndim()>2||std::size_t(a.shape(a.ndim()-1))!=cols)
+        throw std::invalid_argument(std::string(what)+": last axis must have one value per curve knot");
+}
+py::array readOnly(py::array a){ a.attr("setflags")(py::arg("write")=false); return a; }
+py::dict asDict(const ScenarioResult& r){
+    return py::dict(py::arg("name")=r.name,py::arg("pv_base")=r.pv_base,py::arg("pv_shocked")=r.pv_shocked,
+                    py::arg("dv01")=r.dv01,py::arg("convexity")=r.convexity);
+}
+}
+PYBIND11_MODULE(pysre,m){
+    m.doc()="Scenario risk engine: yield curve, bonds, compiled cash-flow matrices and batch scenario runs.";
+
+    py::class_<YieldCurve>(m,"YieldCurve")
+        .def(py::init([](const iArray& days,const dArray& dfs){
+            if(days.size()!=dfs.size()) throw std::invalid_argument("YieldCurve: days and dfs differ in length");
+            if(days.size()==0) throw std::invalid_argument("YieldCurve: no knots");
+            std::map<int,double> df; for(py::ssize_t i=0;i<days.size();++i) df[days.data()[i]]=dfs.data()[i];
+            return YieldCurve{std::move(df)};
+        }),py::arg("days"),py::arg("dfs"))
+        .def("discount_factor",&YieldCurve::discountFactor,py::arg("days"))
+        .def("discount_factor",[](const YieldCurve& yc,const iArray& days){
+            py::array_t<double> out(days.request().shape);
+            const int* d=days.data(); double* o=out.mutable_data(); const auto n=days.size();
+            { py::gil_scoped_release nogil; for(py::ssize_t i=0;i<n;++i) o[i]=yc.discountFactor(d[i]); }
+            return out;
+        },py::arg("days"))
+        .def("zero_rate",&YieldCurve::zeroRate,py::arg("days"))
+        .def("bumped",py::overload_cast<double>(&YieldCurve::bumped,py::const_),py::arg("shift_bp"))
+        .def("bumped",[](const YieldCurve& yc,const dArray& s){
+            return yc.bumped(std::vector<double>(s.data(),s.data()+s.size()));
+        },py::arg("knot_shift_bp"))
+        .def_property_readonly("knots",[](const YieldCurve& yc){ return toArray(yc.knots()); })
+        .def_property_readonly("knot_dfs",[](const YieldCurve& yc){ return toArray(yc.knotDfs()); });
+
+    py::class_<Instrument,std::shared_ptr<Instrument>>(m,"Instrument")
+        .def("npv",&Instrument::npv,py::arg("curve"),py::call_guard<py::gil_scoped_release>())
+        .def("cashflows",[](const Instrument& i){
+            auto cfs=i.cashflows();
+            py::array_t<int> days(cfs.size()); py::array_t<double> amount(cfs.size());
+            for(std::size_t j=0;j<cfs.size();++j){ days.mutable_data()[j]=cfs[j].days; amount.mutable_data()[j]=cfs[j].amount; }
+            return py::make_tuple(days,amount);
+        },"(days, amount) arrays");
+    py::class_<Bond,Instrument,std::shared_ptr<Bond>>(m,"Bond")
+        .def(py::init<double,int,int>(),py::arg("coupon"),py::arg("tenor_years"),py::arg("frequency")=2);
+
+    py::class_<Scenario>(m,"Scenario")
+        .def(py::init([](std::string name,double par,std::map<int,double> kr,double twist,int pivot){
+            return Scenario{std::move(name),par,std::move(kr),twist,pivot};
+        }),py::arg("name"),py::arg("parallel_bp")=0.0,py::arg("key_rate_bp")=std::map<int,double>{},
+           py::arg("twist_bp")=0.0,py::arg("twist_pivot_days")=365*5)
+        .def_readwrite("name",&Scenario::name)
+        .def_readwrite("parallel_bp",&Scenario::parallelShift_bp)
+        .def_readwrite("key_rate_bp",&Scenario::keyRate_bp)
+        .def_readwrite("twist_bp",&Scenario::twist_bp)
+        .def_readwrite("twist_pivot_days",&Scenario::twistPivot_days)
+        .def("__repr__",[](const Scenario& s){ return "<Scenario '"+s.name+"'>"; });
+    m.def("knot_shifts",[](const Scenario& s,const YieldCurve& yc){ return toArray(knotShifts(s,yc)); },
+          py::arg("scenario"),py::arg("curve"),"Shift (bp) of every curve knot under the scenario.");
+
+    py::class_<CashflowMatrix,std::shared_ptr<CashflowMatrix>>(m,"CashflowMatrix")
+        .def(py::init<const std::vector<std::shared_ptr<Instrument>>&,const YieldCurve&>(),
+             py::arg("instruments"),py::arg("curve"))
+        .def(py::init([](const YieldCurve& yc,const iArray& days,const dArray& amount,const oArray& offset){
+            py::gil_scoped_release nogil;
+            return std::make_shared<CashflowMatrix>(yc,view(days),view(amount),view(offset));
+        }),py::arg("curve"),py::arg("days"),py::arg("amount"),py::arg("offset"))
+        .def_property_readonly("instruments",&CashflowMatrix::instruments)
+        .def_property_readonly("flows",&CashflowMatrix::flows)
+        .def_property_readonly("knots",&CashflowMatrix::knots)
+        // read-only views onto the compiled arrays (no copy; they keep the matrix alive)
+        .def_property_readonly("knot_index",[](py::object self){
+            auto& c=self.cast<const CashflowMatrix&>();
+            return readOnly(py::array_t<std::uint32_t>({py::ssize_t(c.flows())},{sizeof(std::uint32_t)},c.knotIndex(),self));
+        })
+        .def_property_readonly("amount",[](py::object self){
+            auto& c=self.cast<const CashflowMatrix&>();
+            return readOnly(py::array_t<double>({py::ssize_t(c.flows())},{sizeof(double)},c.amount(),self));
+        })
+        .def("pv",[](const CashflowMatrix& c,const dArray& knot_dfs){
+            requireShape(knot_dfs,c.knots(),"pv");
+            const std::size_t S=knot_dfs.ndim()==2?std::size_t(knot_dfs.shape(0)):1, n=c.instruments(), K=c.knots();
+            py::array_t<double> out=knot_dfs.ndim()==2?py::array_t<double>({py::ssize_t(S),py::ssize_t(n)})
+                                                      :py::array_t<double>(py::ssize_t(n));
+            const double* d=knot_dfs.data(); double* o=out.mutable_data();
+            { py::gil_scoped_release nogil; for(std::size_t s=0;s<S;++s) c.pvByInstrument(d+s*K,o+s*n); }
+            return out;
+        },py::arg("knot_dfs"),"Per-instrument PV on knot DFs: (knots,) → (instruments,), (S, knots) → (S, instruments).");
+
+    py::class_<RiskEngine>(m,"RiskEngine")
+        .def(py::init<const YieldCurve&,std::vector<std::shared_ptr<Instrument>>,unsigned>(),
+             py::arg("curve"),py::arg("instruments"),py::arg("threads")=0,
+             py::keep_alive<1,2>())                       // the engine holds a reference to the curve
+        .def_property_readonly("threads",&RiskEngine::threads)
+        .def_property_readonly("cashflow_matrix",&RiskEngine::cashflowMatrix,py::return_value_policy::reference_internal)
+        .def("run",[](const RiskEngine& e,const Scenario& s){
+            ScenarioResult r; { py::gil_scoped_release nogil; r=e.run(s); } return asDict(r);
+        },py::arg("scenario"),"dict: name, pv_base, pv_shocked, dv01, convexity")
+        .def("run_batch",[](const RiskEngine& e,const std::vector<Scenario>& scen){
+            std::vector<ScenarioResult> res; { py::gil_scoped_release nogil; res=e.runBatch(scen); }
+            const auto n=py::ssize_t(res.size());
+            py::list names; py::array_t<double> pv0{n}, pv1{n}, dv01{n}, cx{n};
+            for(py::ssize_t s=0;s<n;++s){
+                auto& r=res[std::size_t(s)]; names.append(r.name);
+                pv0.mutable_data()[s]=r.pv_base; pv1.mutable_data()[s]=r.pv_shocked;
+                dv01.mutable_data()[s]=r.dv01; cx.mutable_data()[s]=r.convexity;
+            }
+            return py::dict(py::arg("name")=names,py::arg("pv_base")=pv0,py::arg("pv_shocked")=pv1,
+                            py::arg("dv01")=dv01,py::arg("convexity")=cx);
+        },py::arg("scenarios"),"dict of per-scenario columns: name (list), pv_base, pv_shocked, dv01, convexity (arrays)")
+        .def("price_shocks",[](const RiskEngine& e,const dArray& shift_bp){
+            requireShape(shift_bp,e.cashflowMatrix().knots(),"price_shocks");
+            const std::size_t S=shift_bp.ndim()==2?std::size_t(shift_bp.shape(0)):1;
+            py::array_t<double> out{py::ssize_t(S)};
+            const double* s=shift_bp.data(); double* o=out.mutable_data();
+            { py::gil_scoped_release nogil; e.priceShocks(s,S,o); }
+            return out;
+        },py::arg("shift_bp"),"Portfolio PV for each row of a (S, knots) matrix of knot shifts in bp.");
+}
@@ -1,8 +1,9 @@
 #include "Bond.hpp"
 #include "Curve.hpp"
 namespace sre {
-Bond::Bond(double c,int tenor,int f):coupon_(c),tenor_y_(tenor),freq_(f){}
-std::vector<Cashflow> Bond::cashflows() const{
+Bond::Bond(double c,int tenor,int f):coupon_(c),tenor_y_(tenor),freq_(f),flows_(schedule()){}
+std::vector<Cashflow> Bond::cashflows() const{ return flows_; }
+std::vector<Cashflow> Bond::schedule() const{
     std::vector<Cashflow> v;int periods=tenor_y_*freq_;
     double coup=coupon_/freq_*face_;
     for(int i=1;i<=periods;++i){
@@ -10,7 +11,7 @@ std::vector<Cashflow> Bond::cashflows() const{
     } v.back().amount+=face_; return v;
 }
 double Bond::npv(const YieldCurve& yc) const{
-    double pv=0; for(auto& cf:cashflows()) pv+=cf.amount*yc.discountFactor(cf.days);
+    double pv=0; for(auto& cf:flows_) pv+=cf.amount*yc.discountFactor(cf.days);
     return pv;
 }
 }
\ No newline at end of file
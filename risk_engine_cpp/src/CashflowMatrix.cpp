@@ -0,0 +1,42 @@
+#include "CashflowMatrix.hpp"
+#include "Curve.hpp"
+#include "Instrument.hpp"
+#include <stdexcept>
+namespace sre {
+namespace {
+// rows [b, e): four accumulators so the gather/multiply-add chain is not one serial sum
+inline double dot(const double* a,const std::uint32_t* k,const double* df,std::size_t b,std::size_t e){
+    double s0=0,s1=0,s2=0,s3=0; std::size_t j=b;
+    for(;j+4<=e;j+=4){ s0+=a[j]*df[k[j]]; s1+=a[j+1]*df[k[j+1]]; s2+=a[j+2]*df[k[j+2]]; s3+=a[j+3]*df[k[j+3]]; }
+    for(;j<e;++j) s0+=a[j]*df[k[j]];
+    return (s0+s1)+(s2+s3);
+}
+}
+CashflowMatrix::CashflowMatrix(const std::vector<std::shared_ptr<Instrument>>& p,const YieldCurve& yc)
+    :knots_(yc.knots().size()){
+    offset_.reserve(p.size()+1);
+    for(auto& inst:p){
+        for(auto& cf:inst->cashflows()){ knot_.push_back(std::uint32_t(yc.knotIndex(cf.days))); amount_.push_back(cf.amount); }
+        offset_.push_back(amount_.size());
+    }
+}
+CashflowMatrix::CashflowMatrix(const YieldCurve& yc,std::span<const int> days,std::span<const double> amount,
+                               std::span<const std::int64_t> offset):knots_(yc.knots().size()){
+    if(days.size()!=amount.size()) throw std::invalid_argument("CashflowMatrix: days and amount differ in length");
+    if(offset.empty()||offset.front()!=0||std::size_t(offset.back())!=days.size())
+        throw std::invalid_argument("CashflowMatrix: offset must run from 0 to the number of flows");
+    offset_.clear(); offset_.reserve(offset.size());
+    for(auto o:offset){
+        if(std::size_t(o)<(offset_.empty()?0:offset_.back())) throw std::invalid_argument("CashflowMatrix: offset must be non-decreasing");
+        offset_.push_back(std::size_t(o));
+    }
+    knot_.reserve(days.size()); amount_.assign(amount.begin(),amount.end());
+    for(int d:days) knot_.push_back(std::uint32_t(yc.knotIndex(d)));
+}
+double CashflowMatrix::pv(const double* df,std::size_t i0,std::size_t i1) const{
+    return dot(amount_.data(),knot_.data(),df,offset_[i0],offset_[i1]);
+}
+void CashflowMatrix::pvByInstrument(const double* df,double* out) const{
+    for(std::size_t i=0;i<instruments();++i) out[i]=dot(amount_.data(),knot_.data(),df,offset_[i],offset_[i+1]);
+}
+}
@@ -1,5 +1,7 @@
 #include "Curve.hpp"
 #include <cmath>
+#include <iterator>
+#include <stdexcept>
 namespace sre {
 YieldCurve::YieldCurve(std::map<int,double> df):df_(std::move(df)){}
 double YieldCurve::discountFactor(int days) const{
@@ -17,4 +19,25 @@ YieldCurve YieldCurve::bumped(double shift_bp) const{
     for(auto& [d,df]:df_) out[d]=df*f;
     return YieldCurve{out};
 }
-}
\ No newline at end of file
+YieldCurve YieldCurve::bumped(const std::vector<double>& knotShift_bp) const{
+    if(knotShift_bp.size()!=df_.size()) throw std::invalid_argument("bumped: one shift per knot");
+    std::map<int,double> out; std::size_t k=0;
+    for(auto& [d,df]:df_) out[d]=df*std::exp(-knotShift_bp[k++]*1e-4);
+    return YieldCurve{out};
+}
+std::vector<int> YieldCurve::knots() const{
+    std::vector<int> v; v.reserve(df_.size());
+    for(auto& kv:df_) v.push_back(kv.first);
+    return v;
+}
+std::vector<double> YieldCurve::knotDfs() const{
+    std::vector<double> v; v.reserve(df_.size());
+    for(auto& kv:df_) v.push_back(kv.second);
+    return v;
+}
+std::size_t YieldCurve::knotIndex(int days) const{
+    auto it=df_.lower_bound(days);
+    if(it==df_.end()) return df_.size()-1;
+    return std::size_t(std::distance(df_.begin(),it));
+}
+}
@@ -1,15 +1,64 @@
 #include "RiskEngine.hpp"
+#include "CashflowMatrix.hpp"
 #include "Curve.hpp"
 #include "Instrument.hpp"
+#include "ThreadPool.hpp"
+#include <cmath>
+#include <algorithm>
 namespace sre {
-RiskEngine::RiskEngine(const YieldCurve& c,std::vector<std::shared_ptr<Instrument>> p):baseCurve_(c),portfolio_(std::move(p)){}
+namespace {
+constexpr std::size_t SCEN_BLOCK=64, INST_BLOCK=256;
+}
+RiskEngine::RiskEngine(const YieldCurve& c,std::vector<std::shared_ptr<Instrument>> p,unsigned threads)
+    :baseCurve_(c),portfolio_(std::move(p)),pool_(std::make_shared<ThreadPool>(threads)),
+     flows_(std::make_shared<const CashflowMatrix>(portfolio_,baseCurve_)){}
+unsigned RiskEngine::threads() const{ return pool_->size(); }
 ScenarioResult RiskEngine::run(const Scenario& s) const{
     auto calc=[&](const YieldCurve& yc){double v=0;for(auto& i:portfolio_)v+=i->npv(yc);return v;};
-    YieldCurve shock=baseCurve_.bumped(s.parallelShift_bp);
+    YieldCurve shock=baseCurve_.bumped(knotShifts(s,baseCurve_));
     double pv0=calc(baseCurve_), pv1=calc(shock);
     YieldCurve up=baseCurve_.bumped(1.0), down=baseCurve_.bumped(-1.0);
     double dv01=(calc(down)-calc(up))/2.0;
     double convex=(calc(up)+calc(down)-2*pv0);
     return {s.name,pv0,pv1,dv01,convex};
 }
-}
\ No newline at end of file
+std::vector<ScenarioResult> RiskEngine::runBatch(const std::vector<Scenario>& scen) const{
+    const std::size_t nS=scen.size(), K=flows_->knots();
+    // 1) base and ±1bp, once (a parallel bump scales every DF alike)
+    const double pv0=flows_->pv(baseCurve_.knotDfs().data());
+    const double up=pv0*std::exp(-1e-4), down=pv0*std::exp(1e-4);
+    const double dv01=(down-up)/2.0, convex=up+down-2*pv0;
+    // 2) knot shifts per scenario, then the shocked PVs
+    std::vector<double> shifts(nS*K), pv(nS);
+    pool_->parallelFor(nS,SCEN_BLOCK,[&](std::size_t b,std::size_t e){
+        for(std::size_t s=b;s<e;++s){ auto sh=knotShifts(scen[s],baseCurve_); std::copy(sh.begin(),sh.end(),&shifts[s*K]); }
+    });
+    priceShocks(shifts.data(),nS,pv.data());
+    std::vector<ScenarioResult> out; out.reserve(nS);
+    for(std::size_t s=0;s<nS;++s) out.push_back({scen[s].name,pv0,pv[s],dv01,convex});
+    return out;
+}
+void RiskEngine::priceShocks(const double* shift_bp,std::size_t nS,double* pv) const{
+    const CashflowMatrix& cf=*flows_;
+    const std::size_t nI=cf.instruments(), K=cf.knots();
+    const auto df=baseCurve_.knotDfs();
+    std::vector<double> dfs(nS*K);
+    pool_->parallelFor(nS,SCEN_BLOCK,[&](std::size_t b,std::size_t e){
+        for(std::size_t j=b*K;j<e*K;++j) dfs[j]=df[j%K]*std::exp(-shift_bp[j]*1e-4);
+    });
+    // scenario × instrument blocks; per-instrument-block partial sums, no shared writes
+    const std::size_t nSB=(nS+SCEN_BLOCK-1)/SCEN_BLOCK, nIB=(nI+INST_BLOCK-1)/INST_BLOCK;
+    std::vector<double> partial(nIB*nS,0.0);
+    pool_->parallelFor(nSB*nIB,1,[&](std::size_t b,std::size_t e){
+        for(std::size_t t=b;t<e;++t){
+            std::size_t sb=t/nIB, ib=t%nIB;
+            std::size_t s1=std::min(nS,(sb+1)*SCEN_BLOCK), i1=std::min(nI,(ib+1)*INST_BLOCK);
+            for(std::size_t s=sb*SCEN_BLOCK;s<s1;++s) partial[ib*nS+s]=cf.pv(&dfs[s*K],ib*INST_BLOCK,i1);
+        }
+    });
+    for(std::size_t s=0;s<nS;++s){
+        double v=0; for(std::size_t ib=0;ib<nIB;++ib) v+=partial[ib*nS+s];
+        pv[s]=v;
+    }
+}
+}
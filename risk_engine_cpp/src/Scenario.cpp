@@ -0,0 +1,23 @@
+#include "Scenario.hpp"
+#include "Curve.hpp"
+#include <algorithm>
+#include <stdexcept>
+namespace sre {
+std::vector<double> knotShifts(const Scenario& s,const YieldCurve& yc){
+    auto knots=yc.knots();
+    std::vector<double> out(knots.size(),s.parallelShift_bp);
+    if(s.twist_bp!=0.0){
+        double p=s.twistPivot_days, lo=p-knots.front(), hi=knots.back()-p;
+        for(std::size_t k=0;k<knots.size();++k){
+            double d=knots[k]-p, span=d<0?lo:hi;
+            if(span>0) out[k]+=s.twist_bp*d/span;
+        }
+    }
+    for(auto& [days,bp]:s.keyRate_bp){
+        auto it=std::lower_bound(knots.begin(),knots.end(),days);
+        if(it==knots.end()||*it!=days) throw std::invalid_argument("key-rate shift off the curve knots: "+s.name);
+        out[std::size_t(it-knots.begin())]+=bp;
+    }
+    return out;
+}
+}
@@ -0,0 +1,47 @@
+#include "ThreadPool.hpp"
+#include <algorithm>
+namespace sre {
+ThreadPool::ThreadPool(unsigned threads){
+    if(threads==0) threads=std::max(1u,std::thread::hardware_concurrency());
+    for(unsigned i=1;i<threads;++i) workers_.emplace_back([this]{ workerLoop(); });
+}
+ThreadPool::~ThreadPool(){
+    { std::lock_guard lk(m_); stop_=true; }
+    wake_.notify_all();
+    for(auto& t:workers_) t.join();
+}
+void ThreadPool::drain(){
+    for(;;){
+        std::size_t b=next_.fetch_add(grain_);
+        if(b>=n_) return;
+        try{ (*job_)(b,std::min(n_,b+grain_)); }
+        catch(...){ std::lock_guard lk(m_); if(!error_) error_=std::current_exception(); next_=n_; }
+    }
+}
+void ThreadPool::workerLoop(){
+    std::uint64_t seen=0;
+    for(;;){
+        { std::unique_lock lk(m_);
+          wake_.wait(lk,[&]{ return stop_||generation_!=seen; });
+          if(stop_) return;
+          seen=generation_; }
+        drain();
+        { std::lock_guard lk(m_); if(--busy_==0) done_.notify_one(); }
+    }
+}
+void ThreadPool::parallelFor(std::size_t n,std::size_t grain,const Range& fn){
+    if(n==0) return;
+    std::lock_guard run(run_m_);                       // one job at a time
+    grain=std::max<std::size_t>(grain,1);
+    if(workers_.empty()||n<=grain){ fn(0,n); return; }
+    { std::lock_guard lk(m_);
+      job_=&fn; n_=n; grain_=grain; next_=0; error_=nullptr;
+      busy_=workers_.size(); ++generation_; }
+    wake_.notify_all();
+    drain();
+    std::unique_lock lk(m_);
+    done_.wait(lk,[&]{ return busy_==0; });
+    job_=nullptr;
+    if(error_) std::rethrow_exception(error_);
+}
+}
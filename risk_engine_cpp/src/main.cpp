@@ -12,4 +12,7 @@ int main(){
     Scenario s{"+25bp",25.0};
     auto r=eng.run(s);
     std::cout<<r.name<<"\nPV:"<<r.pv_base<<"\nShocked:"<<r.pv_shocked<<"\nDV01:"<<r.dv01<<"\nConv:"<<r.convexity<<std::endl;
+    // batch: parallel, key-rate and twist shocks in one pass
+    std::vector<Scenario> batch{s,{"5y +10bp",0.0,{{365*5,10.0}}},{"steepener 20bp",0.0,{},20.0}};
+    for(auto& b:eng.runBatch(batch)) std::cout<<b.name<<"\tShocked:"<<b.pv_shocked<<std::endl;
 }
@@ -1,5 +1,71 @@
 #define CATCH_CONFIG_MAIN
 #include <catch2/catch_test_macros.hpp>  
+#include <catch2/catch_approx.hpp>
+#include <catch2/benchmark/catch_benchmark.hpp>
+#include <memory>
+#include <string>
+#include <thread>
 #include "Bond.hpp"
+#include "CashflowMatrix.hpp"
 #include "Curve.hpp"
+#include "RiskEngine.hpp"
 TEST_CASE("PV positive"){ using namespace sre; YieldCurve c({{0,1.0},{365,0.99}}); auto b=Bond(0.05,1,2); REQUIRE(b.npv(c)>0);}
+
+namespace {
+sre::YieldCurve testCurve(){ return sre::YieldCurve({{0,1.0},{365,0.98},{365*5,0.90},{365*10,0.82},{365*30,0.45}}); }
+std::vector<std::shared_ptr<sre::Instrument>> testBook(int n){
+    std::vector<std::shared_ptr<sre::Instrument>> v; int tenors[]={1,2,5,7,10,20,30};
+    for(int i=0;i<n;++i) v.push_back(std::make_shared<sre::Bond>(0.01+0.0005*(i%80),tenors[i%7],1+i%4));
+    return v;
+}
+std::vector<sre::Scenario> testScenarios(int n){
+    std::vector<sre::Scenario> v; int knots[]={0,365,365*5,365*10,365*30};
+    for(int i=0;i<n;++i){
+        double x=(i%41)-20.0;
+        if(i%3==0) v.push_back({"par"+std::to_string(i),x});
+        else if(i%3==1) v.push_back({"kr"+std::to_string(i),0.0,{{knots[i%5],x}}});
+        else v.push_back({"twist"+std::to_string(i),0.0,{},x,365*(2+i%8)});
+    }
+    return v;
+}
+}
+TEST_CASE("knot shifts: twist and key-rate"){
+    using namespace sre; auto c=testCurve();
+    auto sh=knotShifts({"t",1.0,{{365*10,5.0}},10.0,365*5},c);
+    REQUIRE(sh[0]==Catch::Approx(1.0-10.0)); REQUIRE(sh[2]==Catch::Approx(1.0));
+    REQUIRE(sh[3]==Catch::Approx(1.0+5.0+10.0*5/25)); REQUIRE(sh[4]==Catch::Approx(1.0+10.0));
+    REQUIRE_THROWS(knotShifts({"off-knot",0.0,{{400,1.0}}},c));
+}
+TEST_CASE("cash-flow matrix reprices as npv"){
+    using namespace sre; auto c=testCurve(); auto book=testBook(500);
+    CashflowMatrix m(book,c); auto df=c.knotDfs();
+    REQUIRE(m.instruments()==book.size()); REQUIRE(m.knots()==df.size());
+    std::vector<double> pv(m.instruments()); m.pvByInstrument(df.data(),pv.data());
+    double total=0;
+    for(std::size_t i=0;i<book.size();++i){ REQUIRE(pv[i]==Catch::Approx(book[i]->npv(c)).epsilon(1e-13)); total+=pv[i]; }
+    REQUIRE(m.pv(df.data())==Catch::Approx(total).epsilon(1e-13));
+}
+TEST_CASE("runBatch matches run"){
+    using namespace sre; auto c=testCurve();
+    RiskEngine eng(c,testBook(300),4);
+    auto scen=testScenarios(200); auto batch=eng.runBatch(scen);
+    REQUIRE(batch.size()==scen.size());
+    for(std::size_t s=0;s<scen.size();++s){
+        auto r=eng.run(scen[s]);
+        REQUIRE(batch[s].name==r.name);
+        REQUIRE(batch[s].pv_base==Catch::Approx(r.pv_base).epsilon(1e-12));
+        REQUIRE(batch[s].pv_shocked==Catch::Approx(r.pv_shocked).epsilon(1e-12));
+        REQUIRE(batch[s].dv01==Catch::Approx(r.dv01).epsilon(1e-8));
+        REQUIRE(batch[s].convexity==Catch::Approx(r.convexity).epsilon(1e-4));
+    }
+}
+// ./tests "[!benchmark]" — 5,000 scenarios × 2,000 bonds per run, by thread count
+TEST_CASE("runBatch scaling","[!benchmark]"){
+    using namespace sre; auto c=testCurve(); auto book=testBook(2000); auto scen=testScenarios(5000);
+    unsigned hw=std::max(1u,std::thread::hardware_concurrency());
+    for(unsigned n=1;;n=std::min(2*n,hw)){
+        RiskEngine eng(c,book,n);
+        BENCHMARK("runBatch threads="+std::to_string(n)){ return eng.runBatch(scen); };
+        if(n==hw) break;
+    }
+}
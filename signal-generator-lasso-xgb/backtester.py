@@ -193,10 +193,12 @@ def plot_equity_curve(timestamps, equity_curve):
 
 if __name__ == "__main__":
     import pandas as pd
+    from bar_store import STORE_ROOT, SYMBOL, SYNCED_TF, read_bars
+
+    # --- Load execution bars with mapped signals (see sync_dfs.py) ---
+    df = read_bars(STORE_ROOT, SYMBOL, SYNCED_TF,
+                   columns=['Close_time', 'Close', 'High', 'Low', 'Position', 'Rolling_TR', 'Realized_Vol_6'])
 
-    # --- Load sample data ---
-    df = pd.read_csv("sample_data.csv")
-    
     # --- Preprocess expected columns if needed ---
     # Assumes 'Close', 'High', 'Low', 'Position', 'Rolling_TR', 'Realized_Vol_6' are present
     # Add any missing ones or mock if testing
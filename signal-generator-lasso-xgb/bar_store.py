@@ -0,0 +1,243 @@
+"""
+bar_store.py
+
+Partitioned columnar store for OHLCV / signal bars, replacing the CSV hand-offs of the pipeline.
+
+Layout:
+    <root>/<symbol>/<timeframe>/<YYYY-MM-DD>.arrow
+
+Each partition is an uncompressed Arrow IPC file holding one UTC day of bars, sorted by the
+time column (default 'Close_time', stored as a typed timestamp). Files are memory-mapped on
+read, so only the columns and rows actually used are paged in:
+- column projection: `columns=[...]`
+- time-range predicate pushdown: day partitions outside [start, end] are never opened, and the
+  remaining files are sliced by binary search on the sorted time column.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+TIME_COL = 'Close_time'
+SUFFIX = '.arrow'
+
+# Pipeline defaults shared by the script entry points
+STORE_ROOT = 'bar_store'
+SYMBOL = 'ADAUSDT'
+SIGNAL_TF = '2h'
+EXEC_TF = '1m'
+SYNCED_TF = '1m_signals'    # execution bars with mapped signals (sync_dfs.py output)
+
+
+def partition_dir(root, symbol, timeframe):
+    """Directory holding the day partitions of one symbol/timeframe."""
+    return Path(root) / symbol / timeframe
+
+
+def list_partitions(root, symbol, timeframe, start=None, end=None):
+    """
+    Lists the day partition files of a symbol/timeframe, pruned to [start, end].
+
+    Returns:
+    - Sorted list of (day, path) tuples
+    """
+    base = partition_dir(root, symbol, timeframe)
+    if not base.is_dir():
+        return []
+    start_day = pd.Timestamp(start).normalize() if start is not None else None
+    end_day = pd.Timestamp(end).normalize() if end is not None else None
+
+    parts = []
+    for path in base.glob('*' + SUFFIX):
+        day = pd.Timestamp(path.stem)
+        if start_day is not None and day < start_day:
+            continue
+        if end_day is not None and day > end_day:
+            continue
+        parts.append((day, path))
+    return sorted(parts)
+
+
+def _atomic_write(table, path):
+    """Writes an Arrow IPC file via a temporary file + rename, so readers never see a partial partition."""
+    tmp = path.with_name(path.name + '.tmp')
+    with pa.OSFile(str(tmp), 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def write_bars(df, root, symbol, timeframe, time_col=TIME_COL):
+    """
+    Writes a bar DataFrame into day partitions, replacing the partitions it covers.
+
+    Parameters:
+    - df: DataFrame of bars (must include `time_col`)
+    - root: Store root directory
+    - symbol: Trading pair, e.g. "ADAUSDT"
+    - timeframe: Bar interval label, e.g. "1m", "2h"
+    - time_col: Timestamp column used for partitioning and range queries
+
+    Returns:
+    - List of written partition paths
+    """
+    df = df.reset_index(drop=True)
+    df[time_col] = pd.to_datetime(df[time_col])
+    if not df[time_col].is_monotonic_increasing:
+        df = df.sort_values(time_col, kind='stable').reset_index(drop=True)
+
+    base = partition_dir(root, symbol, timeframe)
+    base.mkdir(parents=True, exist_ok=True)
+
+    days = df[time_col].dt.normalize().to_numpy()
+    bounds = np.flatnonzero(days[1:] != days[:-1]) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(df)]))
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    written = []
+    for lo, hi in zip(starts, ends):
+        if hi <= lo:
+            continue
+        path = base / (pd.Timestamp(days[lo]).strftime('%Y-%m-%d') + SUFFIX)
+        _atomic_write(table.slice(lo, hi - lo), path)
+        written.append(path)
+    return written
+
+
+def append_bars(df, root, symbol, timeframe, key='Open_time', time_col=TIME_COL):
+    """
+    Merges new bars into the store. Each touched day partition is read, combined with the new
+    rows (de-duplicated on `key`, new rows win), and atomically replaced.
+
+    Parameters:
+    - df: DataFrame of new bars (must include `key` and `time_col`)
+    - root, symbol, timeframe: Dataset location
+    - key: Column identifying a bar
+    - time_col: Timestamp column used for partitioning
+
+    Returns:
+    - List of written partition paths
+    """
+    if df.empty:
+        return []
+    df = df.reset_index(drop=True)
+    df[time_col] = pd.to_datetime(df[time_col])
+    days = df[time_col].dt.normalize()
+
+    base = partition_dir(root, symbol, timeframe)
+    existing = []
+    for day in days.unique():
+        path = base / (pd.Timestamp(day).strftime('%Y-%m-%d') + SUFFIX)
+        if path.exists():
+            existing.append(pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all().to_pandas())
+
+    merged = pd.concat(existing + [df], ignore_index=True) if existing else df
+    merged = (merged.drop_duplicates(key, keep='last')
+                    .sort_values(time_col, kind='stable')
+                    .reset_index(drop=True))
+    return write_bars(merged, root, symbol, timeframe, time_col=time_col)
+
+
+def last_row(root, symbol, timeframe, columns=None):
+    """Returns the most recent stored bar as a Series (None if the dataset is empty)."""
+    parts = list_partitions(root, symbol, timeframe)
+    for _, path in reversed(parts):
+        table = _read_partition(path, columns, None, None, TIME_COL)
+        if table.num_rows:
+            return table.slice(table.num_rows - 1, 1).to_pandas().iloc[0]
+    return None
+
+
+def _read_partition(path, columns, start, end, time_col):
+    """Memory-maps one partition and applies the time-range slice and column projection."""
+    table = pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+
+    if start is not None or end is not None:
+        times = table.column(time_col).to_numpy()
+        lo = np.searchsorted(times, np.datetime64(pd.Timestamp(start)), side='left') if start is not None else 0
+        hi = np.searchsorted(times, np.datetime64(pd.Timestamp(end)), side='right') if end is not None else len(times)
+        table = table.slice(lo, max(hi - lo, 0))
+
+    if columns is not None:
+        table = table.select(list(columns))
+    return table
+
+
+def iter_bars(root, symbol, timeframe, columns=None, start=None, end=None, time_col=TIME_COL):
+    """
+    Yields one DataFrame per day partition in time order (for chunked, out-of-core processing).
+
+    Parameters:
+    - root, symbol, timeframe: Dataset location
+    - columns: Optional list of columns to project
+    - start, end: Optional inclusive time bounds on `time_col`
+    - time_col: Sorted timestamp column of the dataset
+    """
+    for _, path in list_partitions(root, symbol, timeframe, start, end):
+        table = _read_partition(path, columns, start, end, time_col)
+        if table.num_rows:
+            yield table.to_pandas()
+
+
+def read_bars(root, symbol, timeframe, columns=None, start=None, end=None, time_col=TIME_COL):
+    """
+    Reads a symbol/timeframe dataset as a single DataFrame.
+
+    Parameters:
+    - root, symbol, timeframe: Dataset location
+    - columns: Optional list of columns to project
+    - start, end: Optional inclusive time bounds on `time_col`
+    - time_col: Sorted timestamp column of the dataset
+
+    Returns:
+    - pd.DataFrame sorted by `time_col` (empty if nothing matches)
+    """
+    tables = [
+        _read_partition(path, columns, start, end, time_col)
+        for _, path in list_partitions(root, symbol, timeframe, start, end)
+    ]
+    if not tables:
+        return pd.DataFrame(columns=columns)
+    return pa.concat_tables(tables).to_pandas()
+
+
+def read_time_column(root, symbol, timeframe, start=None, end=None, time_col=TIME_COL):
+    """
+    Returns the time column of a dataset as a datetime64 array. With a single partition the
+    array is a zero-copy view of the memory-mapped file.
+    """
+    tables = [
+        _read_partition(path, [time_col], start, end, time_col)
+        for _, path in list_partitions(root, symbol, timeframe, start, end)
+    ]
+    if not tables:
+        return np.empty(0, dtype='datetime64[ns]')
+    return pa.concat_tables(tables).column(time_col).to_numpy()
+
+
+def import_csv(csv_path, root, symbol, timeframe, time_col=TIME_COL, chunksize=1_000_000):
+    """
+    One-off migration of an existing CSV file into the store, read in chunks.
+    Assumes the CSV is sorted by `time_col`; every '*_time' column is stored as a timestamp.
+    """
+    header = pd.read_csv(csv_path, nrows=0).columns
+    time_cols = [c for c in header if c.endswith('_time')]
+
+    written = set()
+    carry = None
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, parse_dates=time_cols):
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        # Hold back the last (possibly incomplete) day so its partition is written once, in full
+        last_day = chunk[time_col].iloc[-1].normalize()
+        tail = (chunk[time_col] >= last_day).to_numpy()
+        carry = chunk[tail]
+        if not tail.all():
+            written.update(write_bars(chunk[~tail], root, symbol, timeframe, time_col=time_col))
+    if carry is not None and len(carry):
+        written.update(write_bars(carry, root, symbol, timeframe, time_col=time_col))
+    return sorted(written)
@@ -7,10 +7,93 @@ This function retrieves and structures 1-minute price data into a clean DataFram
 Author: Gadim Gadimov
 """
 
+import numpy as np
 import pandas as pd
-from binance.client import Client
 
-def fetch_binance_data(symbol="ADAUSDT", interval="1m", desired_bars=50000):
+KLINE_COLUMNS = [
+    "Open_time", "Open", "High", "Low", "Close", "Volume",
+    "Close_time", "Quote_asset_volume", "Number_of_trades",
+    "Taker_buy_base_asset_volume", "Taker_buy_quote_asset_volume", "Ignore"
+]
+
+# Position of each decoded field in a raw kline row ('Ignore' is dropped)
+TIME_FIELDS = {"Open_time": 0, "Close_time": 6}
+INT_FIELDS = {"Number_of_trades": 8}
+FLOAT_FIELDS = {
+    "Open": 1, "High": 2, "Low": 3, "Close": 4, "Volume": 5,
+    "Quote_asset_volume": 7, "Taker_buy_base_asset_volume": 9, "Taker_buy_quote_asset_volume": 10
+}
+
+
+class KlineBuffer:
+    """
+    Preallocated typed columns that raw kline pages are decoded into as they arrive.
+
+    Timestamps are kept as int64 epoch milliseconds, prices/volumes as float64 and trade counts
+    as int64, so a million-bar pull never materialises an object-dtype frame of strings.
+    Pages can be written at any offset (e.g. newest-first when paging backwards).
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.columns = {name: np.empty(capacity, dtype=np.int64) for name in TIME_FIELDS}
+        self.columns.update({name: np.empty(capacity, dtype=np.int64) for name in INT_FIELDS})
+        self.columns.update({name: np.empty(capacity, dtype=np.float64) for name in FLOAT_FIELDS})
+        self.filled = np.zeros(capacity, dtype=bool)
+
+    def write(self, offset, page):
+        """
+        Decodes one page of raw kline rows into rows [offset, offset + len(page)).
+
+        Returns:
+            int: Number of rows written.
+        """
+        n = min(len(page), self.capacity - offset)
+        if n <= 0:
+            return 0
+        fields = list(zip(*page[:n]))        # one tuple per field, parsed straight into the buffers
+        for fmap in (TIME_FIELDS, INT_FIELDS, FLOAT_FIELDS):
+            for name, pos in fmap.items():
+                self.columns[name][offset:offset + n] = fields[pos]
+        self.filled[offset:offset + n] = True
+        return n
+
+    def to_frame(self):
+        """
+        Returns the decoded rows as a DataFrame (timestamps as datetime64[ms]). Unfilled slots are
+        dropped; when every slot is filled the buffers are handed over without a copy.
+        """
+        cols = self.columns
+        if not self.filled.all():
+            cols = {name: arr[self.filled] for name, arr in cols.items()}
+        data = {}
+        for name in KLINE_COLUMNS:
+            if name in TIME_FIELDS:
+                data[name] = cols[name].view("datetime64[ms]")
+            elif name in cols:
+                data[name] = cols[name]
+        return pd.DataFrame(data, copy=False)
+
+
+def klines_to_frame(all_klines):
+    """
+    Converts raw kline rows (as returned by the Binance API) into a typed, sorted DataFrame.
+
+    Parameters:
+        all_klines (list): List of 12-element kline rows.
+
+    Returns:
+        pd.DataFrame: OHLCV data sorted by open time.
+    """
+    buffer = KlineBuffer(len(all_klines))
+    buffer.write(0, all_klines)
+    df = buffer.to_frame()
+    if not df["Open_time"].is_monotonic_increasing:
+        df = df.sort_values("Open_time").reset_index(drop=True)
+    return df
+
+
+def fetch_binance_data(symbol="ADAUSDT", interval="1m", desired_bars=50000, cache_root=None):
     """
     Fetch historical futures data from Binance.
 
@@ -18,12 +101,22 @@ def fetch_binance_data(symbol="ADAUSDT", interval="1m", desired_bars=50000):
         symbol (str): Trading pair (default "ADAUSDT").
         interval (str): Time interval (default "1m").
         desired_bars (int): Number of data points to retrieve (max 1000 per API call).
+        cache_root (str): Optional bar store root. When given, only bars missing from the local
+            cache are downloaded (see kline_cache.py) and the result is read from the cache.
 
     Returns:
         pd.DataFrame: Cleaned and sorted OHLCV data.
     """
+    if cache_root is not None:
+        from kline_cache import sync_klines, load_klines
+
+        sync_klines([symbol], interval, root=cache_root, history_bars=desired_bars)
+        return load_klines(symbol, interval, root=cache_root, last_bars=desired_bars)
+
+    from binance.client import Client
+
     client = Client()  # <-- Replace with authenticated client for private access
-    all_klines = []
+    buffer = KlineBuffer(desired_bars)
     end_time = None
     fetched = 0
 
@@ -32,21 +125,13 @@ def fetch_binance_data(symbol="ADAUSDT", interval="1m", desired_bars=50000):
         klines = client.futures_klines(symbol=symbol, interval=interval, limit=limit, endTime=end_time)
         if not klines:
             break
-        all_klines.extend(klines)
-        fetched += len(klines)
+        # Pages arrive newest-first: fill the buffer from the back so it ends up time-ordered
+        n = len(klines)
+        buffer.write(desired_bars - fetched - n, klines)
+        fetched += n
         end_time = klines[0][0] - 1
 
-    df = pd.DataFrame(all_klines, columns=[
-        "Open_time", "Open", "High", "Low", "Close", "Volume",
-        "Close_time", "Quote_asset_volume", "Number_of_trades",
-        "Taker_buy_base_asset_volume", "Taker_buy_quote_asset_volume", "Ignore"
-    ])
-
-    df[["Open", "High", "Low", "Close", "Volume"]] = df[["Open", "High", "Low", "Close", "Volume"]].astype(float)
-    df["Open_time"] = pd.to_datetime(df["Open_time"], unit='ms')
-    df["Close_time"] = pd.to_datetime(df["Close_time"], unit='ms')
-
-    return df.sort_values("Open_time").reset_index(drop=True)
+    return buffer.to_frame()
 
 # Example usage:
 if __name__ == "__main__":
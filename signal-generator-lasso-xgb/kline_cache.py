@@ -0,0 +1,274 @@
+"""
+kline_cache.py
+
+Incremental, append-only kline sync into the local bar store.
+
+Instead of downloading `desired_bars` from scratch, each symbol/interval looks up its last stored
+'Close_time', fetches only the bars closed since then, backfills any holes inside the stored
+history (and the head, when more history is asked for than is stored), and merges the result into
+the day partitions of `bar_store` (each partition is replaced atomically). Only closed bars are
+stored, so a cached bar never changes afterwards.
+
+Ranges the exchange answered with no bars (outages, dates before listing) are tracked in
+`<symbol>/<interval>/_empty_ranges.json`: a range is skipped only after two syncs in a row came back
+empty for it (so one transient empty response hides nothing), and only for EMPTY_MAX_AGE; after that
+it is requested again. `sync_klines(..., forget_empty=True)` drops the record.
+
+Downstream stages read the cache directly via `load_klines` / `bar_store.read_bars`.
+"""
+
+import asyncio
+import json
+import os
+import time
+
+import numpy as np
+
+from bar_store import STORE_ROOT, append_bars, last_row, partition_dir, read_bars
+from kline_fetcher import INTERVAL_MS, fetch_kline_ranges_async
+
+
+def _to_ms(times):
+    """datetime64 Series/array → int64 epoch milliseconds."""
+    return np.asarray(times).astype('datetime64[ms]').view('i8')
+
+
+def find_gaps(open_times_ms, step_ms):
+    """
+    Finds missing bars in a sorted array of open times.
+
+    Returns:
+        list of (start_ms, end_ms) inclusive open-time ranges of the missing bars.
+    """
+    if len(open_times_ms) < 2:
+        return []
+    diffs = np.diff(open_times_ms)
+    holes = np.flatnonzero(diffs > step_ms)
+    return [(int(open_times_ms[i] + step_ms), int(open_times_ms[i + 1] - step_ms)) for i in holes]
+
+
+EMPTY_RANGES = '_empty_ranges.json'
+EMPTY_MAX_AGE = 30 * 86400      # seconds a confirmed empty range is skipped before it is re-checked
+
+
+def _merge_ranges(ranges, step_ms):
+    """Sorted union of inclusive open-time ranges (adjacent ranges are joined)."""
+    out = []
+    for start, end in sorted(ranges):
+        if out and start <= out[-1][1] + step_ms:
+            out[-1][1] = max(out[-1][1], end)
+        else:
+            out.append([start, end])
+    return [tuple(r) for r in out]
+
+
+def _subtract_ranges(ranges, remove, step_ms):
+    """Parts of `ranges` not covered by `remove` (both inclusive open-time ranges on the bar grid)."""
+    out = []
+    for start, end in ranges:
+        for r_start, r_end in remove:
+            if r_end < start or r_start > end:
+                continue
+            if r_start > start:
+                out.append((start, r_start - step_ms))
+            start = r_end + step_ms
+            if start > end:
+                break
+        if start <= end:
+            out.append((start, end))
+    return out
+
+
+def _read_empty_record(symbol, interval, root):
+    """
+    {'confirmed': [[start_ms, end_ms, seen_at_s], ...], 'suspect': [[start_ms, end_ms], ...]}.
+    A record from before the two-strike rule (a plain list) counts as suspect only.
+    """
+    path = partition_dir(root, symbol, interval) / EMPTY_RANGES
+    if not path.exists():
+        return {'confirmed': [], 'suspect': []}
+    record = json.loads(path.read_text())
+    if isinstance(record, list):
+        return {'confirmed': [], 'suspect': record}
+    return record
+
+
+def load_empty_ranges(symbol, interval="1m", root=STORE_ROOT, max_age=EMPTY_MAX_AGE, now=None):
+    """
+    Open-time ranges confirmed to have no bars on the exchange (empty on two syncs in a row, the
+    second less than `max_age` seconds ago), as a sorted list of (start_ms, end_ms).
+    """
+    now = time.time() if now is None else now
+    confirmed = _read_empty_record(symbol, interval, root)['confirmed']
+    return _merge_ranges([(s, e) for s, e, seen in confirmed if now - seen <= max_age], INTERVAL_MS[interval])
+
+
+def record_empty_ranges(symbol, interval, ranges, root=STORE_ROOT, max_age=EMPTY_MAX_AGE, now=None):
+    """
+    Updates the symbol's empty-range record after a sync whose requested ranges came back without
+    bars in `ranges` (atomic replace):
+
+    - parts that were already suspect (empty on the previous sync) become confirmed
+    - the rest of `ranges` becomes the new suspect list; earlier suspects that returned bars drop out
+    - confirmed ranges older than `max_age` seconds are dropped, so they are requested again
+    """
+    now = time.time() if now is None else now
+    step = INTERVAL_MS[interval]
+    record = _read_empty_record(symbol, interval, root)
+    empty = _merge_ranges(ranges, step)
+    suspect = _merge_ranges([tuple(r) for r in record['suspect']], step)
+    again = _subtract_ranges(empty, _subtract_ranges(empty, suspect, step), step)     # empty ∩ suspect
+
+    confirmed = [r for r in record['confirmed'] if now - r[2] <= max_age]
+    confirmed += [[s, e, now] for s, e in again]
+    new = {'confirmed': confirmed, 'suspect': [list(r) for r in _subtract_ranges(empty, again, step)]}
+    if new == record:
+        return
+    path = partition_dir(root, symbol, interval) / EMPTY_RANGES
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(json.dumps(new))
+    os.replace(tmp, path)
+
+
+def forget_empty_ranges(symbol, interval="1m", root=STORE_ROOT):
+    """Drops the symbol's empty-range record, so every missing range is requested again."""
+    path = partition_dir(root, symbol, interval) / EMPTY_RANGES
+    if path.exists():
+        path.unlink()
+
+
+def empty_parts(requested, open_times_ms, step_ms, newest_ms):
+    """
+    Sub-ranges of the requested open-time ranges that came back without bars, up to `newest_ms`
+    (the latest open time known to exist: anything after it may simply not be published yet).
+    """
+    opens = np.sort(np.asarray(open_times_ms, dtype=np.int64))
+    out = []
+    for start, end in requested:
+        end = min(end, newest_ms)
+        if end < start:
+            continue
+        inside = opens[(opens >= start) & (opens <= end)]
+        edges = np.concatenate(([start - step_ms], inside, [end + step_ms]))
+        out.extend(find_gaps(edges, step_ms))
+    return out
+
+
+def plan_sync(symbol, interval="1m", root=STORE_ROOT, history_bars=50000, backfill_gaps=True, now_ms=None):
+    """
+    Works out which open-time ranges a symbol/interval is missing locally.
+
+    Parameters:
+        symbol (str): Trading pair.
+        interval (str): Kline interval.
+        root (str): Bar store root.
+        history_bars (int): Bars of history wanted up to now; the head before the first stored bar
+            is fetched when the cache holds less.
+        backfill_gaps (bool): Also return holes inside the stored history.
+        now_ms (int): Current time in epoch ms (defaults to the wall clock).
+
+    Returns:
+        list of (start_ms, end_ms) inclusive open-time ranges to fetch, without ranges confirmed
+        empty on the exchange (see `load_empty_ranges`).
+    """
+    step = INTERVAL_MS[interval]
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    last_closed_open = now_ms // step * step - step
+
+    start = last_closed_open - (history_bars - 1) * step
+    last = last_row(root, symbol, interval, columns=['Close_time'])
+    if last is None:
+        ranges = [(start, last_closed_open)]
+    else:
+        stored = _to_ms(read_bars(root, symbol, interval, columns=['Open_time'])['Open_time'])
+        ranges = []
+        if len(stored) and stored[0] > start:
+            ranges.append((start, int(stored[0]) - step))         # head: more history than stored
+        if backfill_gaps:
+            ranges.extend(find_gaps(stored, step))
+        next_open = int(_to_ms([last['Close_time']])[0]) + 1
+        if next_open <= last_closed_open:
+            ranges.append((next_open, last_closed_open))
+    return _subtract_ranges(ranges, load_empty_ranges(symbol, interval, root, now=now_ms / 1000), step)
+
+
+async def sync_klines_async(symbols, interval="1m", root=STORE_ROOT, history_bars=50000,
+                            backfill_gaps=True, forget_empty=False, **fetch_kwargs):
+    """
+    Brings the local cache of several symbols up to date in one HTTP session.
+
+    Parameters:
+        symbols (list[str]): Trading pairs.
+        interval (str): Kline interval.
+        root (str): Bar store root.
+        history_bars (int): Bars to seed an empty cache with.
+        backfill_gaps (bool): Re-fetch holes inside the stored history.
+        forget_empty (bool): Drop the recorded empty ranges first and request them again.
+        **fetch_kwargs: Options of `kline_fetcher.fetch_kline_ranges_async` (base_url, rate limit, ...).
+
+    Returns:
+        dict: symbol -> number of bars written.
+    """
+    now_ms = int(time.time() * 1000)
+    if forget_empty:
+        for symbol in symbols:
+            forget_empty_ranges(symbol, interval, root)
+    ranges = {
+        symbol: plan_sync(symbol, interval, root, history_bars, backfill_gaps, now_ms=now_ms)
+        for symbol in symbols
+    }
+    frames = await fetch_kline_ranges_async({s: r for s, r in ranges.items() if r}, interval, **fetch_kwargs)
+
+    step = INTERVAL_MS[interval]
+    written = {}
+    for symbol in symbols:
+        df = frames.get(symbol)
+        opens = _to_ms(df['Open_time']) if df is not None else np.empty(0, dtype=np.int64)
+        # holes below the newest bar known to exist are candidates for the empty-range record
+        newest = [int(opens.max())] if len(opens) else []
+        last = last_row(root, symbol, interval, columns=['Open_time'])
+        if last is not None:
+            newest.append(int(_to_ms([last['Open_time']])[0]))
+        if newest:
+            record_empty_ranges(symbol, interval, empty_parts(ranges[symbol], opens, step, max(newest)),
+                                root, now=now_ms / 1000)
+        if df is None or df.empty:
+            written[symbol] = 0
+            continue
+        df = df[_to_ms(df['Close_time']) < now_ms]          # never cache the bar still forming
+        append_bars(df, root, symbol, interval)
+        written[symbol] = len(df)
+    return written
+
+
+def sync_klines(symbols, interval="1m", root=STORE_ROOT, history_bars=50000, backfill_gaps=True,
+                forget_empty=False, **fetch_kwargs):
+    """Synchronous wrapper around `sync_klines_async`."""
+    return asyncio.run(sync_klines_async(symbols, interval, root, history_bars, backfill_gaps, forget_empty,
+                                         **fetch_kwargs))
+
+
+def load_klines(symbol, interval="1m", root=STORE_ROOT, columns=None, start=None, end=None, last_bars=None):
+    """
+    Reads cached klines for the feature / backtest stages.
+
+    Parameters:
+        symbol (str), interval (str), root (str): Dataset location.
+        columns (list): Optional column projection.
+        start, end: Optional inclusive 'Close_time' bounds.
+        last_bars (int): Optionally keep only the most recent N bars.
+
+    Returns:
+        pd.DataFrame sorted by time.
+    """
+    df = read_bars(root, symbol, interval, columns=columns, start=start, end=end)
+    if last_bars is not None:
+        df = df.iloc[-last_bars:].reset_index(drop=True)
+    return df
+
+
+# Example usage (daily refresh):
+if __name__ == "__main__":
+    print(sync_klines(["ADAUSDT"], interval="1m"))
+    print(load_klines("ADAUSDT", "1m", last_bars=5))
@@ -0,0 +1,240 @@
+"""
+kline_fetcher.py
+
+Concurrent, rate-limited Binance futures kline fetcher.
+
+Instead of paging backwards one request at a time (see `fetch_data.fetch_binance_data`), the
+page time ranges are computed up front and fetched concurrently over one HTTP session, for any
+number of symbols. A token bucket keeps the request weight under the exchange's per-minute limit,
+and the `X-MBX-USED-WEIGHT-1M` response header is fed back into it so weight used by other
+clients on the same IP is respected. Failed pages are retried with exponential backoff.
+
+`base_url` can point at a local stand-in server replaying recorded responses for testing.
+"""
+
+import asyncio
+import random
+import time
+
+import aiohttp
+
+from fetch_data import KlineBuffer
+
+BASE_URL = "https://fapi.binance.com"
+KLINES_PATH = "/fapi/v1/klines"
+MAX_LIMIT = 1000                # bars per request
+WEIGHT_LIMIT_1M = 2400          # futures REQUEST_WEIGHT limit per minute
+
+INTERVAL_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000,
+    "8h": 28_800_000, "12h": 43_200_000, "1d": 86_400_000, "3d": 259_200_000,
+    "1w": 604_800_000,
+}
+
+RETRY_STATUS = {418, 429, 500, 502, 503, 504}
+
+
+def request_weight(limit):
+    """Request weight of a futures klines call for a given `limit`."""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+class TokenBucket:
+    """
+    Token bucket sized so that no rolling 60s window can exceed `weight_per_minute`:
+    a burst of `burst` tokens plus a refill of (weight_per_minute - burst) per minute.
+    """
+
+    def __init__(self, weight_per_minute=WEIGHT_LIMIT_1M, burst=None):
+        self.limit = weight_per_minute
+        self.capacity = burst if burst is not None else weight_per_minute // 4
+        self.rate = (weight_per_minute - self.capacity) / 60.0
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, weight):
+        """Waits until `weight` tokens are available and consumes them (FIFO across callers)."""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= weight:
+                    self.tokens -= weight
+                    return
+                await asyncio.sleep((weight - self.tokens) / self.rate)
+
+    def observe_used_weight(self, used):
+        """Throttles down when the exchange reports more used weight than the bucket accounts for."""
+        self._refill()
+        headroom = self.limit - used
+        if headroom < self.tokens:
+            self.tokens = float(headroom)
+
+
+def plan_pages(interval, desired_bars=None, start_ms=None, end_ms=None, now_ms=None):
+    """
+    Computes the page requests covering a kline range up front.
+
+    Either `desired_bars` (the latest N bars, including the one currently forming) or an explicit
+    open-time range [`start_ms`, `end_ms`] must be given.
+
+    Returns:
+        list of (startTime, endTime, limit) tuples in chronological order.
+    """
+    if interval not in INTERVAL_MS:
+        raise ValueError(f"Unsupported interval for page planning: {interval}")
+    step = INTERVAL_MS[interval]
+
+    if start_ms is None:
+        if desired_bars is None:
+            raise ValueError("Either desired_bars or start_ms must be given")
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        last_open = now_ms // step * step
+        start_ms = last_open - (desired_bars - 1) * step
+        end_ms = last_open
+    elif end_ms is None:
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        end_ms = now_ms // step * step
+
+    first_open = -(-start_ms // step) * step      # first bar opening at or after start_ms
+    n_bars = (end_ms - first_open) // step + 1
+    pages = []
+    for offset in range(0, max(n_bars, 0), MAX_LIMIT):
+        limit = min(MAX_LIMIT, n_bars - offset)
+        page_start = first_open + offset * step
+        pages.append((page_start, page_start + limit * step - 1, limit))
+    return pages
+
+
+async def _fetch_page(session, bucket, semaphore, base_url, params, max_retries, backoff):
+    """Fetches one page, retrying rate-limit / server / network errors with exponential backoff."""
+    weight = request_weight(params["limit"])
+    for attempt in range(max_retries + 1):
+        await bucket.acquire(weight)
+        retry_after = None
+        try:
+            async with semaphore:
+                async with session.get(base_url + KLINES_PATH, params=params) as resp:
+                    used = resp.headers.get("X-MBX-USED-WEIGHT-1M")
+                    if used is not None:
+                        bucket.observe_used_weight(int(used))
+                    if resp.status == 200:
+                        return await resp.json()
+                    if resp.status not in RETRY_STATUS:
+                        raise RuntimeError(
+                            f"Binance klines request failed ({resp.status}) for {params}: {await resp.text()}"
+                        )
+                    if resp.headers.get("Retry-After"):
+                        retry_after = float(resp.headers["Retry-After"])
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == max_retries:
+                raise
+        if attempt == max_retries:
+            break
+        delay = retry_after if retry_after is not None else backoff * 2 ** attempt
+        await asyncio.sleep(delay + random.uniform(0, backoff))
+    raise RuntimeError(f"Binance klines request still failing after {max_retries} retries: {params}")
+
+
+async def fetch_kline_ranges_async(ranges, interval="1m", base_url=BASE_URL, max_concurrency=10,
+                                   weight_per_minute=WEIGHT_LIMIT_1M, max_retries=5, backoff=0.5,
+                                   timeout=30, session=None):
+    """
+    Fetches explicit open-time ranges for several symbols concurrently in one HTTP session.
+
+    Parameters:
+        ranges (dict): symbol -> list of (start_ms, end_ms) inclusive open-time ranges.
+        interval (str): Kline interval (see INTERVAL_MS).
+        base_url (str): REST endpoint root; point at a local replay server for testing.
+        max_concurrency (int): Maximum number of requests in flight.
+        weight_per_minute (int): Request-weight budget per rolling minute.
+        max_retries (int): Retries per page on 418/429/5xx or network errors.
+        backoff (float): Base backoff in seconds (doubled per attempt, plus jitter).
+        timeout (float): Per-request timeout in seconds.
+        session (aiohttp.ClientSession): Optional existing session to reuse.
+
+    Returns:
+        dict: symbol -> typed OHLCV DataFrame, in chronological order of the requested ranges.
+    """
+    bucket = TokenBucket(weight_per_minute)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    # Every page has a known slot in its symbol's buffer, so it is decoded as soon as it arrives
+    plans = {
+        symbol: [page for start, end in symbol_ranges
+                 for page in plan_pages(interval, start_ms=start, end_ms=end)]
+        for symbol, symbol_ranges in ranges.items()
+    }
+    buffers = {symbol: KlineBuffer(sum(limit for *_, limit in pages)) for symbol, pages in plans.items()}
+
+    async def fetch_into(symbol, offset, params):
+        page = await _fetch_page(session, bucket, semaphore, base_url, params, max_retries, backoff)
+        buffers[symbol].write(offset, page)
+
+    own_session = session is None
+    if own_session:
+        session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout))
+    try:
+        tasks = []
+        for symbol, pages in plans.items():
+            offset = 0
+            for start, end, limit in pages:
+                params = {"symbol": symbol, "interval": interval, "startTime": start, "endTime": end, "limit": limit}
+                tasks.append(fetch_into(symbol, offset, params))
+                offset += limit
+        await asyncio.gather(*tasks)
+    finally:
+        if own_session:
+            await session.close()
+
+    return {symbol: buffer.to_frame() for symbol, buffer in buffers.items()}
+
+
+async def fetch_klines_async(symbols, interval="1m", desired_bars=50000, start_ms=None, end_ms=None, **kwargs):
+    """
+    Fetches the latest `desired_bars` klines (or an explicit open-time range) for several symbols.
+
+    Parameters:
+        symbols (list[str]): Trading pairs, e.g. ["ADAUSDT", "BTCUSDT"].
+        interval (str): Kline interval (see INTERVAL_MS).
+        desired_bars (int): Number of most recent bars per symbol (ignored if start_ms is given).
+        start_ms, end_ms (int): Optional explicit open-time range in epoch milliseconds.
+        **kwargs: Session / rate-limit / retry options of `fetch_kline_ranges_async`.
+
+    Returns:
+        dict: symbol -> typed OHLCV DataFrame, in chronological order.
+    """
+    pages = plan_pages(interval, desired_bars, start_ms, end_ms)
+    span = (pages[0][0], pages[-1][1]) if pages else None
+    ranges = {symbol: [span] if span else [] for symbol in symbols}
+    return await fetch_kline_ranges_async(ranges, interval, **kwargs)
+
+
+def fetch_binance_data_concurrent(symbols, interval="1m", desired_bars=50000, **kwargs):
+    """
+    Synchronous wrapper around `fetch_klines_async`.
+
+    Returns:
+        dict: symbol -> cleaned and sorted OHLCV DataFrame (same format as `fetch_binance_data`).
+    """
+    return asyncio.run(fetch_klines_async(symbols, interval, desired_bars, **kwargs))
+
+
+# Example usage:
+if __name__ == "__main__":
+    data = fetch_binance_data_concurrent(["ADAUSDT", "BTCUSDT"], interval="1m", desired_bars=10000)
+    for symbol, df in data.items():
+        print(symbol, len(df))
+        print(df.tail(3))
@@ -0,0 +1,128 @@
+"""
+kline_replay.py
+
+Local stand-in for the Binance futures klines endpoint (aiohttp.web), for exercising
+`kline_fetcher` / `kline_cache` without network access.
+
+Requests are answered like the exchange: the bars whose open time lies in [startTime, endTime],
+at most `limit`, with a running `X-MBX-USED-WEIGHT-1M` header. Bars are replayed from recorded raw
+rows (symbol -> list of 12-field kline rows, e.g. a saved API response) or, for symbols without a
+recording, generated deterministically from the open time. Failures (429 with Retry-After, 5xx)
+can be queued, and every request is logged with the number of requests in flight.
+
+    async with KlineReplay(delay=0.01) as replay:
+        replay.fail_next(429, retry_after=0.05)
+        data = await fetch_klines_async(["ADAUSDT", "BTCUSDT"], base_url=replay.url)
+        replay.requests, replay.peak_in_flight
+"""
+
+import asyncio
+import bisect
+import zlib
+
+from aiohttp import web
+
+from kline_fetcher import KLINES_PATH, request_weight
+
+
+def synthetic_kline(symbol, open_ms, interval_ms=60_000):
+    """Deterministic raw kline row (exchange format: numbers as strings) for a symbol / open time."""
+    base = 10 + zlib.crc32(symbol.encode()) % 90
+    close = base + (open_ms // interval_ms) % 1000 / 100
+    return [open_ms, f"{close - 0.01:.2f}", f"{close + 0.05:.2f}", f"{close - 0.05:.2f}", f"{close:.2f}",
+            "10.0", open_ms + interval_ms - 1, f"{10 * close:.4f}", 5, "4.0", f"{4 * close:.4f}", "0"]
+
+
+class KlineReplay:
+    """
+    aiohttp.web server replaying klines on 127.0.0.1 (a free port unless `port` is given).
+
+    recorded    : symbol -> raw kline rows sorted by open time; other symbols get synthetic_kline bars
+    interval_ms : bar spacing of the synthetic bars
+    delay       : seconds each response is held, so concurrent requests overlap
+    used_weight : request weight already used in the current minute (e.g. by other clients)
+    """
+
+    def __init__(self, recorded=None, interval_ms=60_000, delay=0.0, used_weight=0, port=0):
+        self.recorded = {symbol: list(rows) for symbol, rows in (recorded or {}).items()}
+        self._open_times = {symbol: [row[0] for row in rows] for symbol, rows in self.recorded.items()}
+        self.interval_ms = interval_ms
+        self.delay = delay
+        self.port = port
+        self.requests = []          # dicts: symbol, startTime, endTime, limit, status, in_flight
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.used_weight = used_weight
+        self._failures = []         # queued (symbol or None, status, retry_after)
+        self._runner = None
+
+    def fail_next(self, status, retry_after=None, symbol=None, times=1):
+        """Queues `times` failing responses for the next requests (of `symbol`, if given)."""
+        self._failures.extend([(symbol, status, retry_after)] * times)
+
+    def _pop_failure(self, symbol):
+        for i, (fail_symbol, status, retry_after) in enumerate(self._failures):
+            if fail_symbol is None or fail_symbol == symbol:
+                del self._failures[i]
+                return status, retry_after
+        return None
+
+    def _bars(self, symbol, start, end, limit):
+        if symbol in self.recorded:
+            times = self._open_times[symbol]
+            lo, hi = bisect.bisect_left(times, start), bisect.bisect_right(times, end)
+            return self.recorded[symbol][lo:min(hi, lo + limit)]
+        first = -(-start // self.interval_ms) * self.interval_ms
+        stop = min(end + 1, first + limit * self.interval_ms)
+        return [synthetic_kline(symbol, t, self.interval_ms) for t in range(first, stop, self.interval_ms)]
+
+    async def _klines(self, request):
+        q = request.query
+        symbol, limit = q["symbol"], int(q.get("limit", 500))
+        start, end = int(q["startTime"]), int(q["endTime"])
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        entry = {"symbol": symbol, "startTime": start, "endTime": end, "limit": limit,
+                 "in_flight": self.in_flight}
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            failure = self._pop_failure(symbol)
+            if failure is not None:
+                status, retry_after = failure
+                entry["status"] = status
+                headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+                return web.json_response({"code": -1003, "msg": "replayed failure"}, status=status,
+                                         headers=headers)
+            self.used_weight += request_weight(limit)
+            entry["status"] = 200
+            return web.json_response(self._bars(symbol, start, end, limit),
+                                     headers={"X-MBX-USED-WEIGHT-1M": str(self.used_weight)})
+        finally:
+            self.in_flight -= 1
+            self.requests.append(entry)
+
+    @property
+    def url(self):
+        """Base URL to pass as `base_url`."""
+        return f"http://127.0.0.1:{self.port}"
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get(KLINES_PATH, self._klines)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", self.port).start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -3,15 +3,63 @@ sync_dfs.py
 
 Synchronizes higher-timeframe signals (e.g., 2h) to lower-timeframe execution bars (e.g., 1m).
 Useful for aligning model signals with granular execution data for realistic backtesting.
+
+The mapping is done in one batch: a single `searchsorted` of all signal times against the
+execution clock, followed by one scatter into preallocated columns. Execution tapes that do
+not fit in memory can be streamed chunk by chunk (`iter_attach_signals`) or located directly
+on a memory-mapped timestamp array (`locate_signals`).
 """
 
 import pandas as pd
 import numpy as np
 
+def _to_ns(times):
+    """Converts a Series/array of timestamps to an int64 nanosecond array (no copy if already datetime64[ns])."""
+    if isinstance(times, pd.Series):
+        times = pd.to_datetime(times).to_numpy()
+    times = np.asarray(times)
+    if times.dtype.kind != 'M':
+        times = pd.to_datetime(times).to_numpy()
+    return times.astype('datetime64[ns]', copy=False).view('i8')
+
+
+def _signal_arrays(df_signal):
+    """
+    Extracts the valid signals (Position ≠ 0) as time-sorted NumPy arrays.
+
+    Returns:
+    - times (int64 ns), position, rolling_tr, close
+    """
+    mask = (df_signal['Position'] != 0).to_numpy()
+    times = _to_ns(df_signal['Close_time'])[mask]
+    position = df_signal['Position'].to_numpy()[mask]
+    rolling_tr = df_signal['Rolling_TR'].to_numpy(dtype=float)[mask]
+    close = df_signal['Close'].to_numpy(dtype=float)[mask]
+
+    if len(times) > 1 and np.any(np.diff(times) < 0):
+        order = np.argsort(times, kind='stable')
+        times, position, rolling_tr, close = times[order], position[order], rolling_tr[order], close[order]
+    return times, position, rolling_tr, close
+
+
+def _last_per_bar(exec_idx, *values):
+    """
+    Keeps one signal per execution bar. Signals are time-sorted, so the latest signal
+    mapped to a bar wins — the same outcome as the original row-by-row overwrite.
+    """
+    if len(exec_idx) < 2:
+        return (exec_idx,) + values
+    keep = np.append(exec_idx[1:] != exec_idx[:-1], True)
+    return (exec_idx[keep],) + tuple(v[keep] for v in values)
+
+
 def attach_signals_to_lower_tf(df_signal, df_exec):
     """
     Attaches signal information from a higher-timeframe DataFrame to a lower-timeframe execution DataFrame.
 
+    Each signal lands on the first execution bar whose 'Close_time' is strictly later than the
+    signal's 'Close_time'. Signals outside the execution time range are ignored.
+
     Parameters:
     - df_signal: DataFrame containing signals (must include 'Close_time', 'Position', 'Rolling_TR', 'Close')
     - df_exec: DataFrame with lower-timeframe execution bars (must include 'Close_time')
@@ -19,45 +67,132 @@ def attach_signals_to_lower_tf(df_signal, df_exec):
     Returns:
     - df_exec: Modified DataFrame with new columns ['Position', 'Rolling_TR', 'Signal_Close']
     """
-
-    df_signal['Close_time'] = pd.to_datetime(df_signal['Close_time'])
     df_exec['Close_time'] = pd.to_datetime(df_exec['Close_time'])
+    if not df_exec['Close_time'].is_monotonic_increasing:
+        df_exec = df_exec.sort_values('Close_time', kind='stable')
+    df_exec = df_exec.reset_index(drop=True)
+
+    sig_times, sig_pos, sig_tr, sig_close = _signal_arrays(df_signal)
+    exec_times = _to_ns(df_exec['Close_time'])
+
+    # Preallocated output columns
+    position = np.zeros(len(df_exec), dtype=sig_pos.dtype if len(sig_pos) else np.int64)
+    rolling_tr = np.full(len(df_exec), np.nan)
+    signal_close = np.full(len(df_exec), np.nan)
+
+    if len(exec_times) and len(sig_times):
+        in_range = sig_times >= exec_times[0]
+        match_idx = np.searchsorted(exec_times, sig_times[in_range], side='right')
+        valid = match_idx < len(exec_times)
+        idx, pos, tr, close = _last_per_bar(
+            match_idx[valid],
+            sig_pos[in_range][valid], sig_tr[in_range][valid], sig_close[in_range][valid]
+        )
+        position[idx] = pos
+        rolling_tr[idx] = tr
+        signal_close[idx] = close
+
+    df_exec['Position'] = position
+    df_exec['Rolling_TR'] = rolling_tr
+    df_exec['Signal_Close'] = signal_close
+    return df_exec
 
-    df_signal = df_signal.sort_values('Close_time').reset_index(drop=True)
-    df_exec = df_exec.sort_values('Close_time').reset_index(drop=True)
 
-    # Initialize or overwrite the following columns in execution DataFrame
-    df_exec['Position'] = 0
-    df_exec['Rolling_TR'] = np.nan
-    df_exec['Signal_Close'] = np.nan
+def iter_attach_signals(df_signal, exec_chunks):
+    """
+    Streaming version of `attach_signals_to_lower_tf` for execution tapes that do not fit in memory.
 
-    # Only use valid signals (Position ≠ 0)
-    signal_rows = df_signal[df_signal['Position'] != 0]
-    start_time = df_exec['Close_time'].min()
-    end_time = df_exec['Close_time'].max()
+    Parameters:
+    - df_signal: DataFrame containing signals (must include 'Close_time', 'Position', 'Rolling_TR', 'Close')
+    - exec_chunks: Iterable of execution DataFrames (each with 'Close_time'), ordered in time and
+      non-overlapping — e.g. `pd.read_csv(..., chunksize=...)` or per-day partitions
 
-    for _, row in signal_rows.iterrows():
-        signal_time = row['Close_time']
-        if not (start_time <= signal_time <= end_time):
-            continue
+    Yields:
+    - Each chunk with ['Position', 'Rolling_TR', 'Signal_Close'] attached, identical to the
+      rows `attach_signals_to_lower_tf` would produce on the concatenated tape.
+    """
+    sig_times, sig_pos, sig_tr, sig_close = _signal_arrays(df_signal)
+    cursor = None  # first signal not yet mapped
+
+    for chunk in exec_chunks:
+        chunk = chunk.reset_index(drop=True)
+        chunk['Close_time'] = pd.to_datetime(chunk['Close_time'])
+        exec_times = _to_ns(chunk['Close_time'])
+
+        position = np.zeros(len(chunk), dtype=sig_pos.dtype if len(sig_pos) else np.int64)
+        rolling_tr = np.full(len(chunk), np.nan)
+        signal_close = np.full(len(chunk), np.nan)
+
+        if len(exec_times):
+            if cursor is None:
+                # Signals before the start of the tape are never mapped
+                cursor = np.searchsorted(sig_times, exec_times[0], side='left')
+            # Signals strictly before this chunk's last bar land inside the chunk
+            stop = np.searchsorted(sig_times, exec_times[-1], side='left')
+            if stop > cursor:
+                match_idx = np.searchsorted(exec_times, sig_times[cursor:stop], side='right')
+                idx, pos, tr, close = _last_per_bar(
+                    match_idx, sig_pos[cursor:stop], sig_tr[cursor:stop], sig_close[cursor:stop]
+                )
+                position[idx] = pos
+                rolling_tr[idx] = tr
+                signal_close[idx] = close
+                cursor = stop
+
+        chunk['Position'] = position
+        chunk['Rolling_TR'] = rolling_tr
+        chunk['Signal_Close'] = signal_close
+        yield chunk
+
+
+def locate_signals(df_signal, exec_times):
+    """
+    Maps signals onto an execution clock without materialising the execution frame.
 
-        match_idx = df_exec['Close_time'].searchsorted(signal_time, side='right')
-        if match_idx < len(df_exec):
-            df_exec.at[match_idx, 'Position'] = row['Position']
-            df_exec.at[match_idx, 'Rolling_TR'] = row['Rolling_TR']
-            df_exec.at[match_idx, 'Signal_Close'] = row['Close']
+    Parameters:
+    - df_signal: DataFrame containing signals (must include 'Close_time', 'Position', 'Rolling_TR', 'Close')
+    - exec_times: Sorted datetime64 array of execution 'Close_time' values, in any unit (the bar
+      store keeps milliseconds); may be a `np.memmap`, in which case only the pages touched by the
+      binary search are read. The tape is never converted: signal times are floored to its unit.
 
-    return df_exec
+    Returns:
+    - DataFrame with one row per mapped execution bar: ['exec_index', 'Position', 'Rolling_TR', 'Signal_Close']
+    """
+    sig_times, sig_pos, sig_tr, sig_close = _signal_arrays(df_signal)
+    exec_times = np.asarray(exec_times)
+    if exec_times.dtype.kind == 'M':
+        # Bring the (small) signal array to the tape's unit rather than converting the tape;
+        # flooring keeps the strict "exec bar later than signal" comparison exact
+        sig_times = sig_times.view('datetime64[ns]').astype(exec_times.dtype).view('i8')
+        exec_times = exec_times.view('i8')
+
+    if len(exec_times):
+        in_range = sig_times >= exec_times[0]
+        match_idx = np.searchsorted(exec_times, sig_times[in_range], side='right')
+        valid = match_idx < len(exec_times)
+        idx, pos, tr, close = _last_per_bar(
+            match_idx[valid], sig_pos[in_range][valid], sig_tr[in_range][valid], sig_close[in_range][valid]
+        )
+    else:
+        idx, pos, tr, close = (np.empty(0, dtype=np.int64), sig_pos[:0], sig_tr[:0], sig_close[:0])
+
+    return pd.DataFrame({
+        'exec_index': idx.astype(np.int64),
+        'Position': pos,
+        'Rolling_TR': tr,
+        'Signal_Close': close
+    })
 
 
 if __name__ == "__main__":
-    # Load your higher and lower timeframe data
-    df_signal = pd.read_csv("data_signal.csv")   # e.g., 2h data
-    df_exec = pd.read_csv("data_exec.csv")       # e.g., 1m data
+    from bar_store import STORE_ROOT, SYMBOL, SIGNAL_TF, EXEC_TF, SYNCED_TF, read_bars, iter_bars, write_bars
+
+    # Higher timeframe signals are small; execution bars are streamed one day partition at a time
+    df_signal = read_bars(STORE_ROOT, SYMBOL, SIGNAL_TF, columns=['Close_time', 'Position', 'Rolling_TR', 'Close'])
 
-    # Perform mapping
-    df_exec_synced = attach_signals_to_lower_tf(df_signal, df_exec)
+    n_rows = 0
+    for chunk in iter_attach_signals(df_signal, iter_bars(STORE_ROOT, SYMBOL, EXEC_TF)):
+        write_bars(chunk, STORE_ROOT, SYMBOL, SYNCED_TF)
+        n_rows += len(chunk)
 
-    # Save result
-    df_exec_synced.to_csv("data_exec_with_signals.csv", index=False)
-    print("✅ Signal mapping complete. Saved to 'data_exec_with_signals.csv'.")
+    print(f"✅ Signal mapping complete. Saved {n_rows} bars to '{STORE_ROOT}/{SYMBOL}/{SYNCED_TF}'.")
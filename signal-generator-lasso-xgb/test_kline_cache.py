@@ -0,0 +1,78 @@
+"""
+test_kline_cache.py
+
+kline_cache.sync_klines against the local replay server (kline_replay.py): the empty-range record
+skips a range only after two empty answers in a row, expires, and can be dropped.
+
+    python -m pytest test_kline_cache.py
+"""
+
+import asyncio
+import time
+
+import pytest
+
+import kline_cache as kc
+from kline_replay import KlineReplay, synthetic_kline
+
+MINUTE = 60_000
+BARS = 600
+OUTAGE = (200, 260)                      # bar numbers without data on the exchange
+
+
+@pytest.fixture
+def tape():
+    """Recorded tape of the last BARS closed minutes with an outage; returns (rows, outage_ms)."""
+    first = (int(time.time() * 1000) // MINUTE - BARS - 1) * MINUTE
+    rows = [synthetic_kline("BTCUSDT", first + i * MINUTE) for i in range(BARS) if not OUTAGE[0] <= i < OUTAGE[1]]
+    return rows, (first + OUTAGE[0] * MINUTE, first + (OUTAGE[1] - 1) * MINUTE)
+
+
+def sync(root, rows, **kwargs):
+    """One sync_klines_async run against a fresh replay server; returns the requested (start, end)s."""
+    async def run():
+        async with KlineReplay(recorded={"BTCUSDT": rows}) as replay:
+            await kc.sync_klines_async(["BTCUSDT"], "1m", root, history_bars=BARS + 100,
+                                       base_url=replay.url, backoff=0.01, **kwargs)
+            return [(r["startTime"], r["endTime"]) for r in replay.requests]
+    return asyncio.run(run())
+
+
+def requested(requests, rng):
+    return any(s <= rng[0] and rng[1] <= e for s, e in requests)
+
+
+def test_outage_is_skipped_after_two_empty_answers(tmp_path, tape):
+    rows, outage = tape
+    sync(tmp_path, rows)
+    assert kc.load_empty_ranges("BTCUSDT", "1m", tmp_path) == []           # one empty answer: suspect
+
+    assert requested(sync(tmp_path, rows), outage)                           # asked again ...
+    assert outage in kc.load_empty_ranges("BTCUSDT", "1m", tmp_path)        # ... and confirmed
+    assert not requested(sync(tmp_path, rows), outage)
+
+
+def test_transient_empty_answer_is_not_recorded(tmp_path, tape):
+    rows, outage = tape
+    sync(tmp_path, rows)                                                      # outage looks empty once
+    full = rows + [synthetic_kline("BTCUSDT", t) for t in range(outage[0], outage[1] + 1, MINUTE)]
+    sync(tmp_path, sorted(full, key=lambda r: r[0]))                          # ... then the bars show up
+
+    assert not requested(kc.load_empty_ranges("BTCUSDT", "1m", tmp_path), outage)
+    assert len(kc.load_klines("BTCUSDT", "1m", tmp_path)) == BARS
+
+
+def test_confirmed_range_expires(tmp_path):
+    rng = [(0, 9 * MINUTE)]
+    kc.record_empty_ranges("X", "1m", rng, tmp_path, now=0)
+    kc.record_empty_ranges("X", "1m", rng, tmp_path, now=1)
+    assert kc.load_empty_ranges("X", "1m", tmp_path, now=2) == rng
+    assert kc.load_empty_ranges("X", "1m", tmp_path, now=2 + kc.EMPTY_MAX_AGE) == []
+
+
+def test_forget_empty(tmp_path, tape):
+    rows, outage = tape
+    sync(tmp_path, rows)
+    sync(tmp_path, rows)
+    assert requested(sync(tmp_path, rows, forget_empty=True), outage)
+    assert kc.load_empty_ranges("BTCUSDT", "1m", tmp_path) == []            # suspects only again
@@ -0,0 +1,107 @@
+"""
+test_kline_fetcher.py
+
+kline_fetcher against the local replay server (kline_replay.py): pagination, 429 / 5xx retries,
+concurrency across symbols and used-weight throttling.
+
+    python -m pytest test_kline_fetcher.py
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+import kline_fetcher as kf
+from kline_replay import KlineReplay, synthetic_kline
+
+MINUTE = 60_000
+START = 1_700_000_040_000 // MINUTE * MINUTE
+
+
+def fetch(replay_kwargs, ranges, failures=(), **fetch_kwargs):
+    """Runs fetch_kline_ranges_async against a fresh replay server; returns (data, replay)."""
+    async def run():
+        async with KlineReplay(**replay_kwargs) as replay:
+            for failure in failures:
+                replay.fail_next(**failure)
+            fetch_kwargs.setdefault("backoff", 0.01)
+            data = await kf.fetch_kline_ranges_async(ranges, "1m", base_url=replay.url, **fetch_kwargs)
+            return data, replay
+    return asyncio.run(run())
+
+
+def test_pagination():
+    n = 2 * kf.MAX_LIMIT + 500
+    end = START + (n - 1) * MINUTE
+    data, replay = fetch({}, {"ADAUSDT": [(START, end)]})
+
+    assert [(r["startTime"], r["endTime"], r["limit"]) for r in replay.requests] == \
+        kf.plan_pages("1m", start_ms=START, end_ms=end)
+    assert [r["limit"] for r in replay.requests] == [1000, 1000, 500]
+
+    df = data["ADAUSDT"]
+    open_ms = np.arange(START, end + 1, MINUTE)
+    assert len(df) == n
+    assert (df["Open_time"].to_numpy().view("i8") == open_ms).all()
+    assert df["Close"].iloc[-1] == float(synthetic_kline("ADAUSDT", end)[4])
+
+
+def test_recorded_gap_leaves_no_rows():
+    # an exchange outage: the recorded tape has no bars for 30 minutes
+    open_ms = [START + i * MINUTE for i in range(120) if not 40 <= i < 70]
+    rows = [synthetic_kline("BTCUSDT", t) for t in open_ms]
+    data, _ = fetch({"recorded": {"BTCUSDT": rows}}, {"BTCUSDT": [(START, START + 119 * MINUTE)]})
+
+    assert (data["BTCUSDT"]["Open_time"].to_numpy().view("i8") == open_ms).all()
+
+
+@pytest.mark.parametrize("status, retry_after", [(429, 0.05), (418, 0.05), (503, None), (500, None)])
+def test_retries_rate_limit_and_server_errors(status, retry_after):
+    failures = [{"status": status, "retry_after": retry_after, "symbol": "ADAUSDT", "times": 2}]
+    data, replay = fetch({}, {"ADAUSDT": [(START, START + 99 * MINUTE)]}, failures)
+
+    assert [r["status"] for r in replay.requests] == [status, status, 200]
+    assert len(data["ADAUSDT"]) == 100
+
+
+def test_gives_up_after_max_retries():
+    failures = [{"status": 503, "times": 3}]
+    with pytest.raises(RuntimeError, match="still failing"):
+        fetch({}, {"ADAUSDT": [(START, START + 9 * MINUTE)]}, failures, max_retries=2)
+
+
+def test_client_errors_are_not_retried():
+    failures = [{"status": 400}]
+    with pytest.raises(RuntimeError, match=r"failed \(400\)"):
+        fetch({}, {"ADAUSDT": [(START, START + 9 * MINUTE)]}, failures)
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 4])
+def test_concurrency_across_symbols(max_concurrency):
+    symbols = ["ADAUSDT", "BTCUSDT", "ETHUSDT", "SOLUSDT"]
+    end = START + (3 * kf.MAX_LIMIT - 1) * MINUTE
+    data, replay = fetch({"delay": 0.02}, {s: [(START, end)] for s in symbols},
+                         max_concurrency=max_concurrency)
+
+    assert len(replay.requests) == 4 * 3
+    assert replay.peak_in_flight == max_concurrency
+    for symbol in symbols:
+        df = data[symbol]
+        assert len(df) == 3 * kf.MAX_LIMIT and df["Open_time"].is_monotonic_increasing
+        assert df["Close"].iloc[0] == float(synthetic_kline(symbol, START)[4])
+
+
+def test_used_weight_header_throttles_bucket():
+    # another client on the IP already used 2390 of the 2400 weight: the bucket must drop to the headroom
+    async def run():
+        bucket = kf.TokenBucket(weight_per_minute=2400)
+        params = {"symbol": "ADAUSDT", "interval": "1m", "startTime": START,
+                  "endTime": START + 99 * MINUTE, "limit": 100}
+        async with KlineReplay(used_weight=2390) as replay, kf.aiohttp.ClientSession() as session:
+            page = await kf._fetch_page(session, bucket, asyncio.Semaphore(1), replay.url, params, 0, 0.01)
+        return page, bucket
+
+    page, bucket = asyncio.run(run())
+    assert len(page) == 100
+    assert bucket.tokens <= 2400 - 2390 - kf.request_weight(100)
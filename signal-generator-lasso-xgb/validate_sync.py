@@ -3,6 +3,9 @@ validate_sync.py
 
 Randomly samples and compares mapped signals from a higher timeframe (e.g., 2h) to a lower timeframe (e.g., 1m)
 to verify signal synchronization and mapping quality.
+
+`validate_mapping_full` checks every signal in one vectorized pass and returns a mismatch table
+plus summary counts instead of printing samples.
 """
 
 import pandas as pd
@@ -59,8 +62,102 @@ def validate_mapping(df_signal, df_exec, sample_size=10):
         # assert np.isclose(row_signal['Close'], row_exec['Signal_Close'], atol=1e-6), "Close mismatch!"
         # assert np.isclose(row_signal['Rolling_TR'], row_exec['Rolling_TR'], atol=1e-6), "TR mismatch!"
 
+
+def validate_mapping_full(df_signal, df_exec, atol=1e-6):
+    """
+    Validates the mapping of every usable signal in a single vectorized pass.
+
+    Parameters:
+    - df_signal: DataFrame containing original signal data (includes 'Close_time', 'Position', 'Rolling_TR', 'Close')
+    - df_exec: DataFrame with signals mapped (includes 'Close_time', 'Position', 'Signal_Close', 'Rolling_TR'),
+      sorted by 'Close_time'
+    - atol: Absolute tolerance for the 'Signal_Close' / 'Rolling_TR' comparisons
+
+    Returns:
+    - mismatches: DataFrame with one row per signal failing any check, with the expected exec bar
+      and boolean flags ['no_bar', 'position_mismatch', 'close_mismatch', 'tr_mismatch', 'collision']
+    - summary: Dict of counts, including exec bars carrying a position that no signal maps to ('orphan_bars')
+    """
+    sig_time = pd.to_datetime(df_signal['Close_time']).to_numpy()
+    exec_time = pd.to_datetime(df_exec['Close_time']).to_numpy()
+    n_exec = len(exec_time)
+
+    usable = (df_signal['Position'] != 0).to_numpy() & (n_exec > 0)
+    if n_exec:
+        usable &= (sig_time >= exec_time[0]) & (sig_time <= exec_time[-1])
+
+    sig = df_signal.loc[usable, ['Close_time', 'Position', 'Close', 'Rolling_TR']]
+    match_idx = np.searchsorted(exec_time, sig_time[usable], side='right')
+    no_bar = match_idx >= n_exec
+    safe_idx = np.minimum(match_idx, n_exec - 1)
+
+    exec_pos = df_exec['Position'].to_numpy()[safe_idx]
+    exec_close = df_exec['Signal_Close'].to_numpy(dtype=float)[safe_idx]
+    exec_tr = df_exec['Rolling_TR'].to_numpy(dtype=float)[safe_idx]
+
+    position_mismatch = ~no_bar & (exec_pos != sig['Position'].to_numpy())
+    close_mismatch = ~no_bar & ~np.isclose(exec_close, sig['Close'].to_numpy(dtype=float), atol=atol, equal_nan=True)
+    tr_mismatch = ~no_bar & ~np.isclose(exec_tr, sig['Rolling_TR'].to_numpy(dtype=float), atol=atol, equal_nan=True)
+
+    # Several signals landing on the same exec bar → all but one are overwritten
+    mapped_idx = np.where(no_bar, -1, match_idx)
+    bars, inverse, counts = np.unique(mapped_idx, return_inverse=True, return_counts=True)
+    collision = ~no_bar & (counts[inverse] > 1)
+
+    # Exec bars carrying a position that no signal maps to
+    exec_has_pos = df_exec['Position'].to_numpy() != 0
+    expected = np.zeros(n_exec, dtype=bool)
+    expected[match_idx[~no_bar]] = True
+    orphan_bars = int(np.count_nonzero(exec_has_pos & ~expected))
+
+    report = pd.DataFrame({
+        'signal_index': sig.index,
+        'signal_time': sig['Close_time'].to_numpy(),
+        'exec_index': np.where(no_bar, -1, match_idx),
+        'exec_time': np.where(no_bar, np.datetime64('NaT'), exec_time[safe_idx]),
+        'signal_position': sig['Position'].to_numpy(),
+        'exec_position': exec_pos,
+        'signal_close': sig['Close'].to_numpy(dtype=float),
+        'exec_signal_close': exec_close,
+        'signal_tr': sig['Rolling_TR'].to_numpy(dtype=float),
+        'exec_tr': exec_tr,
+        'no_bar': no_bar,
+        'position_mismatch': position_mismatch,
+        'close_mismatch': close_mismatch,
+        'tr_mismatch': tr_mismatch,
+        'collision': collision
+    })
+    failed = no_bar | position_mismatch | close_mismatch | tr_mismatch | collision
+    mismatches = report[failed].reset_index(drop=True)
+
+    summary = {
+        'usable_signals': int(len(sig)),
+        'matched': int(np.count_nonzero(~failed)),
+        'no_bar': int(no_bar.sum()),
+        'position_mismatch': int(position_mismatch.sum()),
+        'close_mismatch': int(close_mismatch.sum()),
+        'tr_mismatch': int(tr_mismatch.sum()),
+        'colliding_signals': int(collision.sum()),
+        'colliding_bars': int(np.count_nonzero(counts[bars >= 0] > 1)),
+        'orphan_bars': orphan_bars
+    }
+    return mismatches, summary
+
+
 if __name__ == "__main__":
-    df_signal = pd.read_csv("data_signal.csv")               # Higher timeframe
-    df_exec = pd.read_csv("data_exec_with_signals.csv")      # Lower timeframe with mapped signals
+    from bar_store import STORE_ROOT, SYMBOL, SIGNAL_TF, SYNCED_TF, read_bars
+
+    df_signal = read_bars(STORE_ROOT, SYMBOL, SIGNAL_TF,                 # Higher timeframe
+                          columns=['Close_time', 'Position', 'Rolling_TR', 'Close'])
+    df_exec = read_bars(STORE_ROOT, SYMBOL, SYNCED_TF,                   # Lower timeframe with mapped signals
+                        columns=['Close_time', 'Position', 'Signal_Close', 'Rolling_TR'])
+
+    mismatches, summary = validate_mapping_full(df_signal, df_exec)
+    print("🧾 Sync validation summary:")
+    for k, v in summary.items():
+        print(f"{k}: {v}")
+    if len(mismatches):
+        print(mismatches.head(20).to_string(index=False))
 
+    # Spot-check a few matches by eye
     validate_mapping(df_signal, df_exec)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Dynamic Nelson-Siegel State-Space Model
+---------------------------------------
+Joint model of the whole zero curve (Diebold-Rudebusch-Aruoba):
+
+    y_t = Λ(τ) f_t + ε_t                 ε_t ~ N(0, diag(h))      (zero rates, all tenors)
+    f_t − μ = A (f_{t−1} − μ) + η_t      η_t ~ N(0, Q = L Lᵀ)     (VAR(1) level / slope / curvature)
+
+  A is parameterised to stay stationary (‖A‖₂ < 1), so forecasts revert to μ.
+
+• hand-written Kalman filter + RTS smoother in NumPy
+  – diagonal H: the tenor dimension collapses to 3×3 algebra (information form)
+  – the covariance recursion does not depend on the data: it runs until it reaches
+    its steady state, after which only the 3-vector mean recursion loops over time
+• exact Gaussian log-likelihood, maximised over (τ, μ, A, L, h) with L-BFGS-B,
+  started from the two-step estimate (batch NS betas → OLS VAR); pass yesterday's
+  fit as `start` for a quick daily refit
+• h-step curve forecasts with confidence bands from the forecast factor covariance
+
+Internally yields are in percentage points; inputs and outputs are decimal.
+"""
+
+from collections import namedtuple
+
+import numpy as np, pandas as pd
+from scipy.linalg import solve_discrete_lyapunov
+from scipy.optimize import minimize
+from scipy.signal import lfilter
+from scipy.stats import norm
+
+from ns_batch import TAU_BOUNDS, TENORS_YRS, fit_ns_batch, ns_loadings
+
+SCALE       = 100.0           # decimal → percentage points
+RICCATI_TOL = 1e-9            # relative change of P_t|t−1 treated as steady state
+MIN_NOISE_SD = 0.01           # 1 bp floor on measurement noise (else h → 0 on tenors the factors fit exactly)
+
+DNSFit = namedtuple("DNSFit", "theta tau mu A Q h loglik tenors filtered smoothed state success")
+#   theta    : raw parameter vector (warm start for the next refit)
+#   tau, mu, A, Q, h : fitted parameters (mu, Q, h in percentage points)
+#   filtered / smoothed : DataFrames beta0, beta1, beta2 (decimal)
+#   state    : (mean, cov) of f_T | y_1..T (percentage points), the forecast origin
+
+# ---------- 1. Parameters ----------
+_TRIL = np.tril_indices(3)
+
+def _sym_power(S, p):
+    w, V = np.linalg.eigh(S)
+    return (V * w**p) @ V.T
+
+def _unpack(theta, k):
+    """
+    theta = [log τ, μ (3), vec B (9), L lower triangle (6, log diagonal), log h (k)].
+
+    A = (I + B Bᵀ)^(−1/2) B has singular values < 1, so the VAR is always stationary.
+    """
+    tau = np.exp(theta[0])
+    mu  = theta[1:4]
+    B   = theta[4:13].reshape(3, 3)
+    A   = _sym_power(np.eye(3) + B @ B.T, -0.5) @ B
+    L   = np.zeros((3, 3))
+    L[_TRIL] = theta[13:19]
+    L[np.diag_indices(3)] = np.exp(np.diag(L))
+    h   = np.exp(theta[19:19 + k])
+    return tau, mu, A, L @ L.T, h
+
+def _pack(tau, mu, A, Q, h, max_sv=0.999):
+    s = np.linalg.norm(A, 2)
+    A = A * min(1.0, max_sv / s) if s > 0 else A               # into the stationary region
+    B = _sym_power(np.eye(3) - A @ A.T, -0.5) @ A              # inverse of the map in _unpack
+    L = np.linalg.cholesky(Q)
+    L[np.diag_indices(3)] = np.log(np.diag(L))
+    return np.concatenate([[np.log(tau)], mu, B.ravel(), L[_TRIL], np.log(h)])
+
+def _initial_theta(Y, m):
+    """Two-step estimate: batch NS betas at a common τ, OLS VAR(1), residual variances."""
+    tau = float(np.median(fit_ns_batch(Y / SCALE, m)["tau"]))
+    Lam = ns_loadings(m, tau)
+    F   = Y @ np.linalg.pinv(Lam).T
+    X   = np.column_stack([np.ones(len(F) - 1), F[:-1]])
+    coef, *_ = np.linalg.lstsq(X, F[1:], rcond=None)
+    A   = coef[1:].T
+    try:
+        mu = np.linalg.solve(np.eye(3) - A, coef[0])
+    except np.linalg.LinAlgError:
+        mu = F.mean(axis=0)
+    resid = F[1:] - X @ coef
+    Q = np.cov(resid.T) + 1e-8 * np.eye(3)
+    h = np.maximum((Y - F @ Lam.T).var(axis=0), 1.1 * MIN_NOISE_SD**2)
+    return _pack(tau, mu, A, Q, h)
+
+# ---------- 2. Kalman filter / smoother ----------
+def _initial_state(mu, A, Q):
+    return mu.copy(), solve_discrete_lyapunov(A, Q)           # unconditional distribution
+
+def _linear_recursion(G, x0, b):
+    """
+    x_0 = x0, x_t+1 = G x_t + b_t for all t at once: in G's eigenbasis every mode is a
+    first-order IIR filter (scipy.signal.lfilter). Falls back to a loop if G is
+    (near-)defective.
+    """
+    lam, V = np.linalg.eig(G)
+    out = np.empty((len(b) + 1, len(x0)))
+    if np.linalg.cond(V) < 1e8:
+        Vi = np.linalg.inv(V)
+        u  = np.vstack([Vi @ x0, b @ Vi.T])                    # modal inputs
+        z  = np.column_stack([lfilter([1.0], [1.0, -l], u[:, i]) for i, l in enumerate(lam)])
+        out[:] = (z @ V.T).real
+        return out
+    x = x0
+    for t in range(len(out)):
+        out[t] = x
+        if t < len(b):
+            x = G @ x + b[t]
+    return out
+
+def kalman_filter(theta, Y, m, keep=False):
+    """
+    Log-likelihood of Y (T × k, percentage points) and, if `keep`, the predicted /
+    filtered means and covariances.
+
+    With H = diag(h): F_t⁻¹ and log|F_t| follow from the 3×3 matrices
+    M = ΛᵀH⁻¹Λ and P_t|t = (P_t|t−1⁻¹ + M)⁻¹ (Woodbury), and y_t enters only via
+    g_t = ΛᵀH⁻¹y_t and s_t = y_tᵀH⁻¹y_t.
+    """
+    T, k = Y.shape
+    tau, mu, A, Q, h = _unpack(theta, k)
+    Lam = ns_loadings(m, tau)
+    LH  = Lam / h[:, None]
+    M   = Lam.T @ LH
+    g   = Y @ LH                                              # (T, 3)
+    s   = (Y * Y / h).sum(axis=1)                             # (T,)
+    c   = mu - A @ mu
+
+    # covariance recursion (data-free) up to its steady state
+    a0, P = _initial_state(mu, A, Q)
+    P_pred, P_filt = [], []
+    for _ in range(T):
+        Pf = np.linalg.inv(np.linalg.inv(P) + M)
+        P_pred.append(P); P_filt.append(Pf)
+        P_next = A @ Pf @ A.T + Q
+        if np.max(np.abs(P_next - P)) < RICCATI_TOL * np.max(np.abs(P)):
+            break
+        P = P_next
+    t0 = len(P_pred)
+    P_pred = np.concatenate([np.array(P_pred), np.broadcast_to(P_next, (T - t0, 3, 3))])
+    P_filt = np.concatenate([np.array(P_filt), np.broadcast_to(P_filt[-1], (T - t0, 3, 3))])
+
+    # mean recursion: a_t+1 = c + A (a_t + Pf_t (g_t − M a_t))
+    a_pred = np.empty((T, 3))
+    a = a0
+    for t in range(min(t0, T)):
+        a_pred[t] = a
+        a = c + A @ (a + P_filt[t] @ (g[t] - M @ a))
+    if t0 < T:                                              # steady state: a_t+1 = G a_t + b_t
+        Pf = P_filt[-1]
+        G  = A @ (np.eye(3) - Pf @ M)
+        b  = g[t0:] @ (A @ Pf).T + c
+        a_pred[t0:] = _linear_recursion(G, a, b[:-1])
+
+    w = g - a_pred @ M                                       # ΛᵀH⁻¹ v_t
+    quad = (s - 2 * np.einsum("ti,ti->t", a_pred, g) + np.einsum("ti,ij,tj->t", a_pred, M, a_pred)
+            - np.einsum("ti,tij,tj->t", w, P_filt, w))
+    _, ld_pred = np.linalg.slogdet(P_pred)
+    _, ld_filt = np.linalg.slogdet(P_filt)
+    logdet = np.log(h).sum() + ld_pred - ld_filt
+    loglik = -0.5 * (T * k * np.log(2 * np.pi) + logdet.sum() + quad.sum())
+    if not keep:
+        return loglik
+    a_filt = a_pred + np.einsum("tij,tj->ti", P_filt, w)
+    return loglik, {"a_pred": a_pred, "P_pred": P_pred, "a_filt": a_filt, "P_filt": P_filt,
+                    "A": A, "t0": t0}
+
+def kalman_smoother(kf):
+    """Rauch-Tung-Striebel smoother on the output of kalman_filter(..., keep=True)."""
+    a_pred, P_pred, a_filt, P_filt, A = (kf[k] for k in ("a_pred", "P_pred", "a_filt", "P_filt", "A"))
+    T = len(a_filt)
+    a_s, P_s = a_filt.copy(), P_filt.copy()
+    for t in range(T - 2, -1, -1):
+        J = P_filt[t] @ A.T @ np.linalg.inv(P_pred[t + 1])
+        a_s[t] = a_filt[t] + J @ (a_s[t + 1] - a_pred[t + 1])
+        P_s[t] = P_filt[t] + J @ (P_s[t + 1] - P_pred[t + 1]) @ J.T
+    return a_s, P_s
+
+# ---------- 3. Maximum likelihood ----------
+def fit_dns(zero_hist, tenors=TENORS_YRS, start=None, maxiter=500, ftol=1e-9):
+    """
+    Fits the dynamic NS model to a zero-rate history (dates × tenors, decimal).
+
+    start : previous DNSFit or theta vector to warm-start from (daily refits)
+    ftol  : L-BFGS-B relative tolerance on the mean log-likelihood (the surface is
+            flat along the near-unit-root directions; tighter mostly costs time)
+    Returns DNSFit.
+    """
+    hist = zero_hist.dropna()
+    Y, m = hist.to_numpy(dtype=float) * SCALE, np.asarray(tenors, dtype=float)
+    k = Y.shape[1]
+    theta0 = _initial_theta(Y, m) if start is None else np.asarray(getattr(start, "theta", start))
+
+    bounds = ([tuple(np.log(TAU_BOUNDS))] + [(None, None)] * 3 + [(-30, 30)] * 9
+              + [(-20, 20)] * 6 + [(2 * np.log(MIN_NOISE_SD), 10)] * k)
+    def nll(th):
+        ll = kalman_filter(th, Y, m) / len(Y)
+        return -ll if np.isfinite(ll) else 1e10
+    opt = minimize(nll, theta0, method="L-BFGS-B", bounds=bounds,
+                   options={"maxiter": maxiter, "ftol": ftol})
+
+    loglik, kf = kalman_filter(opt.x, Y, m, keep=True)
+    a_s, _ = kalman_smoother(kf)
+    tau, mu, A, Q, h = _unpack(opt.x, k)
+    cols = ["beta0", "beta1", "beta2"]
+    return DNSFit(
+        theta=opt.x, tau=tau, mu=mu, A=A, Q=Q, h=h, loglik=loglik, tenors=m,
+        filtered=pd.DataFrame(kf["a_filt"] / SCALE, index=hist.index, columns=cols),
+        smoothed=pd.DataFrame(a_s / SCALE, index=hist.index, columns=cols),
+        state=(kf["a_filt"][-1], kf["P_filt"][-1]),
+        success=opt.success,
+    )
+
+# ---------- 4. Forecasts ----------
+def forecast_dns(fit, steps=30, tenors=None, conf=0.95):
+    """
+    1…steps-day-ahead curve forecasts from the last filtered state.
+
+    tenors : maturities to forecast (default: the fitted tenors)
+    Returns dict with mean, lower, upper (DataFrames horizon × tenor, decimal) and
+    factors (horizon × beta0..2). Bands cover factor uncertainty, plus measurement
+    noise when forecasting on the fitted tenors.
+    """
+    tenors = fit.tenors if tenors is None else np.asarray(tenors, dtype=float)
+    Lam = ns_loadings(tenors, fit.tau)
+    noise = fit.h if np.array_equal(tenors, fit.tenors) else 0.0
+    a, P = fit.state
+    means, sds, facs = [], [], []
+    for _ in range(steps):
+        a = fit.mu + fit.A @ (a - fit.mu)
+        P = fit.A @ P @ fit.A.T + fit.Q
+        facs.append(a)
+        means.append(Lam @ a)
+        sds.append(np.sqrt(np.einsum("ki,ij,kj->k", Lam, P, Lam) + noise))
+    z = norm.ppf(0.5 + conf / 2)
+    idx = pd.RangeIndex(1, steps + 1, name="horizon")
+    mean, sd = np.array(means) / SCALE, np.array(sds) / SCALE
+    return {
+        "mean":    pd.DataFrame(mean, index=idx, columns=tenors),
+        "lower":   pd.DataFrame(mean - z * sd, index=idx, columns=tenors),
+        "upper":   pd.DataFrame(mean + z * sd, index=idx, columns=tenors),
+        "factors": pd.DataFrame(np.array(facs) / SCALE, index=idx, columns=["beta0", "beta1", "beta2"]),
+    }
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Batched Nelson-Siegel / Svensson Fits
+-------------------------------------
+Fits every day of a zero-rate history at once instead of one L-BFGS-B run per day:
+
+• for fixed decay τ the curve is linear in the betas, so one pseudo-inverse of the
+  (tenors × factors) loading matrix gives the least-squares betas of all days
+• a grid of τ (or (τ1, τ2) for Svensson) picks the best grid point per day
+• optional refinement: vectorised golden-section search on each τ (log scale)
+  inside the bracket around every day's best grid point
+
+Output matches build_ns_history's betas DataFrame (plus tau and rmse columns).
+Betas are unconstrained; τ stays within fit_ns's bounds.
+
+    python ns_batch.py      # benchmark vs. the per-day fit_ns loop
+"""
+
+import time
+
+import numpy as np, pandas as pd
+
+from curve_bootstrap import TENORS_YRS
+
+TAU_BOUNDS = (0.05, 5.0)            # as fit_ns
+TAU_GAP    = 0.05                   # Svensson: log τ2 − log τ1 ≥ TAU_GAP (distinct curvatures)
+GOLDEN     = (np.sqrt(5) - 1) / 2
+
+# ---------- 1. Loadings ----------
+def _slope(x):
+    return (1 - np.exp(-x)) / x
+
+def ns_loadings(m, tau):
+    """(…, tenors, 3) Nelson-Siegel loadings [1, slope, curvature] for tau of shape (…)."""
+    x = np.asarray(m, dtype=float) / np.asarray(tau, dtype=float)[..., None]
+    s = _slope(x)
+    return np.stack([np.ones_like(x), s, s - np.exp(-x)], axis=-1)
+
+def svensson_loadings(m, tau1, tau2):
+    """(…, tenors, 4) Svensson loadings: NS on tau1 plus a second curvature on tau2."""
+    x2 = np.asarray(m, dtype=float) / np.asarray(tau2, dtype=float)[..., None]
+    return np.concatenate([ns_loadings(m, tau1), (_slope(x2) - np.exp(-x2))[..., None]], axis=-1)
+
+# ---------- 2. Profile least squares ----------
+def _solve(L, Y):
+    """
+    Betas and SSE per day. L: (tenors, p) shared or (n, tenors, p) per day; Y: (n, tenors).
+    A day whose loadings are (numerically) rank-deficient gets the minimum-norm betas.
+    """
+    if L.ndim == 2:
+        B = Y @ np.linalg.pinv(L).T                           # (n, p) — one pinv for all days
+        R = Y - B @ L.T
+    else:
+        try:
+            LtL = np.einsum("nkp,nkq->npq", L, L)             # small p × p normal equations
+            B = np.linalg.solve(LtL, np.einsum("nkp,nk->np", L, Y)[..., None])[..., 0]
+        except np.linalg.LinAlgError:                         # a singular day: SVD for the batch
+            B = np.einsum("npk,nk->np", np.linalg.pinv(L), Y)
+        R = Y - np.einsum("nkp,np->nk", L, B)
+    return B, (R * R).sum(axis=1)
+
+def _grid_search(Y, loadings, grid):
+    """Best grid point per day: returns (index into grid, SSE)."""
+    sse = np.stack([_solve(loadings(*g), Y)[1] for g in grid], axis=1)     # (n, G)
+    best = np.nanargmin(sse, axis=1)
+    return best, sse[np.arange(len(Y)), best]
+
+def _golden(f, lo, hi, iters=40):
+    """Vectorised golden-section minimisation of f on [lo, hi] (one bracket per day)."""
+    a, b = lo.copy(), hi.copy()
+    c, d = b - GOLDEN * (b - a), a + GOLDEN * (b - a)
+    fc, fd = f(c), f(d)
+    for _ in range(iters):
+        left = fc < fd                                        # minimum in [a, d]
+        a, b = np.where(left, a, c), np.where(left, d, b)
+        # the surviving interior point is reused; one new evaluation per step
+        x = np.where(left, b - GOLDEN * (b - a), a + GOLDEN * (b - a))
+        fx = f(x)
+        c, d, fc, fd = (np.where(left, x, d), np.where(left, c, x),
+                        np.where(left, fx, fd), np.where(left, fc, fx))
+    return np.where(fc < fd, c, d)
+
+def _prepare(zero_hist, tenors):
+    Y = np.asarray(zero_hist, dtype=float)
+    ok = np.isfinite(Y).all(axis=1)
+    return Y, ok, np.asarray(tenors, dtype=float)
+
+# ---------- 3. Batch fits ----------
+def fit_ns_batch(zero_hist, tenors=None, taus=None, refine=True):
+    """
+    Nelson-Siegel fit of every row of `zero_hist` (dates × tenors, decimal zero rates).
+
+    taus   : τ grid (default 60 log-spaced points in TAU_BOUNDS)
+    refine : golden-section on log τ between the neighbours of each day's best grid point
+
+    Returns DataFrame beta0, beta1, beta2, tau, rmse indexed by date (NaN for incomplete rows).
+    """
+    tenors = TENORS_YRS if tenors is None else tenors
+    Y, ok, m = _prepare(zero_hist, tenors)
+    taus = np.geomspace(*TAU_BOUNDS, 60) if taus is None else np.asarray(taus, dtype=float)
+    Yok = Y[ok]
+
+    best, _ = _grid_search(Yok, lambda t: ns_loadings(m, t), [(t,) for t in taus])
+    tau = taus[best]
+    if refine:
+        lo = np.log(taus[np.maximum(best - 1, 0)])
+        hi = np.log(taus[np.minimum(best + 1, len(taus) - 1)])
+        tau = np.exp(_golden(lambda lt: _solve(ns_loadings(m, np.exp(lt)), Yok)[1], lo, hi))
+    B, sse = _solve(ns_loadings(m, tau), Yok)
+
+    out = np.full((len(Y), 5), np.nan)
+    out[ok] = np.column_stack([B, tau, np.sqrt(sse / len(m))])
+    index = getattr(zero_hist, "index", None)
+    return pd.DataFrame(out, index=index, columns=["beta0", "beta1", "beta2", "tau", "rmse"])
+
+def fit_svensson_batch(zero_hist, tenors=None, taus=None, refine=True, sweeps=2):
+    """
+    Svensson fit of every row: grid over τ1 < τ2 pairs, then `sweeps` rounds of
+    golden-section refinement on each τ in turn (the other held fixed). The refinement
+    brackets keep τ2 ≥ τ1·exp(TAU_GAP), so the two curvature loadings never coincide.
+
+    Returns DataFrame beta0…beta3, tau1, tau2, rmse indexed by date.
+    """
+    tenors = TENORS_YRS if tenors is None else tenors
+    Y, ok, m = _prepare(zero_hist, tenors)
+    taus = np.geomspace(*TAU_BOUNDS, 30) if taus is None else np.asarray(taus, dtype=float)
+    Yok = Y[ok]
+
+    pairs = [(t1, t2) for i, t1 in enumerate(taus) for t2 in taus[i + 1:]]
+    best, _ = _grid_search(Yok, lambda t1, t2: svensson_loadings(m, t1, t2), pairs)
+    t1, t2 = np.array(pairs)[best].T
+    if refine:
+        step = np.log(taus[1] / taus[0])                      # one grid step either side
+        lo_b, hi_b = np.log(TAU_BOUNDS[0]), np.log(TAU_BOUNDS[1])
+        for _ in range(sweeps):
+            l1, l2 = np.log(t1), np.log(t2)
+            hi = np.minimum(np.minimum(l1 + step, hi_b), l2 - TAU_GAP)      # τ1 stays below τ2
+            t1 = np.exp(_golden(lambda x: _solve(svensson_loadings(m, np.exp(x), t2), Yok)[1],
+                                np.minimum(np.maximum(l1 - step, lo_b), hi), hi))
+            l1 = np.log(t1)
+            lo = np.maximum(np.maximum(l2 - step, lo_b), l1 + TAU_GAP)      # τ2 stays above τ1
+            t2 = np.exp(_golden(lambda x: _solve(svensson_loadings(m, t1, np.exp(x)), Yok)[1],
+                                lo, np.maximum(np.minimum(l2 + step, hi_b), lo)))
+    B, sse = _solve(svensson_loadings(m, t1, t2), Yok)
+
+    out = np.full((len(Y), 7), np.nan)
+    out[ok] = np.column_stack([B, t1, t2, np.sqrt(sse / len(m))])
+    index = getattr(zero_hist, "index", None)
+    return pd.DataFrame(out, index=index,
+                        columns=["beta0", "beta1", "beta2", "beta3", "tau1", "tau2", "rmse"])
+
+# ---------- 4. Benchmark ----------
+def benchmark(zero_hist, loop_days=None):
+    """
+    Times fit_ns_batch against the per-day fit_ns loop of build_ns_history.
+
+    loop_days : time the loop on the first N days only and scale up (it is slow)
+    Returns dict with seconds per method, speed-up and the mean RMSE of each fit.
+    """
+    from yield_curve import fit_ns
+
+    hist = zero_hist.dropna()
+    sub  = hist if loop_days is None else hist.iloc[:loop_days]
+    t0 = time.perf_counter()
+    rmse_loop = []
+    for z in sub.to_numpy():
+        zc = fit_ns(pd.DataFrame({"tenor": TENORS_YRS, "zero_rate": z}))
+        rmse_loop.append(np.sqrt(np.mean((zc["ns_fit"] - zc["zero_rate"])**2)))
+    loop_s = (time.perf_counter() - t0) * len(hist) / len(sub)
+
+    t0 = time.perf_counter()
+    fit = fit_ns_batch(hist)
+    batch_s = time.perf_counter() - t0
+    return {"days": len(hist), "loop_s": loop_s, "batch_s": batch_s, "speedup": loop_s / batch_s,
+            "rmse_loop": float(np.mean(rmse_loop)), "rmse_batch": float(fit["rmse"].iloc[:len(sub)].mean())}
+
+
+if __name__ == "__main__":
+    from yield_curve import bootstrap_zero_history, download_yields
+    zero_hist = bootstrap_zero_history(download_yields().dropna())
+    for k, v in benchmark(zero_hist, loop_days=250).items():
+        print(f"{k:>10}: {v:,.6g}")
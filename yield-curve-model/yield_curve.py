@@ -6,15 +6,22 @@ Yield-Curve Construction & Nelson-Siegel Fit (USD Treasuries)
 • Bootstraps zero-coupon discount factors
 • Fits Nelson-Siegel parameters (β0, β1, β2, τ)
 • Saves interactive plots + PNG in /plots
+
+Importable: run_curve() returns a results dict without touching matplotlib;
+the plot_* helpers are opt-in and use a non-interactive backend by default.
 """
 
 import os, datetime as dt
 import numpy as np, pandas as pd
-import matplotlib.pyplot as plt
 from scipy.optimize import minimize
-import pandas_datareader.data as web
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 
+from market_data import fred            # cached FRED series, see market-data-store/
+from research_common.plotting import pyplot
+from curve_bootstrap import TENORS_YRS, bootstrap_panel, zero_rates
+from ns_batch import fit_ns_batch
+from dynamic_ns import fit_dns, forecast_dns
+
 # ---------- 1. Download par-yield curve ----------
 FRED_CODES = {
     "1M": "DGS1MO",  "3M": "DGS3MO",  "6M": "DGS6MO",
@@ -25,31 +32,24 @@ FRED_CODES = {
 
 def download_yields(start="2015-01-01"):
     end = dt.date.today()
-    df_list = []
-    for tenor, code in FRED_CODES.items():
-        s = web.DataReader(code, "fred", start, end).rename(columns={code: tenor})
-        df_list.append(s)
-    df = pd.concat(df_list, axis=1).dropna(how="all")
+    df = fred(list(FRED_CODES.values()), start, end)     # one store lookup, memoised per run
+    df.columns = list(FRED_CODES)
+    df = df.dropna(how="all")
     return df
 
 # ---------- 2. Bootstrap zero-coupon curve ----------
 def bootstrap_zero_curve(par_ylds):
-    """Simple bootstrapping with ACT/365 and semi-annual coupons."""
-    tenors = np.array([  1/12,  3/12,  6/12, 1, 2, 3, 5, 7, 10, 20, 30 ])
-    par = par_ylds.values / 100      # convert % → decimal
-    disc = np.empty_like(par)
-    for i, T in enumerate(tenors):
-        c = par[i] / 2 if T > 1 else 0  # coupon (semi-annual) except bills
-        if i == 0:                      # 1-month bill → simple discount
-            disc[i] = 1 / (1 + par[i] * T)
-        else:
-            pv_coupons = np.sum(disc[:i] * c)
-            disc[i] = (1 - pv_coupons) / (1 + c)
-    zero_rates = (disc**(-1/tenors) - 1)
+    """Simple bootstrapping with ACT/365 and semi-annual coupons (bills up to 1Y)."""
+    disc = bootstrap_panel(par_ylds.values / 100, TENORS_YRS, convention="treasury")
     return pd.DataFrame(
-        {"tenor": tenors, "zero_rate": zero_rates, "discount": disc}
+        {"tenor": TENORS_YRS, "zero_rate": zero_rates(disc), "discount": disc}
     )
 
+def bootstrap_zero_history(par_hist):
+    """Zero rates for every day of a par-yield panel (%), in one vectorised bootstrap."""
+    disc = bootstrap_panel(par_hist / 100, TENORS_YRS, convention="treasury")
+    return zero_rates(disc)
+
 # ---------- 3. Nelson-Siegel fit ----------
 def nelson_siegel(tau, beta0, beta1, beta2, m):
     return beta0 + beta1*((1-np.exp(-m/tau))/(m/tau)) + beta2*((1-np.exp(-m/tau))/(m/tau) - np.exp(-m/tau))
@@ -69,8 +69,9 @@ def fit_ns(zero_df):
     return zero_df
 
 # ---------- 4. Plot ----------
-def plot_curve(df):
-    plt.figure()
+def plot_curve(df, show=False, out_dir="plots"):
+    plt = pyplot(show)
+    fig = plt.figure()
     plt.plot(df["tenor"], df["zero_rate"]*100, "o-", label="Bootstrap ZC rate")
     plt.plot(df["tenor"], df["ns_fit"]*100, "s--", label="Nelson-Siegel fit")
     plt.xlabel("Maturity (years)")
@@ -78,28 +79,29 @@ def plot_curve(df):
     plt.title("USD Zero-Coupon Yield Curve — {}".format(dt.date.today()))
     plt.legend()
     plt.grid(True)
-    os.makedirs("plots", exist_ok=True)
-    fname = f"plots/curve_{dt.date.today()}.png"
+    os.makedirs(out_dir, exist_ok=True)
+    fname = f"{out_dir}/curve_{dt.date.today()}.png"
     plt.savefig(fname, dpi=300)
-    print(f"✅ Plot saved to {fname}")
+    if show:
+        plt.show()
+    plt.close(fig)
+    return fname
 
 
 # ---------- 5. Kalman-filter factor forecast ----------
-def build_ns_history(lookback_days=504):
-    """Fit Nelson-Siegel to each day in the past 'lookback_days' and
-    return a DataFrame of beta0, beta1, beta2."""
+def build_zero_history(lookback_days=504):
+    """Bootstrapped zero rates (decimal) for each day in the past 'lookback_days'."""
     start = (dt.date.today() - dt.timedelta(days=lookback_days * 1.4)).isoformat()
     df = download_yields(start)  # bigger window to survive NaNs
-    df = df.dropna()
-    betas = []
-    for idx, row in df.iterrows():
-        zc = bootstrap_zero_curve(row)
-        zc = fit_ns(zc)
-        p = zc.attrs["params"]
-        betas.append([idx, p["beta0"], p["beta1"], p["beta2"]])
-    hist = pd.DataFrame(betas, columns=["date", "beta0", "beta1", "beta2"]).set_index("date")
-    hist = hist.last(f"{lookback_days}D")
-    return hist
+    zero_hist = bootstrap_zero_history(df.dropna()).rename_axis("date")
+    return zero_hist[zero_hist.index > zero_hist.index[-1] - pd.Timedelta(days=lookback_days)]
+
+
+def build_ns_history(lookback_days=504):
+    """Fit Nelson-Siegel to each day in the past 'lookback_days' and
+    return a DataFrame of beta0, beta1, beta2 (and the fitted tau).
+    All days are fitted together (ns_batch.fit_ns_batch)."""
+    return fit_ns_batch(build_zero_history(lookback_days))[["beta0", "beta1", "beta2", "tau"]]
 
 
 def kalman_ar1(series, steps=30):
@@ -109,16 +111,21 @@ def kalman_ar1(series, steps=30):
     pred = res.get_forecast(steps)
     return pred.predicted_mean
 
+FORECAST_TENORS = np.array([0.5, 1, 2, 3, 5, 7, 10, 20, 30])
+HORIZONS        = [10, 20, 30]       # days ahead
+
 def forecast_curves(hist_betas, steps=30):
+    """Independent AR(1) per beta; curves use the latest fitted tau (1.0 if unavailable)."""
+    tau = hist_betas["tau"].iloc[-1] if "tau" in hist_betas else 1.0
     f_beta0 = kalman_ar1(hist_betas["beta0"], steps)
     f_beta1 = kalman_ar1(hist_betas["beta1"], steps)
     f_beta2 = kalman_ar1(hist_betas["beta2"], steps)
 
-    tenors  = np.array([0.5, 1, 2, 3, 5, 7, 10, 20, 30])
+    tenors  = FORECAST_TENORS
     curves  = {}
     for h in [9, 19, 29]:          # 10-, 20-, 30-day horizon (0-indexed)
         y = nelson_siegel(
-            1.0,
+            tau,
             f_beta0.iloc[h],       # ← positional
             f_beta1.iloc[h],
             f_beta2.iloc[h],
@@ -128,44 +135,96 @@ def forecast_curves(hist_betas, steps=30):
     return tenors, curves
 
 
-def plot_forecast(tenors, curves, today_curve):
-    plt.figure()
+def forecast_curves_dns(zero_hist, steps=30, conf=0.95, start=None):
+    """
+    Dynamic Nelson-Siegel forecast (dynamic_ns.py): VAR(1) factors and the decay τ
+    estimated jointly on the full zero-rate history by Kalman-filter MLE.
+
+    start : previous DNSFit to warm-start the refit
+    Returns tenors, curves (horizon → yields), bands (horizon → (lower, upper)) and the fit.
+    """
+    fit = fit_dns(zero_hist, start=start)
+    fc  = forecast_dns(fit, steps, FORECAST_TENORS, conf)
+    horizons = [h for h in HORIZONS if h <= steps]
+    curves = {h: fc["mean"].loc[h].to_numpy() for h in horizons}
+    bands  = {h: (fc["lower"].loc[h].to_numpy(), fc["upper"].loc[h].to_numpy()) for h in horizons}
+    return FORECAST_TENORS, curves, bands, fit
+
+
+def plot_forecast(tenors, curves, today_curve, show=False, out_dir="plots", bands=None):
+    plt = pyplot(show)
+    fig = plt.figure()
     plt.plot(tenors, today_curve*100, 'ko-', label="Today")
     colors = ["tab:blue", "tab:orange", "tab:green"]
     for (h, y), c in zip(curves.items(), colors):
         plt.plot(tenors, y*100, '--', label=f'+{h} days', color=c)
+        if bands and h in bands:
+            lo, hi = bands[h]
+            plt.fill_between(tenors, lo*100, hi*100, color=c, alpha=0.12, lw=0)
     plt.xlabel("Maturity (yrs)")
     plt.ylabel("Yield (%)")
     plt.title("Kalman-Filtered Nelson-Siegel Curve Forecasts")
     plt.legend()
     plt.grid(True)
-    fname = f"plots/forecast_{dt.date.today()}.png"
-    os.makedirs("plots", exist_ok=True)
+    fname = f"{out_dir}/forecast_{dt.date.today()}.png"
+    os.makedirs(out_dir, exist_ok=True)
     plt.savefig(fname, dpi=300)
-    print(f"✅ Forecast plot saved to {fname}")
+    if show:
+        plt.show()
+    plt.close(fig)
+    return fname
 
 # ---------- 6. Pipeline ----------
-def main():
-    # 1) Try FRED live download
+def latest_yields(csv_fallback="data/treasury_yields.csv"):
+    """Latest par-yield row (%): FRED via the local store, else the local CSV."""
     try:
         yields = download_yields().iloc[-1]  # latest row
         print("🟢 Pulled latest yields from FRED")
     except Exception as e:
         print("🔴 FRED download failed → using local CSV")
-        yields = pd.read_csv("data/treasury_yields.csv", index_col=0).iloc[-1]
-
-    zero_df = bootstrap_zero_curve(yields)
-    zero_df = fit_ns(zero_df)
-    print("NS params:", zero_df.attrs["params"])
-    plot_curve(zero_df)
+        yields = pd.read_csv(csv_fallback, index_col=0).iloc[-1]
+    return yields
+
+def run_curve(yields=None, forecast=True, lookback_days=504, steps=30, model="dns"):
+    """
+    Bootstrap + Nelson-Siegel fit of one par curve, optionally with factor forecasts.
+
+    yields : par-yield row in % on the 11 FRED tenors (default: latest_yields())
+    model  : "dns" (joint dynamic NS state-space model, with bands) or "ar1"
+             (independent AR(1) per daily-fitted beta)
+
+    Returns dict with zero_df (tenor, zero_rate, discount, ns_fit), params and, if
+    `forecast`, hist (daily NS betas), tenors and curves (horizon → forecast yields);
+    "dns" adds bands (horizon → (lower, upper)) and dns (the DNSFit).
+    """
+    yields  = latest_yields() if yields is None else yields
+    zero_df = fit_ns(bootstrap_zero_curve(yields))
+    res = {"zero_df": zero_df, "params": zero_df.attrs["params"]}
+    if forecast and model == "dns":
+        tenors, curves, bands, fit = forecast_curves_dns(build_zero_history(lookback_days), steps)
+        res.update(hist=fit.smoothed, tenors=tenors, curves=curves, bands=bands, dns=fit)
+    elif forecast:
+        hist = build_ns_history(lookback_days)
+        tenors, curves = forecast_curves(hist, steps)
+        res.update(hist=hist, tenors=tenors, curves=curves)
+    return res
+
+def plot_results(res, show=False, out_dir="plots"):
+    """Saves the curve (and forecast) PNGs under `out_dir`; returns the file names."""
+    saved = [plot_curve(res["zero_df"], show, out_dir)]
+    if "curves" in res:
+        # slice today’s curve to the same 9 tenors (≥0.5y)
+        zero_df = res["zero_df"]
+        today9  = zero_df.loc[zero_df["tenor"] >= 0.5, "ns_fit"].values
+        saved.append(plot_forecast(res["tenors"], res["curves"], today9, show, out_dir,
+                                   res.get("bands")))
+    return saved
 
-    # ------- optional forecast ------
-    hist = build_ns_history()
-    tenors, curves = forecast_curves(hist)
-
-    # slice today’s curve to the same 9 tenors (≥0.5y)
-    today9 = zero_df.loc[zero_df["tenor"] >= 0.5, "ns_fit"].values
-    plot_forecast(tenors, curves, today9)
+def main():
+    res = run_curve()
+    print("NS params:", res["params"])
+    for fname in plot_results(res):
+        print(f"✅ Plot saved to {fname}")
 
 
 if __name__ == "__main__":